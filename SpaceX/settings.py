@@ -44,15 +44,18 @@ INSTALLED_APPS = [
 
     "rest_framework",
     
+    "apps.upstream",
     "apps.stats",
     "apps.upcoming",
     "apps.launches",
     "apps.dragon",
+    "apps.overview",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",  # Add WhiteNoise for static files
+    "apps.upstream.middleware.CompressionMiddleware",  # gzip/brotli for API responses, compressed bodies cached
+    "apps.upstream.middleware.WhiteNoiseMiddleware",  # WhiteNoise for static files, async-capable under ASGI
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -149,7 +152,7 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # Django REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'apps.upstream.renderers.ORJSONRenderer',
         'rest_framework.renderers.BrowsableAPIRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
@@ -158,3 +161,104 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
 }
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Backs the second tier of the upstream payload cache; point it at a shared
+# backend (e.g. Redis) to share cached payloads between workers.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "spacex-upstream",
+    }
+}
+
+# Upstream SpaceX API client
+# Options in ENDPOINTS override DEFAULTS for that endpoint. TIMEOUT and TTL are
+# in seconds; POOL_SIZE is the number of keep-alive connections kept per
+# endpoint and TTL is how long a fetched payload is served from cache.
+# Once expired, a payload is still served for STALE_WHILE_REVALIDATE seconds
+# while a background refresh runs, and for STALE_IF_ERROR seconds when the
+# upstream fails.
+# Each endpoint has a circuit breaker: after BREAKER_FAILURE_THRESHOLD
+# consecutive failures, or calls slower than BREAKER_SLOW_CALL seconds, its
+# calls fail fast (or get served from cache) for BREAKER_RESET_TIMEOUT seconds
+# before one probe call is let through. Its bulkhead allows MAX_CONCURRENT
+# upstream calls at once; a call that cannot start within BULKHEAD_WAIT
+# seconds is rejected, so one hanging endpoint cannot tie up every worker.
+# The refresh_upstream management command (or, with REFRESH_IN_PROCESS, a
+# thread in each web worker, started from wsgi.py/asgi.py) refreshes every endpoint every REFRESH_INTERVAL
+# seconds (default: 80% of TTL). WARM_LIMIT is the number of most recent
+# launch details it keeps warm. /launches/batch/ accepts up to BATCH_MAX_LINKS
+# links and fetches at most BATCH_CONCURRENCY of them at once. The
+# crawl_launch_details command fetches CRAWL_CONCURRENCY details at once and
+# starts at most CRAWL_RATE requests per second.
+# ASYNC_VIEWS routes the API to the async views, which fetch upstream data on
+# the event loop; enable it when serving through SpaceX/asgi.py.
+# CACHE_MAX_ENTRIES bounds the in-process cache tier.
+# With FAIL_FAST the process refuses to start when SECRET_KEY cannot decrypt
+# the upstream URLs.
+UPSTREAM = {
+    'FAIL_FAST': config('UPSTREAM_FAIL_FAST', default=True, cast=bool),
+    'CACHE_ALIAS': 'default',
+    'CACHE_MAX_ENTRIES': 512,
+    'REFRESH_IN_PROCESS': config('UPSTREAM_REFRESH_IN_PROCESS', default=False, cast=bool),
+    'ASYNC_VIEWS': config('UPSTREAM_ASYNC_VIEWS', default=False, cast=bool),
+    'DEFAULTS': {
+        'TIMEOUT': 30,
+        'CONNECT_TIMEOUT': None,
+        'POOL_SIZE': 10,
+        'TTL': 60,
+        'STALE_WHILE_REVALIDATE': 60,
+        'STALE_IF_ERROR': 24 * 60 * 60,
+        'BREAKER_FAILURE_THRESHOLD': 5,
+        'BREAKER_RESET_TIMEOUT': 30,
+        'BREAKER_SLOW_CALL': 10,
+        'MAX_CONCURRENT': 10,
+        'BULKHEAD_WAIT': 0.5,
+    },
+    'ENDPOINTS': {
+        'stats': {'TTL': 6 * 60 * 60},
+        'upcoming': {'TTL': 5 * 60},
+        'launches': {'TTL': 15 * 60},
+        'launch_detail': {
+            'POOL_SIZE': 20,
+            'MAX_CONCURRENT': 20,
+            'TTL': 6 * 60 * 60,
+            'WARM_LIMIT': 50,
+            'BATCH_CONCURRENCY': 8,
+            'BATCH_MAX_LINKS': 50,
+            'CRAWL_CONCURRENCY': 4,
+            'CRAWL_RATE': 5,
+        },
+        'dragon': {'TTL': 5, 'STALE_WHILE_REVALIDATE': 5, 'STALE_IF_ERROR': 5 * 60, 'BREAKER_SLOW_CALL': 5},
+    },
+}
+
+# Serve /launches/ and /upcoming/ from the local database, which the
+# launches_store and upcoming_store refresh jobs (only registered when this
+# is set, like stats_store) keep in sync with upstream,
+# and /launches/<link>/ from the crawl_launch_details mirror. Until the first
+# sync (or crawl) has run, those views keep reading from upstream.
+SERVE_FROM_STORE = config('SERVE_FROM_STORE', default=False, cast=bool)
+
+# Latency budget of /overview/ in seconds. Sources that have not answered by
+# then are reported as timed out instead of delaying the whole response.
+OVERVIEW_BUDGET = config('OVERVIEW_BUDGET', default=2.0, cast=float)
+
+# Compression of API responses (see apps.upstream.middleware.CompressionMiddleware).
+# Bodies smaller than MIN_SIZE bytes are sent uncompressed. Compressed bodies
+# are cached, up to CACHE_MAX_BYTES in total, so unchanged data is only
+# compressed once.
+RESPONSE_COMPRESSION = {
+    'MIN_SIZE': config('COMPRESSION_MIN_SIZE', default=1024, cast=int),
+    'CACHE_MAX_BYTES': 32 * 1024 * 1024,
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 5,
+}
+
+# Total size of the rendered responses kept in memory. Successful responses
+# are cached by URL and version of the upstream data, so repeated requests
+# for unchanged data skip serialization and rendering.
+RENDERED_CACHE_MAX_BYTES = 32 * 1024 * 1024
@@ -31,4 +31,6 @@ if settings.IS_AVAILABLE:
         path("upcoming/", include('apps.upcoming.urls')),
         path("launches/", include('apps.launches.urls')),
         path("dragon/", include('apps.dragon.urls')),
+        path("overview/", include('apps.overview.urls')),
+        path("upstream/", include('apps.upstream.urls')),
     ]
@@ -47,12 +47,17 @@ class APIRootView(APIView):
                 'launches': {
                     'list': request.build_absolute_uri(reverse('launches:spacex-launches')),
                     'detail': request.build_absolute_uri('/launches/{link}/'),
+                    'batch': request.build_absolute_uri(reverse('launches:launch-batch')) + '?links={link},{link}',
                     'description': 'Get past SpaceX launches with mission details. Use the "link" field from launch data to get detailed information'
                 },
                 'dragon': {
                     'url': request.build_absolute_uri(reverse('dragon:dragon-tracking')),
                     'description': 'Get real-time Dragon capsule GPS tracking and telemetry data (returns raw SpaceX API response)'
                 },
+                'overview': {
+                    'url': request.build_absolute_uri(reverse('overview:spacex-overview')),
+                    'description': 'Get stats, upcoming stats, launches and Dragon tracking in one response, with a status per section'
+                },
                 'health_checks': {
                     'stats': request.build_absolute_uri(reverse('stats:health-check')),
                     'upcoming': request.build_absolute_uri(reverse('upcoming:health-check')),
@@ -65,8 +70,9 @@ class APIRootView(APIView):
                 'get_upcoming_stats': request.build_absolute_uri(reverse('upcoming:upcoming-stats')),
                 'get_all_launches': request.build_absolute_uri(reverse('launches:spacex-launches')),
                 'get_launch_detail': 'Use /launches/{link}/ where {link} is from the launch data (e.g., /launches/crew11/)',
-                'get_dragon_tracking': request.build_absolute_uri(reverse('dragon:dragon-tracking'))
+                'get_dragon_tracking': request.build_absolute_uri(reverse('dragon:dragon-tracking')),
+                'get_overview': request.build_absolute_uri(reverse('overview:spacex-overview'))
             },
-            'available_apps': ['stats', 'upcoming', 'launches', 'dragon'],
+            'available_apps': ['stats', 'upcoming', 'launches', 'dragon', 'overview'],
             'note': 'All endpoints return JSON data. The launches detail endpoint requires a "link" parameter from the launches list. Dragon endpoint returns raw SpaceX API response with GPS tracking data.'
         }, status=status.HTTP_200_OK)
@@ -14,5 +14,11 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "SpaceX.settings")
 
 application = get_wsgi_application()
 
+# Only the server entry points run the in-process refresh scheduler, not
+# management commands such as migrate, test or refresh_upstream
+from apps.upstream.scheduler import start_in_process_refresh  # noqa: E402
+
+start_in_process_refresh()
+
 # Vercel expects 'app'
 app = application
\ No newline at end of file
@@ -1,6 +1,16 @@
+from functools import partial
+
 from django.apps import AppConfig
 
 
 class DragonConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.dragon"
+
+    def ready(self):
+        from apps.upstream.registry import registry
+        from apps.upstream.scheduler import refresh_scheduler
+        from .utils import DRAGON_ENCRYPTED_URL, fetch_dragon_data
+
+        registry.register('dragon', DRAGON_ENCRYPTED_URL)
+        refresh_scheduler.register('dragon', partial(fetch_dragon_data, refresh=True))
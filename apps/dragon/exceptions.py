@@ -1,15 +1,6 @@
 """
 Custom exceptions for the dragon app
 """
+from apps.upstream.exceptions import APIError, DecryptionError, ValidationError
 
-class APIError(Exception):
-    """Raised when external API call fails or returns error"""
-    pass
-
-class DecryptionError(Exception):
-    """Raised when URL decryption fails"""
-    pass
-
-class ValidationError(Exception):
-    """Raised when data validation fails"""
-    pass
+__all__ = ['APIError', 'DecryptionError', 'ValidationError']
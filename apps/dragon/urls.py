@@ -1,9 +1,13 @@
+from django.conf import settings
 from django.urls import path
-from .views import DragonTrackingAPIView
+from .views import AsyncDragonTrackingAPIView, DragonTrackingAPIView
 
 app_name = 'dragon'
 
+# Serve the async views when deployed under ASGI
+ASYNC_VIEWS = settings.UPSTREAM.get('ASYNC_VIEWS', False)
+
 urlpatterns = [
     # Dragon GPS tracking data - returns raw SpaceX API response
-    path('', DragonTrackingAPIView.as_view(), name='dragon-tracking'),
+    path('', (AsyncDragonTrackingAPIView if ASYNC_VIEWS else DragonTrackingAPIView).as_view(), name='dragon-tracking'),
 ]
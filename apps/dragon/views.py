@@ -1,7 +1,8 @@
-from rest_framework.views import APIView
+from apps.upstream.conditional import last_modified
+from apps.upstream.views import AsyncUpstreamAPIView, UpstreamAPIView
 from rest_framework.response import Response
 from rest_framework import status
-from .utils import fetch_dragon_data
+from .utils import afetch_dragon_data, fetch_dragon_data
 from .serializers import DragonRawDataSerializer
 from .exceptions import APIError, DecryptionError, ValidationError
 import logging
@@ -9,7 +10,7 @@ import logging
 logger = logging.getLogger(__name__)
 
 
-class DragonTrackingAPIView(APIView):
+class DragonTrackingAPIView(UpstreamAPIView):
     """
     API view to get Dragon capsule tracking data.
     Returns the raw response from SpaceX API exactly as received, but validates with serializers.
@@ -24,6 +25,11 @@ class DragonTrackingAPIView(APIView):
             # Fetch data from the external SpaceX API
             raw_data = fetch_dragon_data()
             
+            # Answer from the client's or our own copy of an identical earlier response
+            cached = self.get_cached_response(request, last_modified=last_modified(raw_data))
+            if cached is not None:
+                return cached
+            
             # Try to serialize the data, but don't fail if validation errors occur
             serializer = DragonRawDataSerializer(data=raw_data)
             
@@ -73,3 +79,12 @@ class DragonTrackingAPIView(APIView):
                 'message': 'An unexpected error occurred. Please try again later.',
                 'data': None
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class AsyncDragonTrackingAPIView(AsyncUpstreamAPIView, DragonTrackingAPIView):
+    """
+    Async variant of DragonTrackingAPIView for ASGI deployments.
+    """
+    
+    async def prefetch(self, request):
+        await afetch_dragon_data()
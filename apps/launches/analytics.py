@@ -0,0 +1,191 @@
+"""
+Launch history analytics computed with NumPy.
+
+The dated launches of a snapshot are turned into arrays once: their
+timestamps in chronological order plus an integer code per launch for each
+grouped field. Every statistic is then a vectorized operation over those
+arrays (bincount, searchsorted, diff, percentile), so the cost grows with
+the number of launches only through a handful of array passes. Both the
+arrays and the analytics are memoized on the snapshot and are recomputed
+only for a new version of the data.
+"""
+from datetime import datetime, timezone
+
+import numpy as np
+
+from apps.upstream.aggregates import dimension_value
+
+DAY = 86400
+
+# Fields launches are grouped by, with the name of their breakdown
+GROUP_FIELDS = {
+    'vehicle': 'by_vehicle',
+    'launchSite': 'by_launch_site',
+    'missionType': 'by_mission_type',
+}
+
+# Trailing windows of the rolling cadence, in days
+CADENCE_WINDOWS = (30, 90, 365)
+
+INTERVAL_PERCENTILES = (10, 25, 50, 75, 90)
+
+# Lower edges of the interval histogram bins, in days; the last bin is open-ended
+INTERVAL_BINS = (0, 1, 2, 4, 7, 14, 30, 60, 90, 180, 365)
+
+
+def format_timestamp(timestamp):
+    return datetime.fromtimestamp(float(timestamp), timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def rounded(values):
+    """Return a float array as a list of floats rounded to two decimals"""
+    return np.round(values, 2).tolist()
+
+
+class LaunchArrays:
+    """
+    The dated launches of a snapshot as NumPy arrays, in chronological order.
+
+    ``timestamps`` holds the launch datetimes (epoch seconds) sorted
+    ascending; ``codes[field]`` holds, for the same launches, the position
+    of their value of ``field`` in ``labels[field]``.
+    """
+
+    def __init__(self, records, timestamps):
+        positions = [position for position, timestamp in enumerate(timestamps) if timestamp is not None]
+        self.total = len(records)
+
+        timestamps = np.fromiter((timestamps[position] for position in positions), dtype=np.float64, count=len(positions))
+        order = np.argsort(timestamps, kind='stable')
+        self.timestamps = timestamps[order]
+
+        self.codes = {}
+        self.labels = {}
+        for name in GROUP_FIELDS:
+            lookup = {}
+            codes = np.fromiter(
+                (lookup.setdefault(dimension_value(records[position], name), len(lookup)) for position in positions),
+                dtype=np.intp, count=len(positions),
+            )
+            self.codes[name] = codes[order]
+            self.labels[name] = list(lookup)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def months(self):
+        """Return the month of every launch, as months since 1970-01"""
+        return self.timestamps.astype('datetime64[s]').astype('datetime64[M]').astype(np.int64)
+
+    def trailing_counts(self, ends, days):
+        """Return the number of launches in the ``days`` days up to each of ``ends`` (inclusive)"""
+        return np.searchsorted(self.timestamps, ends, side='right') - np.searchsorted(self.timestamps, ends - days * DAY, side='right')
+
+    def per_year(self):
+        years = self.timestamps.astype('datetime64[s]').astype('datetime64[Y]').astype(np.int64)
+        counts = np.bincount(years - years[0])
+        return [{'year': int(years[0]) + 1970 + offset, 'launches': count} for offset, count in enumerate(counts.tolist())]
+
+    def cadence(self):
+        """
+        Launch counts per calendar month (months without launches included)
+        with the launches in each trailing window as of the month's end,
+        plus the trailing counts as of the latest launch.
+        """
+        months = self.months()
+        first, last = int(months[0]), int(months[-1])
+        counts = np.bincount(months - first)
+        labels = np.arange(first, last + 1).astype('datetime64[M]')
+        # Last second of every month
+        ends = (labels + 1).astype('datetime64[s]').astype(np.float64) - 1
+
+        series = {f'last_{days}_days': self.trailing_counts(ends, days).tolist() for days in CADENCE_WINDOWS}
+        monthly = [
+            {'month': label, 'launches': count, **{key: values[index] for key, values in series.items()}}
+            for index, (label, count) in enumerate(zip(np.datetime_as_string(labels).tolist(), counts.tolist()))
+        ]
+        latest = self.timestamps[-1:]
+        current = {f'last_{days}_days': int(self.trailing_counts(latest, days)[0]) for days in CADENCE_WINDOWS}
+        return {'windows_days': list(CADENCE_WINDOWS), 'current': current, 'monthly': monthly}
+
+    def intervals(self):
+        """Distribution of the days between consecutive launches"""
+        gaps = np.diff(self.timestamps) / DAY
+        edges = np.asarray(INTERVAL_BINS, dtype=np.float64)
+        counts = np.bincount(np.searchsorted(edges, gaps, side='right') - 1, minlength=len(edges))
+        histogram = [
+            {'min_days': low, 'max_days': high, 'intervals': count}
+            for low, high, count in zip(INTERVAL_BINS, INTERVAL_BINS[1:] + (None,), counts.tolist())
+        ]
+        if not len(gaps):
+            return {'count': 0, 'mean_days': None, 'min_days': None, 'max_days': None, 'percentiles_days': None, 'histogram': histogram}
+
+        percentiles = rounded(np.percentile(gaps, INTERVAL_PERCENTILES))
+        return {
+            'count': len(gaps),
+            'mean_days': round(float(gaps.mean()), 2),
+            'min_days': round(float(gaps.min()), 2),
+            'max_days': round(float(gaps.max()), 2),
+            'percentiles_days': {f'p{percentile}': value for percentile, value in zip(INTERVAL_PERCENTILES, percentiles)},
+            'histogram': histogram,
+        }
+
+    def breakdown(self, name):
+        """
+        Launch counts per value of ``name`` with each group's first and last
+        launch and mean interval, largest groups first.
+        """
+        codes = self.codes[name]
+        counts = np.bincount(codes, minlength=len(self.labels[name]))
+        # Group the launches by value; a stable sort keeps them chronological within a group
+        grouped = self.timestamps[np.argsort(codes, kind='stable')]
+        ends = np.cumsum(counts)
+        firsts = grouped[ends - counts]
+        lasts = grouped[ends - 1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_intervals = np.where(counts > 1, (lasts - firsts) / DAY / (counts - 1), np.nan)
+
+        rows = []
+        for code in np.argsort(-counts, kind='stable').tolist():
+            rows.append({
+                name: self.labels[name][code],
+                'launches': int(counts[code]),
+                'first_launch': format_timestamp(firsts[code]),
+                'last_launch': format_timestamp(lasts[code]),
+                'mean_interval_days': None if np.isnan(mean_intervals[code]) else round(float(mean_intervals[code]), 2),
+            })
+        return rows
+
+    def analytics(self):
+        if not len(self):
+            return {
+                'total_launches': self.total,
+                'dated_launches': 0,
+                'first_launch': None,
+                'last_launch': None,
+                'per_year': [],
+                'cadence': {'windows_days': list(CADENCE_WINDOWS), 'current': None, 'monthly': []},
+                'intervals': self.intervals(),
+                **{key: [] for key in GROUP_FIELDS.values()},
+            }
+
+        return {
+            'total_launches': self.total,
+            'dated_launches': len(self),
+            'first_launch': format_timestamp(self.timestamps[0]),
+            'last_launch': format_timestamp(self.timestamps[-1]),
+            'per_year': self.per_year(),
+            'cadence': self.cadence(),
+            'intervals': self.intervals(),
+            **{key: self.breakdown(name) for name, key in GROUP_FIELDS.items()},
+        }
+
+
+def launch_arrays(snapshot):
+    """Return the LaunchArrays of a launch snapshot, built once per snapshot"""
+    return snapshot.memoize('arrays', lambda: LaunchArrays(snapshot.rows(), snapshot.sort_keys('launchDate')))
+
+
+def launch_analytics(snapshot):
+    """Return the analytics of a launch snapshot, computed once per snapshot"""
+    return snapshot.memoize('analytics', lambda: launch_arrays(snapshot).analytics())
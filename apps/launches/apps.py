@@ -4,3 +4,19 @@ from django.apps import AppConfig
 class LaunchesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.launches"
+
+    def ready(self):
+        from apps.upstream.registry import registry
+        from apps.upstream.scheduler import refresh_scheduler
+        from apps.upstream.utils import serve_from_store
+        from .utils import (
+            LAUNCHES_ENCRYPTED_URL, LAUNCH_DETAIL_ENCRYPTED_URL, load_launches, refresh_launches, sync_launches,
+            warm_launch_details,
+        )
+
+        registry.register('launches', LAUNCHES_ENCRYPTED_URL, load=load_launches)
+        registry.register('launch_detail', LAUNCH_DETAIL_ENCRYPTED_URL)
+        refresh_scheduler.register('launches', refresh_launches)
+        if serve_from_store():
+            refresh_scheduler.register('launches_store', sync_launches, endpoint='launches')
+        refresh_scheduler.register('launch_details', warm_launch_details, endpoint='launch_detail')
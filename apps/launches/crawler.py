@@ -0,0 +1,107 @@
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from apps.upstream.client import get_endpoint_options
+from apps.upstream.resilience import RateLimiter
+from .exceptions import APIError, NotFoundError
+from .models import LaunchDetail
+from .utils import LINK_PATTERN, extract_launches, fetch_launch_detail, fetch_launches_data, launch_detail_schema
+
+logger = logging.getLogger(__name__)
+
+
+def render_launch_detail(link, raw_data):
+    """
+    Return the data /launches/{link}/ would send for a detail, as plain JSON
+    values, and whether it passed LaunchDetailSerializer.
+    """
+    validated_data, errors = launch_detail_schema.validate(raw_data)
+    if errors is None:
+        # Round-trip through the API renderer so dates are stored exactly as they are sent
+        return json.loads(JSONRenderer().render(validated_data)), True
+    
+    logger.warning(f"Serializer validation errors for {link}: {errors}")
+    return raw_data, False
+
+
+def find_stale_links(launches, force=False):
+    """
+    Return (link, updatedAt) for every launch whose detail is not mirrored yet
+    or was mirrored for a different ``updatedAt``. Items that are not launch
+    objects are skipped.
+    """
+    mirrored = dict(LaunchDetail.objects.values_list('link', 'updated_at'))
+    targets = {}
+    for launch in launches:
+        if not isinstance(launch, dict):
+            continue
+        link = launch.get('link')
+        if not isinstance(link, str) or not LINK_PATTERN.match(link) or len(link) > 100 or link in targets:
+            continue
+        updated_at = launch.get('updatedAt') or ''
+        if force or mirrored.get(link) != updated_at:
+            targets[link] = updated_at
+    return list(targets.items())
+
+
+def crawl_launch_details(concurrency=None, rate=None, force=False, limit=None):
+    """
+    Mirror the details of every launch in the launches list.
+    
+    Only launches that are new, or whose ``updatedAt`` changed since they
+    were crawled, are fetched (all of them with ``force``). At most
+    ``concurrency`` details are fetched at once and at most ``rate`` requests
+    are started per second; both default to the launch_detail endpoint's
+    CRAWL_CONCURRENCY and CRAWL_RATE options.
+    
+    Returns counts of crawled, invalid, not found, failed and skipped launches.
+    """
+    options = get_endpoint_options('launch_detail')
+    concurrency = concurrency or options.get('CRAWL_CONCURRENCY', 4)
+    limiter = RateLimiter(options.get('CRAWL_RATE', 5) if rate is None else rate)
+    
+    launches = extract_launches(fetch_launches_data())
+    targets = find_stale_links(launches, force=force)
+    if limit is not None:
+        targets = targets[:limit]
+    
+    counts = {'crawled': 0, 'invalid': 0, 'not_found': 0, 'failed': 0, 'skipped': len(launches) - len(targets)}
+    
+    def fetch(link):
+        limiter.wait()
+        return fetch_launch_detail(link, refresh=True)
+    
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        futures = {executor.submit(fetch, link): (link, updated_at) for link, updated_at in targets}
+        
+        # Store results from this thread as they arrive, so an interrupted
+        # crawl keeps what it has fetched
+        for future in as_completed(futures):
+            link, updated_at = futures[future]
+            try:
+                raw_data = future.result()
+            except NotFoundError:
+                counts['not_found'] += 1
+                continue
+            except APIError as e:
+                counts['failed'] += 1
+                logger.warning(f"Failed to crawl launch detail for {link}: {str(e)}")
+                continue
+            
+            data, is_valid = render_launch_detail(link, raw_data)
+            LaunchDetail.objects.update_or_create(link=link, defaults={
+                'document_id': str(raw_data.get('documentId') or '') if isinstance(raw_data, dict) else '',
+                'updated_at': updated_at,
+                'data': data,
+                'is_valid': is_valid,
+                'crawled_at': timezone.now(),
+            })
+            counts['crawled'] += 1
+            if not is_valid:
+                counts['invalid'] += 1
+    
+    return counts
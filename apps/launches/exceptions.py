@@ -1,17 +1,6 @@
 """
 Custom exceptions for the launches app
 """
+from apps.upstream.exceptions import APIError, NotFoundError, ValidationError
 
-class APIError(Exception):
-    """Custom exception for API errors"""
-    pass
-
-
-class NotFoundError(APIError):
-    """Exception for 404 errors"""
-    pass
-
-
-class ValidationError(APIError):
-    """Exception for validation errors"""
-    pass
\ No newline at end of file
+__all__ = ['APIError', 'NotFoundError', 'ValidationError']
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.launches.crawler import crawl_launch_details
+from apps.launches.exceptions import APIError
+
+
+class Command(BaseCommand):
+    help = (
+        "Mirror the detail of every launch into the local database, so "
+        "/launches/<link>/ can be served without an upstream call. Only "
+        "launches that are new or changed since the last crawl are fetched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, help='Details fetched at once (default: CRAWL_CONCURRENCY).')
+        parser.add_argument('--rate', type=float, help='Upstream requests started per second (default: CRAWL_RATE).')
+        parser.add_argument('--limit', type=int, help='Crawl at most this many launches.')
+        parser.add_argument('--force', action='store_true', help='Crawl every launch, changed or not.')
+
+    def handle(self, *args, **options):
+        started = time.time()
+        try:
+            counts = crawl_launch_details(
+                concurrency=options['concurrency'],
+                rate=options['rate'],
+                force=options['force'],
+                limit=options['limit'],
+            )
+        except APIError as e:
+            raise CommandError(f"Could not read the launches list: {str(e)}")
+
+        self.stdout.write(
+            f"Crawled {counts['crawled']} launch details ({counts['invalid']} invalid), "
+            f"{counts['not_found']} not found, {counts['failed']} failed, {counts['skipped']} unchanged "
+            f"in {time.time() - started:.1f}s"
+        )
+        if counts['failed']:
+            raise CommandError("Some launch details could not be crawled; run the command again to retry them.")
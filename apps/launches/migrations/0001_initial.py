@@ -0,0 +1,40 @@
+# Generated by Django 5.2.12 on 2026-10-18 03:15
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Launch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('document_id', models.CharField(max_length=64, unique=True)),
+                ('upstream_id', models.IntegerField(blank=True, null=True)),
+                ('updated_at', models.CharField(blank=True, default='', max_length=40)),
+                ('position', models.PositiveIntegerField(db_index=True)),
+                ('data', models.JSONField()),
+                ('synced_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('link', models.CharField(blank=True, db_index=True, max_length=100)),
+                ('title', models.CharField(blank=True, max_length=255)),
+                ('vehicle', models.CharField(blank=True, db_index=True, max_length=100)),
+                ('launch_site', models.CharField(blank=True, db_index=True, max_length=100)),
+                ('mission_type', models.CharField(blank=True, db_index=True, max_length=100)),
+                ('mission_status', models.CharField(blank=True, db_index=True, max_length=50)),
+                ('launch_date', models.CharField(blank=True, db_index=True, max_length=40)),
+                ('launch_time', models.CharField(blank=True, max_length=40)),
+                ('is_live', models.BooleanField(default=False)),
+            ],
+            options={
+                'ordering': ['position'],
+                'abstract': False,
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.12 on 2026-10-18 03:17
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('launches', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LaunchDetail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('link', models.CharField(max_length=100, unique=True)),
+                ('document_id', models.CharField(blank=True, max_length=64)),
+                ('updated_at', models.CharField(blank=True, default='', max_length=40)),
+                ('data', models.JSONField()),
+                ('is_valid', models.BooleanField(default=True)),
+                ('crawled_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
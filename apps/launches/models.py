@@ -1,3 +1,49 @@
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+from apps.upstream.models import UpstreamRecord
+
+
+class Launch(UpstreamRecord):
+    """
+    A launch from the upstream launches list, synced by sync_launches().
+    """
+    link = models.CharField(max_length=100, blank=True, db_index=True)
+    title = models.CharField(max_length=255, blank=True)
+    vehicle = models.CharField(max_length=100, blank=True, db_index=True)
+    launch_site = models.CharField(max_length=100, blank=True, db_index=True)
+    mission_type = models.CharField(max_length=100, blank=True, db_index=True)
+    mission_status = models.CharField(max_length=50, blank=True, db_index=True)
+    launch_date = models.CharField(max_length=40, blank=True, db_index=True)
+    launch_time = models.CharField(max_length=40, blank=True)
+    is_live = models.BooleanField(default=False)
+    
+    record_fields = {
+        'link': 'link',
+        'title': 'title',
+        'vehicle': 'vehicle',
+        'launch_site': 'launchSite',
+        'mission_type': 'missionType',
+        'mission_status': 'missionStatus',
+        'launch_date': 'launchDate',
+        'launch_time': 'launchTime',
+        'is_live': 'isLive',
+    }
+
+
+class LaunchDetail(models.Model):
+    """
+    A mirrored launch detail, stored by the crawl_launch_details command.
+    ``updated_at`` is the ``updatedAt`` of the launch in the launches list when
+    the detail was crawled, so only launches that changed are crawled again.
+    ``data`` is what /launches/{link}/ returns for the launch.
+    """
+    link = models.CharField(max_length=100, unique=True)
+    document_id = models.CharField(max_length=64, blank=True)
+    updated_at = models.CharField(max_length=40, blank=True, default='')
+    data = models.JSONField()
+    is_valid = models.BooleanField(default=True)
+    crawled_at = models.DateTimeField(default=timezone.now)
+    
+    def __str__(self):
+        return self.link
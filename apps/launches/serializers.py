@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from apps.upstream.snapshot import Selection
 
 
 class ImageFormatSerializer(serializers.Serializer):
@@ -88,12 +89,12 @@ class LaunchesResponseSerializer(serializers.Serializer):
     launches = LaunchSerializer(many=True)
     
     def to_representation(self, instance):
-        """Create response structure from the raw launch data"""
-        launches_data = instance if isinstance(instance, list) else []
+        """Create response structure from the raw launch data, limited to the 'page' in context if given"""
+        launches_data = instance if isinstance(instance, (list, Selection)) else []
         
         return {
             'total_launches': len(launches_data),
-            'launches': launches_data
+            'launches': self.context.get('page', launches_data)
         }
 
 
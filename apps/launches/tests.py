@@ -1,3 +1,570 @@
-from django.test import TestCase
+import asyncio
+import threading
+import time
+from unittest import mock
+from urllib.parse import parse_qsl, urlsplit
 
-# Create your tests here.
+from django.apps import apps
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, TransactionTestCase, override_settings
+
+from apps.upstream.cache import cache_key, upstream_cache
+from apps.upstream.columnar import ColumnarRecords
+from apps.upstream.fields import Projection
+from apps.upstream.registry import registry
+from apps.upstream.scheduler import RefreshScheduler
+from apps.upstream.snapshot import parse_date
+from apps.upstream.testing import FakeUpstream, UpstreamTestCase, endpoint_options
+
+from .analytics import launch_analytics, launch_arrays
+from .crawler import crawl_launch_details
+from .models import Launch, LaunchDetail
+from .utils import LaunchSnapshot, get_launch_snapshot, launch_snapshots, refresh_launches, sync_launches
+from .views import AsyncLaunchBatchAPIView, AsyncLaunchDetailAPIView, LaunchBatchAPIView, LaunchDetailAPIView, LaunchesAPIView
+
+
+def detail(link):
+    return {
+        'id': 1,
+        'documentId': link,
+        'title': link,
+        'callToAction': 'Watch',
+        'missionStatus': 'complete',
+        'followDragonEnabled': False,
+        'returnFromIssEnabled': False,
+        'toTheIssEnabled': False,
+    }
+
+
+class CountingUpstream(FakeUpstream):
+    """Fake upstream that records the highest number of concurrent requests"""
+
+    def __init__(self, payloads, delay=0):
+        super().__init__(payloads)
+        self.slow_delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.counter_lock = threading.Lock()
+
+    def handle(self, request):
+        with self.counter_lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.slow_delay)
+        with self.counter_lock:
+            self.active -= 1
+        super().handle(request)
+
+
+class LaunchBatchTests(UpstreamTestCase):
+    def get(self, upstream, links, use_async=False):
+        with registry.override(launch_detail=f"{upstream.url}/detail"):
+            if use_async:
+                request = AsyncRequestFactory().get('/launches/batch/', {'links': links})
+                return asyncio.run(AsyncLaunchBatchAPIView.as_view()(request))
+            return LaunchBatchAPIView.as_view()(RequestFactory().get('/launches/batch/', {'links': links}))
+
+    def test_results_are_keyed_by_link_with_a_status_each(self):
+        for use_async in (False, True):
+            self.reset_upstream()
+            with FakeUpstream({'/detail/crew11': detail('crew11')}) as upstream:
+                response = self.get(upstream, 'crew11,missing,bad.link,crew11', use_async)
+
+            self.assertEqual(response.status_code, 200)
+            results = response.data['data']['results']
+            self.assertEqual(list(results), ['crew11', 'missing', 'bad.link'])
+            self.assertEqual(results['crew11']['status'], 'ok')
+            self.assertEqual(results['crew11']['data']['title'], 'crew11')
+            self.assertEqual(results['missing']['status'], 'not_found')
+            self.assertEqual(results['bad.link']['status'], 'invalid')
+            self.assertEqual(response.data['data']['succeeded'], 1)
+            self.assertNotIn('/detail/bad.link', upstream.requests)
+
+    def test_concurrency_is_capped(self):
+        links = [f'mission-{i}' for i in range(12)]
+        payloads = {f'/detail/{link}': detail(link) for link in links}
+        for use_async in (False, True):
+            self.reset_upstream()
+            with endpoint_options('launch_detail', BATCH_CONCURRENCY=4), CountingUpstream(payloads, delay=0.1) as upstream:
+                started = time.perf_counter()
+                response = self.get(upstream, ','.join(links), use_async)
+                elapsed = time.perf_counter() - started
+
+            self.assertEqual(response.data['data']['succeeded'], 12)
+            self.assertEqual(upstream.max_active, 4)
+            # Three rounds of four instead of twelve sequential fetches
+            self.assertLess(elapsed, 0.9)
+
+    def test_missing_or_too_many_links_are_rejected(self):
+        with endpoint_options('launch_detail', BATCH_MAX_LINKS=2), FakeUpstream({}) as upstream:
+            self.assertEqual(self.get(upstream, '').status_code, 400)
+            self.assertEqual(self.get(upstream, 'a,b,c').status_code, 400)
+            self.assertEqual(self.get(upstream, 'a,b,c', use_async=True).status_code, 400)
+
+        self.assertEqual(upstream.requests, [])
+
+
+def launch(index, updated_at='2025-01-01T00:00:00.000Z'):
+    return {
+        'id': index,
+        'documentId': f'doc-{index}',
+        'title': f'Mission {index}',
+        'link': f'mission-{index}',
+        'vehicle': 'Falcon 9',
+        'launchSite': 'SLC-40',
+        'missionType': 'starlink',
+        'missionStatus': 'complete',
+        'launchDate': '2025-01-01',
+        'launchTime': '12:00:00',
+        'isLive': False,
+        'updatedAt': updated_at,
+    }
+
+
+class LaunchConditionalTests(UpstreamTestCase):
+    def test_detail_pages_have_validators_per_link(self):
+        payloads = {f'/detail/{link}': dict(detail(link), updatedAt='2025-01-01T00:00:00.000Z') for link in ('crew11', 'crew12')}
+        with FakeUpstream(payloads) as upstream:
+            with registry.override(launch_detail=f"{upstream.url}/detail"):
+                crew11 = self.client.get('/launches/crew11/')
+                crew12 = self.client.get('/launches/crew12/', headers={'if_none_match': crew11['ETag']})
+                not_modified = self.client.get('/launches/crew11/', headers={'if_none_match': crew11['ETag']})
+
+        self.assertEqual(crew11['Last-Modified'], 'Wed, 01 Jan 2025 00:00:00 GMT')
+        self.assertEqual(crew12.status_code, 200)
+        self.assertNotEqual(crew12['ETag'], crew11['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_list_answers_not_modified_before_selecting(self):
+        with FakeUpstream({'/launches': {'data': {'launches': [launch(1), launch(2)]}}}) as upstream:
+            with registry.override(launches=f"{upstream.url}/launches"):
+                first = self.client.get('/launches/?sort=title')
+                with mock.patch.object(LaunchSnapshot, 'select') as select:
+                    not_modified = self.client.get('/launches/?sort=title', headers={'if_none_match': first['ETag']})
+
+        self.assertEqual(not_modified.status_code, 304)
+        select.assert_not_called()
+
+
+class LaunchStoreTests(UpstreamTestCase, TestCase):
+    def sync(self, launches):
+        with FakeUpstream({'/launches': {'data': {'launches': launches}}}) as upstream:
+            with registry.override(launches=f"{upstream.url}/launches"):
+                self.reset_upstream()
+                return sync_launches()
+
+    def test_sync_only_writes_changed_records(self):
+        self.assertEqual(self.sync([launch(1), launch(2), launch(3)])['created'], 3)
+
+        counts = self.sync([launch(4), launch(1), launch(2, updated_at='2025-02-01T00:00:00.000Z')])
+        self.assertEqual(counts, {'created': 1, 'updated': 1, 'moved': 1, 'deleted': 1, 'unchanged': 0})
+        self.assertEqual(
+            list(Launch.objects.values_list('document_id', 'position')),
+            [('doc-4', 0), ('doc-1', 1), ('doc-2', 2)],
+        )
+        self.assertEqual(Launch.objects.get(document_id='doc-2').updated_at, '2025-02-01T00:00:00.000Z')
+
+        counts = self.sync([launch(4), launch(1), launch(2, updated_at='2025-02-01T00:00:00.000Z')])
+        self.assertEqual(counts['unchanged'], 3)
+
+    def test_rows_inserted_by_a_concurrent_sync_do_not_fail_the_sync(self):
+        in_bulk = Launch.objects.in_bulk
+
+        def race(*args, **kwargs):
+            # Another sync inserts doc-1 after this one read the store
+            row = Launch(document_id='doc-1')
+            row.apply(launch(1), 0)
+            row.save()
+            return in_bulk(*args, **kwargs)
+
+        with mock.patch.object(Launch.objects, 'in_bulk', side_effect=race):
+            self.sync([launch(1), launch(2)])
+
+        self.assertEqual(list(Launch.objects.values_list('document_id', flat=True)), ['doc-1', 'doc-2'])
+        self.assertEqual(self.sync([launch(1), launch(2)])['unchanged'], 2)
+
+    def test_store_job_is_registered_only_when_serving_from_store(self):
+        for serve_from_store in (False, True):
+            scheduler = RefreshScheduler()
+            with override_settings(SERVE_FROM_STORE=serve_from_store), \
+                    mock.patch('apps.upstream.scheduler.refresh_scheduler', scheduler):
+                apps.get_app_config('launches').ready()
+
+            self.assertIn('launches', scheduler.jobs)
+            self.assertEqual('launches_store' in scheduler.jobs, serve_from_store)
+
+    @override_settings(SERVE_FROM_STORE=True)
+    def test_launches_view_serves_from_store(self):
+        self.sync([launch(1), launch(2)])
+
+        # The upstream is unreachable now; the store still answers
+        with registry.override(launches='http://127.0.0.1:9/launches'):
+            response = LaunchesAPIView.as_view()(RequestFactory().get('/launches/'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['data']['total_launches'], 2)
+        self.assertEqual(response.data['data']['launches'][0], launch(1))
+
+
+class LaunchFilterTests(UpstreamTestCase):
+    launches = [
+        dict(launch(1), launchDate='2024-12-30'),
+        dict(launch(2), vehicle='Falcon Heavy', launchDate='2025-01-05'),
+        dict(launch(3), missionType='crew', launchSite='LC-39A', launchDate='2025-02-01', isLive=True),
+        dict(launch(4), missionStatus='upcoming', launchDate='2025-03-15'),
+    ]
+
+    def get(self, **params):
+        with FakeUpstream({'/launches': {'data': {'launches': self.launches}}}) as upstream:
+            with registry.override(launches=f"{upstream.url}/launches"):
+                response = LaunchesAPIView.as_view()(RequestFactory().get('/launches/', params))
+        if response.status_code != 200:
+            return response.status_code
+        return [record['id'] for record in response.data['data']['launches']]
+
+    def test_categorical_filters(self):
+        self.assertEqual(self.get(vehicle='falcon heavy'), [2])
+        self.assertEqual(self.get(vehicle='Falcon 9', missionType='starlink'), [1, 4])
+        self.assertEqual(self.get(missionStatus='complete,upcoming', launchSite='SLC-40'), [1, 2, 4])
+        self.assertEqual(self.get(isLive='true'), [3])
+        self.assertEqual(self.get(vehicle='Starship'), [])
+
+    def test_date_range_is_inclusive_and_combines_with_filters(self):
+        self.assertEqual(self.get(**{'from': '2025-01-01'}), [2, 3, 4])
+        self.assertEqual(self.get(**{'from': '2025-01-05', 'to': '2025-02-01'}), [2, 3])
+        self.assertEqual(self.get(to='2025-02-01', vehicle='Falcon 9'), [1, 3])
+        self.assertEqual(self.get(to='2025-03-15', sort='datetime'), [4, 3, 2, 1])
+
+    def test_multi_key_sorting(self):
+        self.assertEqual(self.get(sort='-launchDate'), [4, 3, 2, 1])
+        self.assertEqual(self.get(sort='launchDate'), [1, 2, 3, 4])
+        self.assertEqual(self.get(sort='vehicle,-launchDate'), [4, 3, 1, 2])
+        self.assertEqual(self.get(sort='-launchDate', missionStatus='complete'), [3, 2, 1])
+
+    def test_invalid_values_are_rejected(self):
+        self.assertEqual(self.get(**{'from': '01/02/2025'}), 400)
+        self.assertEqual(self.get(isLive='maybe'), 400)
+        self.assertEqual(self.get(sort='-rocket'), 400)
+
+    def test_sparse_fieldsets(self):
+        with FakeUpstream({'/launches': {'data': {'launches': self.launches}}}) as upstream:
+            with registry.override(launches=f"{upstream.url}/launches"):
+                def get(query):
+                    return LaunchesAPIView.as_view()(RequestFactory().get(f'/launches/?{query}')).data['data']
+
+                first = get('fields=id,title&sort=datetime&isLive=false')
+                second = get('fields=title,id&sort=datetime&isLive=false')
+                excluded = get('exclude=documentId,updatedAt')
+
+        self.assertEqual(first['total_launches'], 3)
+        self.assertEqual(first['launches'][0], {'id': 4, 'title': 'Mission 4'})
+        # The projected records are cached per field set
+        self.assertIs(second['launches'][0], first['launches'][0])
+        self.assertNotIn('documentId', excluded['launches'][0])
+        self.assertIn('vehicle', excluded['launches'][0])
+        self.assertEqual(self.get(fields='title..id'), 400)
+
+    def test_indexes_are_built_once_per_snapshot(self):
+        with FakeUpstream({'/launches': {'data': {'launches': self.launches}}}) as upstream:
+            with registry.override(launches=f"{upstream.url}/launches"):
+                snapshot = get_launch_snapshot()
+                snapshot.select(filters={'vehicle': {'falcon 9'}})
+                self.assertIs(get_launch_snapshot(), snapshot)
+                self.assertIs(get_launch_snapshot().index('vehicle'), snapshot.index('vehicle'))
+
+    def test_only_the_smallest_candidate_set_is_listed(self):
+        snapshot = LaunchSnapshot(self.launches)
+        selection = snapshot.select(
+            filters={'vehicle': {'falcon heavy'}, 'missionStatus': {'complete', 'upcoming'}},
+            date_from=parse_date('2024-01-01'),
+        )
+        self.assertEqual([record['id'] for record in selection], [2])
+
+        # The other filters probe sets memoized per value and the dates by
+        # position instead of building a set of their whole candidate lists
+        self.assertNotIn(('value_positions', 'vehicle', 'falcon heavy'), snapshot._indexes)
+        self.assertIn(('value_positions', 'missionStatus', 'complete'), snapshot._indexes)
+        self.assertIn(('value_positions', 'missionStatus', 'upcoming'), snapshot._indexes)
+        with mock.patch('apps.upstream.snapshot.set', side_effect=AssertionError('built a set'), create=True), \
+                mock.patch('apps.upstream.snapshot.frozenset', side_effect=AssertionError('built a set'), create=True):
+            again = snapshot.select(filters={'missionStatus': {'complete'}, 'vehicle': {'falcon heavy'}}, date_from=parse_date('2025-01-05'))
+        self.assertEqual(list(again.positions), [1])
+        self.assertEqual(snapshot.select(filters={'vehicle': {'falcon 9'}}, date_to=parse_date('2025-01-05')).positions, [0])
+
+    def test_items_that_are_not_dicts_do_not_fail_the_list(self):
+        with mock.patch.object(self, 'launches', [*self.launches, None, 'not a launch']):
+            self.assertEqual(self.get(vehicle='falcon 9'), [1, 3, 4])
+            with FakeUpstream({'/launches': {'data': {'launches': self.launches}}}) as upstream:
+                with registry.override(launches=f"{upstream.url}/launches"):
+                    response = LaunchesAPIView.as_view()(RequestFactory().get('/launches/', {'sort': 'datetime'}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['data']['launches'][-2:], [None, 'not a launch'])
+
+    def test_refresh_job_builds_the_snapshot(self):
+        launch_snapshots.clear()
+        with FakeUpstream({'/launches': {'data': {'launches': self.launches}}}) as upstream:
+            with registry.override(launches=f"{upstream.url}/launches"):
+                snapshot = refresh_launches()
+                with mock.patch.object(LaunchSnapshot, '__init__', side_effect=AssertionError('built on request')):
+                    response = LaunchesAPIView.as_view()(RequestFactory().get('/launches/'))
+                    self.assertIs(get_launch_snapshot(), snapshot)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(upstream.requests, ['/launches'])
+
+    def test_upstream_cache_keeps_the_snapshot_instead_of_the_decoded_payload(self):
+        launch_snapshots.clear()
+        with FakeUpstream({'/launches': {'data': {'launches': [*self.launches, None]}}}) as upstream:
+            with registry.override(launches=f"{upstream.url}/launches"):
+                snapshot = get_launch_snapshot()
+                self.assertIs(upstream_cache.get(cache_key('launches')).data, snapshot)
+                self.assertIsInstance(snapshot.records, ColumnarRecords)
+
+                # Another worker reads the snapshot back from the cache backend
+                upstream_cache.clear()
+                launch_snapshots.clear()
+                with mock.patch.object(LaunchSnapshot, '__init__', side_effect=AssertionError('built on request')):
+                    restored = get_launch_snapshot()
+                    response = LaunchesAPIView.as_view()(RequestFactory().get('/launches/', {'sort': 'datetime', 'vehicle': 'falcon 9'}))
+
+        self.assertIsNot(restored, snapshot)
+        self.assertEqual(restored.version, snapshot.version)
+        self.assertEqual(list(restored.records), [*self.launches, None])
+        self.assertEqual([record['id'] for record in response.data['data']['launches']], [4, 3, 1])
+        self.assertEqual(upstream.requests, ['/launches'])
+
+    def test_repeated_sort_fields_keep_their_first_direction(self):
+        self.assertEqual(LaunchSnapshot.parse_order('title,title,-title'), (('title', False),))
+        self.assertEqual(
+            LaunchSnapshot.parse_order('-launchDate,vehicle,datetime,launchDate,-vehicle'),
+            (('launchDate', True), ('vehicle', False)),
+        )
+        self.assertEqual(self.get(sort='-launchDate,launchDate,' * 100), [4, 3, 2, 1])
+
+    def test_only_recent_orderings_are_kept(self):
+        snapshot = LaunchSnapshot(self.launches)
+        orders = [LaunchSnapshot.parse_order(sort) for sort in ('title', '-title', 'vehicle', '-vehicle', 'launchDate')]
+        with mock.patch.object(LaunchSnapshot, 'max_recent', 4):
+            for order in orders:
+                snapshot.select(filters={'vehicle': {'falcon 9'}}, order=order)
+            first = snapshot.ordering(orders[-1])
+
+            self.assertEqual(len(snapshot._recent), 4)
+            self.assertNotIn(('rank', orders[0]), snapshot._recent)
+            self.assertIs(snapshot.ordering(orders[-1]), first)
+            self.assertEqual(snapshot.ordering(orders[0]), [0, 1, 2, 3])
+
+    def test_only_recent_projections_are_kept(self):
+        snapshot = LaunchSnapshot(self.launches)
+        records = snapshot.select()
+        with mock.patch.object(LaunchSnapshot, 'max_recent', 2):
+            first = snapshot.project(records, Projection.from_params({'fields': 'id'}))
+            self.assertIs(snapshot.project(records, Projection.from_params({'fields': 'id'}))[0], first[0])
+            for fields in ('title', 'vehicle', 'launchSite'):
+                snapshot.project(records, Projection.from_params({'fields': fields}))
+            again = snapshot.project(records, Projection.from_params({'fields': 'id'}))
+
+        self.assertEqual(len(snapshot._recent), 2)
+        self.assertIsNot(again[0], first[0])
+        self.assertEqual(again, first)
+
+
+class LaunchAnalyticsTests(UpstreamTestCase):
+    launches = [
+        dict(launch(1), launchDate='2024-12-30', launchTime='06:00:00'),
+        dict(launch(2), vehicle='Falcon Heavy', launchDate='2025-01-05', launchTime='18:00:00'),
+        dict(launch(3), launchSite='LC-39A', missionType='crew', launchDate='2025-01-06'),
+        dict(launch(4), launchDate='2025-03-15', launchTime='00:00:00'),
+        dict(launch(5), launchDate='not a date'),
+    ]
+
+    def get(self):
+        with FakeUpstream({'/launches': {'data': {'launches': self.launches}}}) as upstream:
+            with registry.override(launches=f"{upstream.url}/launches"):
+                response = self.client.get('/launches/analytics/')
+                return response, get_launch_snapshot()
+
+    def test_counts_cadence_and_intervals(self):
+        response, snapshot = self.get()
+        data = response.json()['data']
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((data['total_launches'], data['dated_launches']), (5, 4))
+        self.assertEqual((data['first_launch'], data['last_launch']), ('2024-12-30T06:00:00Z', '2025-03-15T00:00:00Z'))
+        self.assertEqual(data['per_year'], [{'year': 2024, 'launches': 1}, {'year': 2025, 'launches': 3}])
+
+        monthly = data['cadence']['monthly']
+        self.assertEqual([(month['month'], month['launches']) for month in monthly], [('2024-12', 1), ('2025-01', 2), ('2025-02', 0), ('2025-03', 1)])
+        self.assertEqual([month['last_30_days'] for month in monthly], [1, 2, 0, 1])
+        self.assertEqual([month['last_90_days'] for month in monthly], [1, 3, 3, 3])
+        self.assertEqual(data['cadence']['current'], {'last_30_days': 1, 'last_90_days': 4, 'last_365_days': 4})
+
+        intervals = data['intervals']
+        self.assertEqual(intervals['count'], 3)
+        self.assertEqual((intervals['min_days'], intervals['max_days']), (0.75, 67.5))
+        self.assertEqual(intervals['percentiles_days']['p50'], 6.5)
+        self.assertEqual({row['min_days']: row['intervals'] for row in intervals['histogram'] if row['intervals']}, {0: 1, 4: 1, 60: 1})
+
+        self.assertEqual(data['by_vehicle'][0], {
+            'vehicle': 'Falcon 9', 'launches': 3, 'first_launch': '2024-12-30T06:00:00Z',
+            'last_launch': '2025-03-15T00:00:00Z', 'mean_interval_days': 37.38,
+        })
+        self.assertEqual(data['by_vehicle'][1]['mean_interval_days'], None)
+        self.assertEqual([(row['missionType'], row['launches']) for row in data['by_mission_type']], [('starlink', 3), ('crew', 1)])
+        self.assertEqual(len(data['by_launch_site']), 2)
+
+        # Computed once per snapshot
+        self.assertIs(launch_analytics(snapshot), launch_analytics(snapshot))
+        self.assertEqual(len(launch_arrays(snapshot)), 4)
+
+    def test_answers_not_modified_without_recomputing(self):
+        first, snapshot = self.get()
+        with FakeUpstream({'/launches': {'data': {'launches': self.launches}}}) as upstream:
+            with registry.override(launches=f"{upstream.url}/launches"):
+                with mock.patch('apps.launches.views.launch_analytics') as analytics:
+                    not_modified = self.client.get('/launches/analytics/', headers={'if_none_match': first['ETag']})
+
+        self.assertEqual(not_modified.status_code, 304)
+        analytics.assert_not_called()
+
+    def test_no_dated_launches(self):
+        self.launches = [dict(launch(1), launchDate=None)]
+        data = self.get()[0].json()['data']
+
+        self.assertEqual((data['total_launches'], data['dated_launches']), (1, 0))
+        self.assertEqual(data['intervals']['count'], 0)
+        self.assertEqual(data['by_vehicle'], [])
+
+
+class LaunchPaginationTests(UpstreamTestCase):
+    def get(self, launches, url='/launches/?page_size=2'):
+        with FakeUpstream({'/launches': {'data': {'launches': launches}}}) as upstream:
+            with registry.override(launches=f"{upstream.url}/launches"):
+                response = LaunchesAPIView.as_view()(RequestFactory().get(url))
+        return response.status_code, response.data['data']
+
+    def follow(self, link):
+        parts = urlsplit(link)
+        return f"{parts.path}?{parts.query}"
+
+    def ids(self, data):
+        return [record['id'] for record in data['launches']]
+
+    def test_cursor_walks_every_page_with_total_as_metadata(self):
+        launches = [launch(i) for i in range(1, 6)]
+        pages = []
+        url = '/launches/?page_size=2'
+        while url:
+            status_code, data = self.get(launches, url)
+            self.assertEqual(status_code, 200)
+            self.assertEqual(data['total_launches'], 5)
+            pages.append(self.ids(data))
+            url = data['next'] and self.follow(data['next'])
+
+        self.assertEqual(pages, [[1, 2], [3, 4], [5]])
+        self.assertEqual(dict(parse_qsl(urlsplit(data['previous']).query))['page_size'], '2')
+        self.assertEqual(self.ids(self.get(launches, self.follow(data['previous']))[1]), [3, 4])
+
+    def test_pages_stay_consistent_when_the_data_changes(self):
+        launches = [launch(i) for i in range(1, 6)]
+        _, first = self.get(launches)
+        next_url = self.follow(first['next'])
+
+        # A refresh adds a launch at the top of the list
+        self.reset_upstream()
+        refreshed = [launch(0)] + launches
+        _, second = self.get(refreshed, next_url)
+        self.assertEqual(self.ids(second), [3, 4])
+        self.assertEqual(second['total_launches'], 5)
+
+        # Without the old snapshot the page resumes at the cursor's launch
+        launch_snapshots.clear()
+        self.reset_upstream()
+        _, third = self.get(refreshed, next_url)
+        self.assertEqual(self.ids(third), [3, 4])
+        self.assertEqual(third['total_launches'], 6)
+
+    def test_invalid_cursor_or_page_size_is_rejected(self):
+        launches = [launch(1)]
+        self.assertEqual(self.get(launches, '/launches/?cursor=not-a-cursor')[0], 400)
+        self.assertEqual(self.get(launches, '/launches/?page_size=0')[0], 400)
+
+
+class LaunchDetailCrawlerTests(UpstreamTestCase, TransactionTestCase):
+    # The async view reads the mirror from another thread, so the data must be committed
+
+    def crawl(self, launches, **kwargs):
+        payloads = {'/launches': {'data': {'launches': launches}}}
+        for record in launches:
+            payloads[f"/detail/{record['link']}"] = dict(detail(record['link']), documentId=record['documentId'])
+        with CountingUpstream(payloads) as upstream:
+            with registry.override(launches=f"{upstream.url}/launches", launch_detail=f"{upstream.url}/detail"):
+                self.reset_upstream()
+                counts = crawl_launch_details(**kwargs)
+        return counts, [path for path in upstream.requests if path.startswith('/detail/')]
+
+    def test_only_new_or_updated_launches_are_crawled(self):
+        counts, fetched = self.crawl([launch(1), launch(2)], rate=0)
+        self.assertEqual(counts['crawled'], 2)
+        self.assertEqual(sorted(fetched), ['/detail/mission-1', '/detail/mission-2'])
+
+        counts, fetched = self.crawl([launch(1), launch(2, updated_at='2025-02-01T00:00:00.000Z'), launch(3)], rate=0)
+        self.assertEqual(sorted(fetched), ['/detail/mission-2', '/detail/mission-3'])
+        self.assertEqual(counts['skipped'], 1)
+        self.assertEqual(LaunchDetail.objects.get(link='mission-2').updated_at, '2025-02-01T00:00:00.000Z')
+
+    def test_items_that_are_not_launches_are_skipped(self):
+        payloads = {'/launches': {'data': {'launches': [launch(1), None, 'mission-2', ['mission-3']]}}}
+        payloads['/detail/mission-1'] = dict(detail('mission-1'), documentId='doc-1')
+        with CountingUpstream(payloads) as upstream:
+            with registry.override(launches=f"{upstream.url}/launches", launch_detail=f"{upstream.url}/detail"):
+                counts = crawl_launch_details(rate=0)
+
+        self.assertEqual(counts['crawled'], 1)
+        self.assertEqual(counts['skipped'], 3)
+        self.assertEqual([path for path in upstream.requests if path.startswith('/detail/')], ['/detail/mission-1'])
+
+    def test_rate_limit_spaces_out_requests(self):
+        started = time.perf_counter()
+        counts, fetched = self.crawl([launch(i) for i in range(5)], concurrency=5, rate=20)
+        self.assertEqual(counts['crawled'], 5)
+        self.assertGreaterEqual(time.perf_counter() - started, 0.2)
+
+    @override_settings(SERVE_FROM_STORE=True)
+    def test_detail_view_serves_from_mirror_and_falls_back_to_upstream(self):
+        self.crawl([launch(1)], rate=0)
+        mirrored = LaunchDetail.objects.get(link='mission-1').data
+
+        with FakeUpstream({'/detail/mission-2': detail('mission-2')}) as upstream:
+            with registry.override(launch_detail=f"{upstream.url}/detail"):
+                for view, factory in ((LaunchDetailAPIView, RequestFactory()), (AsyncLaunchDetailAPIView, AsyncRequestFactory())):
+                    self.reset_upstream()
+                    responses = []
+                    for link in ('mission-1', 'mission-2'):
+                        response = view.as_view()(factory.get(f'/launches/{link}/'), link=link)
+                        if asyncio.iscoroutine(response):
+                            response = asyncio.run(response)
+                        responses.append(response)
+
+                    self.assertEqual(responses[0].data['data'], mirrored)
+                    self.assertEqual(responses[1].data['data']['title'], 'mission-2')
+
+        self.assertEqual(upstream.requests, ['/detail/mission-2', '/detail/mission-2'])
+
+    @override_settings(SERVE_FROM_STORE=True)
+    def test_mirrored_detail_is_versioned_by_crawl_time(self):
+        self.crawl([launch(1)], rate=0)
+
+        def get(**headers):
+            request = RequestFactory().get('/launches/mission-1/', HTTP_ACCEPT='application/json', **headers)
+            return LaunchDetailAPIView.as_view()(request, link='mission-1')
+
+        with mock.patch('apps.upstream.conditional.json.dumps', side_effect=AssertionError('hashed the mirrored data')):
+            etag = get()['ETag']
+            self.assertEqual(get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # A crawl stores the detail again, so its representation may have changed
+        self.crawl([launch(1)], rate=0, force=True)
+        response = get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
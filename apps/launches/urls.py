@@ -1,10 +1,16 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 app_name = 'launches'
 
+# Serve the async views when deployed under ASGI
+ASYNC_VIEWS = settings.UPSTREAM.get('ASYNC_VIEWS', False)
+
 urlpatterns = [
-    path('', views.LaunchesAPIView.as_view(), name='spacex-launches'),
+    path('', (views.AsyncLaunchesAPIView if ASYNC_VIEWS else views.LaunchesAPIView).as_view(), name='spacex-launches'),
     path('health/', views.HealthCheckView.as_view(), name='health-check'),
-    path('<str:link>/', views.LaunchDetailAPIView.as_view(), name='launch-detail'),
+    path('batch/', (views.AsyncLaunchBatchAPIView if ASYNC_VIEWS else views.LaunchBatchAPIView).as_view(), name='launch-batch'),
+    path('analytics/', (views.AsyncLaunchAnalyticsAPIView if ASYNC_VIEWS else views.LaunchAnalyticsAPIView).as_view(), name='launch-analytics'),
+    path('<str:link>/', (views.AsyncLaunchDetailAPIView if ASYNC_VIEWS else views.LaunchDetailAPIView).as_view(), name='launch-detail'),
 ]
@@ -1,185 +1,404 @@
-import base64
-import hashlib
-import requests
-from cryptography.fernet import Fernet
-from django.conf import settings
+import re
+import asyncio
 import logging
-from datetime import datetime, time, date
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time, timezone
+from django.db.models import Count, Max
+from apps.upstream.client import get_endpoint_options
+from apps.upstream.schema import CompiledSerializer
+from apps.upstream.snapshot import Snapshot, SnapshotCache, index_value, parse_date, sort_value
+from apps.upstream.utils import afetch_json, fetch_json, serve_from_store
 from .exceptions import APIError, NotFoundError, ValidationError
+from .models import Launch, LaunchDetail
+from .serializers import LaunchDetailSerializer
 
 logger = logging.getLogger(__name__)
 
+LINK_PATTERN = re.compile(r'^[a-zA-Z0-9\-_]+$')
 
-def decrypt_url(encrypted_data, key):
+# Validates launch details like LaunchDetailSerializer, with compiled checks
+launch_detail_schema = CompiledSerializer(LaunchDetailSerializer)
+
+# Encrypted upstream URLs, registered with the endpoint registry at startup
+LAUNCHES_ENCRYPTED_URL = "gAAAAABotdgnMa5IuX_1uk7RhNLrojiAhUigJo_lfJt8izk6hZ-Huc92Kr3P57udOx1dJ3bHyfbCXmUpWfNi-sSF6BPfgfnZ5pRnabt6eVn7cnA7NsvaNmeCVUl-KKDdsGGJGZpa6TUWhxPXPdVkLfq00UvLf-TpsVacm0nj4aaMVmH1vIYXKnw="
+LAUNCH_DETAIL_ENCRYPTED_URL = "gAAAAABotqX39erTnt50rCjm_vpcCHhSGOvx1mBL9AtkHHEyKssHQaqPtbwc8lZ7E759sdrfDcLioYi9NjgRGfYaQ3Xp3JJimaIMPD_XCX15pCubNz6hW3SCAfq-5y3mXPbKUgqknG-nTlLrCKp_yatbWynvVuTdcw=="
+
+
+def fetch_launches_data(refresh=False):
+    """
+    Fetch the launches data from the upstream API, as the LaunchSnapshot the
+    launches endpoint caches in place of the decoded payload (see load_launches()).
+    """
+    return fetch_json('launches', label='launches data', refresh=refresh)
+
+
+async def afetch_launches_data(refresh=False):
+    """
+    Async version of fetch_launches_data().
     """
-    Decrypt the encrypted URL using the provided key.
+    return await afetch_json('launches', label='launches data', refresh=refresh)
+
+
+def validate_link(link):
     """
-    # Create a proper Fernet key from the Django secret key
-    hashed_key = hashlib.sha256(key.encode()).digest()
-    fernet_key = base64.urlsafe_b64encode(hashed_key)
+    Validate a launch link parameter to prevent injection.
+    """
+    if not link or not isinstance(link, str) or len(link) > 100:
+        raise ValidationError("Invalid launch identifier provided.")
     
-    # Create Fernet cipher
-    cipher = Fernet(fernet_key)
+    # Basic sanitization
+    if not LINK_PATTERN.match(link):
+        raise ValidationError("Launch identifier contains invalid characters.")
+
+
+def fetch_launch_detail(link, refresh=False):
+    """
+    Fetch specific launch data from the launch detail API using the link parameter.
+    """
+    validate_link(link)
     
-    # Decrypt the URL
-    decrypted_url = cipher.decrypt(encrypted_data.encode())
+    return fetch_json('launch_detail', link, label=f'launch detail for link {link}', refresh=refresh)
+
+
+async def afetch_launch_detail(link, refresh=False):
+    """
+    Async version of fetch_launch_detail().
+    """
+    validate_link(link)
     
-    return decrypted_url.decode()
+    return await afetch_json('launch_detail', link, label=f'launch detail for link {link}', refresh=refresh)
+
 
 
-def fetch_launches_data():
+def get_mirrored_launch_detail(link):
     """
-    Decrypt the launches API URL and fetch the data.
+    Return (data, version) for the mirrored detail of a launch, or None when
+    SERVE_FROM_STORE is off or the launch has not been crawled. The version is
+    the time the detail was crawled, which changes whenever the data does.
     """
-    encrypted_url = "gAAAAABotdgnMa5IuX_1uk7RhNLrojiAhUigJo_lfJt8izk6hZ-Huc92Kr3P57udOx1dJ3bHyfbCXmUpWfNi-sSF6BPfgfnZ5pRnabt6eVn7cnA7NsvaNmeCVUl-KKDdsGGJGZpa6TUWhxPXPdVkLfq00UvLf-TpsVacm0nj4aaMVmH1vIYXKnw="
-    secret_key = settings.SECRET_KEY
+    if not serve_from_store():
+        return None
     
-    try:
-        # Decrypt the URL
-        decrypted_url = decrypt_url(encrypted_url, secret_key)
-        
-        # Make the API request
-        response = requests.get(decrypted_url, timeout=30)
-        response.raise_for_status()
-        
-        return response.json()
-    
-    except requests.exceptions.Timeout:
-        logger.error("Timeout occurred while fetching launches data")
-        raise APIError("Service temporarily unavailable. Please try again later.")
-    
-    except requests.exceptions.ConnectionError:
-        logger.error("Connection error occurred while fetching launches data")
-        raise APIError("Unable to connect to data source. Please try again later.")
-    
-    except requests.exceptions.HTTPError as e:
-        logger.error(f"HTTP error occurred while fetching launches data: {e.response.status_code}")
-        if e.response.status_code == 404:
-            raise NotFoundError("Launches data not found.")
-        elif e.response.status_code >= 500:
-            raise APIError("External service error. Please try again later.")
+    mirrored = LaunchDetail.objects.filter(link=link).values_list('data', 'crawled_at').first()
+    if mirrored is None:
+        return None
+    data, crawled_at = mirrored
+    return data, crawled_at.isoformat()
+
+
+async def ahas_mirrored_launch_detail(link):
+    """
+    Whether get_mirrored_launch_detail() has the launch, without blocking the event loop.
+    """
+    return serve_from_store() and await LaunchDetail.objects.filter(link=link).aexists()
+
+
+def parse_links(value):
+    """
+    Parse a comma-separated ``links`` query parameter into unique links, in order.
+    """
+    links = []
+    for link in (value or '').split(','):
+        link = link.strip()
+        if link and link not in links:
+            links.append(link)
+    return links
+
+
+def partition_links(links):
+    """
+    Split links into those that pass validate_link() and those that do not.
+    """
+    valid, invalid = [], []
+    for link in links:
+        try:
+            validate_link(link)
+        except ValidationError:
+            invalid.append(link)
         else:
-            raise APIError("Failed to retrieve launches data.")
+            valid.append(link)
+    return valid, invalid
+
+
+def fetch_launch_details(links, concurrency=None):
+    """
+    Fetch the details of several launches concurrently.
+    
+    Args:
+        links: Launch links, already validated
+        concurrency: Maximum number of details fetched at once; defaults to
+            the launch_detail endpoint's BATCH_CONCURRENCY option
+    
+    Returns:
+        Dict of link -> (raw data, error)
+    """
+    if concurrency is None:
+        concurrency = get_endpoint_options('launch_detail').get('BATCH_CONCURRENCY', 8)
+    
+    def fetch(link):
+        try:
+            return fetch_launch_detail(link), None
+        except Exception as e:
+            return None, e
     
-    except Exception as e:
-        logger.error(f"Unexpected error fetching launches data: {str(e)}")
-        raise APIError("An unexpected error occurred. Please try again later.")
+    if not links:
+        return {}
+    
+    # Each worker runs in a copy of the caller's context so stale payloads
+    # (and, in async views, prefetched ones) are seen as usual
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(links)))) as executor:
+        futures = [executor.submit(contextvars.copy_context().run, fetch, link) for link in links]
+        return {link: future.result() for link, future in zip(links, futures)}
 
 
-def fetch_launch_detail(link):
+async def afetch_launch_details(links, concurrency=None):
     """
-    Decrypt the launch detail API URL and fetch specific launch data using the link parameter.
+    Async version of fetch_launch_details().
     """
-    # Validate link parameter to prevent injection
-    if not link or not isinstance(link, str) or len(link) > 100:
-        raise ValidationError("Invalid launch identifier provided.")
+    if concurrency is None:
+        concurrency = get_endpoint_options('launch_detail').get('BATCH_CONCURRENCY', 8)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
     
-    # Basic sanitization
-    import re
-    if not re.match(r'^[a-zA-Z0-9\-_]+$', link):
-        raise ValidationError("Launch identifier contains invalid characters.")
+    async def fetch(link):
+        async with semaphore:
+            try:
+                return await afetch_launch_detail(link), None
+            except Exception as e:
+                return None, e
     
-    encrypted_detail_url = "gAAAAABotqX39erTnt50rCjm_vpcCHhSGOvx1mBL9AtkHHEyKssHQaqPtbwc8lZ7E759sdrfDcLioYi9NjgRGfYaQ3Xp3JJimaIMPD_XCX15pCubNz6hW3SCAfq-5y3mXPbKUgqknG-nTlLrCKp_yatbWynvVuTdcw=="
-    secret_key = settings.SECRET_KEY
+    results = await asyncio.gather(*[fetch(link) for link in links])
+    return dict(zip(links, results))
+
+
+def extract_launches(raw_data):
+    """
+    Return the list of launches from a launches API response, whatever its shape.
+    """
+    launches_list = []
+    if isinstance(raw_data, Snapshot):
+        # The cached launches payload is already a snapshot of the list
+        launches_list = raw_data.records
+    elif isinstance(raw_data, dict):
+        # If the response has a 'data' key with launches inside
+        if 'data' in raw_data and 'launches' in raw_data['data']:
+            launches_list = raw_data['data']['launches']
+        # If the response has launches directly
+        elif 'launches' in raw_data:
+            launches_list = raw_data['launches']
+        # If the response is just a list of launches
+        elif isinstance(raw_data.get('data'), list):
+            launches_list = raw_data['data']
+    elif isinstance(raw_data, list):
+        # If the response is directly a list of launches
+        launches_list = raw_data
     
-    try:
-        # Decrypt the base URL
-        decrypted_base_url = decrypt_url(encrypted_detail_url, secret_key)
-        
-        # Construct the full URL with the link parameter
-        detail_url = f"{decrypted_base_url}/{link}"
-        
-        # Make the API request
-        response = requests.get(detail_url, timeout=30)
-        response.raise_for_status()
+    return launches_list
+
+
+def sync_launches():
+    """
+    Sync the local launch store with the upstream launches list.
+    """
+    counts = Launch.sync(extract_launches(fetch_launches_data()))
+    logger.info(f"Synced launch store: {counts}")
+    # Build the snapshot of the synced data now rather than on the next request
+    get_launch_snapshot()
+    return counts
+
+
+class LaunchSnapshot(Snapshot):
+    """
+    One version of the launches list with its filter indexes, stored by
+    column.
+    """
+    columnar = True
+    filter_fields = {
+        'vehicle': 'vehicle',
+        'launchSite': 'launchSite',
+        'missionType': 'missionType',
+        'missionStatus': 'missionStatus',
+        'isLive': 'isLive',
+    }
+    date_field = 'launchDate'
+    sort_fields = {
+        'launchDate': lambda launch: get_launch_timestamp(launch),
+        'title': lambda launch: sort_value(launch.get('title')),
+        'vehicle': lambda launch: sort_value(launch.get('vehicle')),
+        'launchSite': lambda launch: sort_value(launch.get('launchSite')),
+        'missionType': lambda launch: sort_value(launch.get('missionType')),
+        'missionStatus': lambda launch: sort_value(launch.get('missionStatus')),
+    }
+    sort_aliases = {'datetime': '-launchDate'}
+
+
+launch_snapshots = SnapshotCache(LaunchSnapshot)
+
+
+def get_launch_snapshot():
+    """
+    Return the snapshot of the current launches list, read from the local
+    store when SERVE_FROM_STORE is set and the store has been synced,
+    otherwise from upstream.
+    
+    Snapshots (and their indexes) are reused for as long as the underlying
+    data does not change: the cached upstream payload object, or the store's
+    row count and latest sync time.
+    """
+    if serve_from_store():
+        state = Launch.objects.aggregate(count=Count('id'), synced_at=Max('synced_at'))
+        if state['count']:
+            return launch_snapshots.get(('store', state['count'], state['synced_at']), Launch.load)
+    
+    return get_upstream_launch_snapshot(fetch_launches_data())
+
+
+def load_launches(raw_data):
+    """
+    Build the snapshot of a decoded launches payload (the loader of the
+    launches endpoint). The upstream cache keeps the compact snapshot, so
+    the decoded dicts are released as soon as it is built.
+    """
+    return LaunchSnapshot(extract_launches(raw_data))
+
+
+def get_upstream_launch_snapshot(raw_data):
+    """
+    Return the snapshot of a launches payload fetched from upstream, retained
+    with the other recent snapshots for as long as that payload is current.
+    """
+    def load():
+        return raw_data if isinstance(raw_data, LaunchSnapshot) else extract_launches(raw_data)
+    return launch_snapshots.get(('upstream', id(raw_data)), load, source=raw_data)
+
+
+def refresh_launches():
+    """
+    Refresh the cached launches list and build the snapshot of the new
+    version right away, so the first request after a change does not pay
+    for building it (the refresh job of the launches endpoint).
+    """
+    return get_upstream_launch_snapshot(fetch_launches_data(refresh=True))
+
+
+def parse_launch_filters(params):
+    """
+    Parse the launches list filter and sort query parameters.
+    
+    ``vehicle``, ``launchSite``, ``missionType``, ``missionStatus`` and
+    ``isLive`` accept comma-separated values (any of which may match, case
+    insensitively); ``from`` and ``to`` bound ``launchDate`` (YYYY-MM-DD,
+    inclusive). ``sort`` takes comma-separated sort fields, each prefixed
+    with ``-`` for descending order; ``sort=datetime`` is ``-launchDate``.
+    
+    Returns:
+        Keyword arguments for LaunchSnapshot.select()
         
-        return response.json()
-    
-    except requests.exceptions.Timeout:
-        logger.error(f"Timeout occurred while fetching launch detail for link: {link}")
-        raise APIError("Service temporarily unavailable. Please try again later.")
-    
-    except requests.exceptions.ConnectionError:
-        logger.error(f"Connection error occurred while fetching launch detail for link: {link}")
-        raise APIError("Unable to connect to data source. Please try again later.")
-    
-    except requests.exceptions.HTTPError as e:
-        logger.error(f"HTTP error occurred while fetching launch detail for link {link}: {e.response.status_code}")
-        if e.response.status_code == 404:
-            raise NotFoundError("Launch not found. Please check the launch identifier and try again.")
-        elif e.response.status_code >= 500:
-            raise APIError("External service error. Please try again later.")
-        else:
-            raise APIError("Failed to retrieve launch details.")
+    Raises:
+        ValidationError: If a date, isLive or sort value is invalid
+    """
+    filters = {}
+    for name in LaunchSnapshot.filter_fields:
+        value = params.get(name)
+        if value is None:
+            continue
+        values = {index_value(item) for item in value.split(',') if item.strip()}
+        if name == 'isLive':
+            values = {{'1': 'true', '0': 'false'}.get(item, item) for item in values}
+            if not values <= {'true', 'false'}:
+                raise ValidationError("isLive must be true or false.")
+        if values:
+            filters[name] = values
+    
+    bounds = {}
+    for name in ('from', 'to'):
+        value = params.get(name)
+        if not value:
+            continue
+        try:
+            bounds[name] = datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise ValidationError(f"{name} must be a date in YYYY-MM-DD format.")
+    
+    return {
+        'filters': filters,
+        'date_from': bounds.get('from'),
+        'date_to': bounds.get('to'),
+        'order': LaunchSnapshot.parse_order(params.get('sort')),
+    }
+
+
+def warm_launch_details(limit=None):
+    """
+    Refresh the cached details of the most recent launches in the launches list.
+    
+    Args:
+        limit: Number of most recent launches to refresh; defaults to the
+            launch_detail endpoint's WARM_LIMIT option (None refreshes all)
+    """
+    if limit is None:
+        limit = get_endpoint_options('launch_detail').get('WARM_LIMIT')
+    
+    snapshot = get_upstream_launch_snapshot(fetch_launches_data())
+    launches = snapshot.select(order=LaunchSnapshot.parse_order('datetime'))
+    links = [link for link in launches.values('link') if link]
+    if limit is not None:
+        links = links[:limit]
     
-    except Exception as e:
-        logger.error(f"Unexpected error fetching launch detail for link {link}: {str(e)}")
-        raise APIError("An unexpected error occurred. Please try again later.")
+    failures = 0
+    for link in links:
+        try:
+            fetch_launch_detail(link, refresh=True)
+        except APIError as e:
+            failures += 1
+            logger.warning(f"Failed to warm launch detail for {link}: {str(e)}")
+    
+    if links and failures == len(links):
+        raise APIError("Failed to warm any launch detail.")
+    
+    return len(links) - failures
+
+
+def get_launch_timestamp(launch):
+    """
+    Return the launch datetime (launchDate and launchTime, read as UTC) as an
+    epoch timestamp, or None when the launch has no valid date.
+    
+    A missing or unparseable time counts as midnight.
+    """
+    parsed_date = parse_date(launch.get('launchDate'))
+    if parsed_date is None:
+        return None
+    
+    launch_time = launch.get('launchTime')
+    parsed_time = time(0, 0)
+    if isinstance(launch_time, time):
+        parsed_time = launch_time
+    elif isinstance(launch_time, str):
+        try:
+            parsed_time = time.fromisoformat(launch_time)
+        except ValueError:
+            pass
+    
+    return datetime.combine(parsed_date, parsed_time.replace(tzinfo=None), tzinfo=timezone.utc).timestamp()
 
 
 def sort_launches_by_datetime(launches_data):
     """
     Sort launches by datetime (combining launchDate and launchTime) with latest first.
     
+    Used for ad-hoc lists; the launches list view reads the ordering
+    precomputed by its snapshot instead.
+    
     Args:
         launches_data: List of launch dictionaries containing launchDate and launchTime
         
     Returns:
-        Sorted list with latest launches first (descending order)
+        Sorted list with latest launches first (descending order); launches
+        without a valid date come last
     """
-    def get_launch_datetime(launch):
-        """Extract and combine launch date and time for sorting"""
-        try:
-            launch_date = launch.get('launchDate')
-            launch_time = launch.get('launchTime')
-            
-            # Handle different possible date formats
-            if isinstance(launch_date, str):
-                # Try to parse string date
-                try:
-                    parsed_date = datetime.strptime(launch_date, '%Y-%m-%d').date()
-                except ValueError:
-                    try:
-                        parsed_date = datetime.strptime(launch_date, '%m/%d/%Y').date()
-                    except ValueError:
-                        # If we can't parse the date, put it at the end
-                        return datetime.min
-            elif isinstance(launch_date, date):
-                parsed_date = launch_date
-            else:
-                # If no valid date, put at the end
-                return datetime.min
-            
-            # Handle time
-            if isinstance(launch_time, str):
-                # Try to parse string time
-                try:
-                    parsed_time = datetime.strptime(launch_time, '%H:%M:%S').time()
-                except ValueError:
-                    try:
-                        parsed_time = datetime.strptime(launch_time, '%H:%M').time()
-                    except ValueError:
-                        # If we can't parse time, use midnight
-                        parsed_time = time(0, 0)
-            elif isinstance(launch_time, time):
-                parsed_time = launch_time
-            else:
-                # If no valid time, use midnight
-                parsed_time = time(0, 0)
-            
-            # Combine date and time
-            return datetime.combine(parsed_date, parsed_time)
-            
-        except Exception as e:
-            logger.warning(f"Error parsing launch datetime: {str(e)}")
-            # Return minimum datetime for problematic entries
-            return datetime.min
-    
-    try:
-        # Sort by datetime in descending order (latest first)
-        sorted_launches = sorted(launches_data, key=get_launch_datetime, reverse=True)
-        return sorted_launches
-    except Exception as e:
-        logger.error(f"Error sorting launches by datetime: {str(e)}")
-        # Return original data if sorting fails
-        return launches_data
+    def get_sort_key(launch):
+        timestamp = get_launch_timestamp(launch)
+        return float('-inf') if timestamp is None else timestamp
+    
+    return sorted(launches_data, key=get_sort_key, reverse=True)
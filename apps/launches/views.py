@@ -1,14 +1,21 @@
 from rest_framework.views import APIView
+from apps.upstream.views import AsyncUpstreamAPIView, UpstreamAPIView
 from rest_framework.response import Response
 from rest_framework import status
-from .utils import fetch_launches_data, fetch_launch_detail, sort_launches_by_datetime, APIError, NotFoundError, ValidationError
-from .serializers import LaunchesResponseSerializer, LaunchDetailSerializer
+from apps.upstream.client import get_endpoint_options
+from apps.upstream.conditional import last_modified
+from apps.upstream.fields import Projection
+from apps.upstream.pagination import SnapshotCursorPagination
+from apps.upstream.utils import serve_from_store
+from .utils import afetch_launches_data, afetch_launch_detail, afetch_launch_details, fetch_launch_detail, fetch_launch_details, get_mirrored_launch_detail, ahas_mirrored_launch_detail, get_launch_snapshot, launch_detail_schema, launch_snapshots, parse_launch_filters, parse_links, partition_links, APIError, NotFoundError, ValidationError
+from .analytics import launch_analytics
+from .serializers import LaunchesResponseSerializer
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-class LaunchesAPIView(APIView):
+class LaunchesAPIView(UpstreamAPIView):
     """
     API view to get SpaceX launches data.
     Fetches data from encrypted SpaceX API and returns structured response.
@@ -18,44 +25,59 @@ class LaunchesAPIView(APIView):
         """
         GET /launches/
         Returns SpaceX launches data.
-        Supports query parameter: sort=datetime (sorts by launch date and time, latest first)
+        Supports query parameter: sort, comma-separated sort fields with - for descending
+        (e.g. sort=-launchDate,vehicle); sort=datetime sorts by launch date and time, latest first
+        Supports filters: vehicle, launchSite, missionType, missionStatus, isLive
+        (comma-separated values) and from/to (launchDate range, YYYY-MM-DD)
+        Paginated with opaque cursors: page_size (default 20, max 100) and cursor
+        (from the next/previous links)
+        Supports sparse fieldsets: fields and exclude (comma-separated, dotted paths
+        for nested values, e.g. fields=title,link,imageDesktop.formats.thumbnail)
         """
         try:
-            # Get the sort parameter from query string
-            sort_param = request.GET.get('sort', None)
-            
-            # Fetch data from the external SpaceX API
-            raw_data = fetch_launches_data()
-            
-            # Extract launches from the response data
-            launches_list = []
-            if isinstance(raw_data, dict):
-                # If the response has a 'data' key with launches inside
-                if 'data' in raw_data and 'launches' in raw_data['data']:
-                    launches_list = raw_data['data']['launches']
-                # If the response has launches directly
-                elif 'launches' in raw_data:
-                    launches_list = raw_data['launches']
-                # If the response is just a list of launches
-                elif isinstance(raw_data.get('data'), list):
-                    launches_list = raw_data['data']
-            elif isinstance(raw_data, list):
-                # If the response is directly a list of launches
-                launches_list = raw_data
-            
-            # Apply sorting if requested
-            if sort_param == 'datetime' and launches_list:
-                launches_list = sort_launches_by_datetime(launches_list)
-            
-            # Serialize the data
-            serializer = LaunchesResponseSerializer(launches_list)
+            # Get the sort, filter and fieldset parameters from query string
+            selection = parse_launch_filters(request.GET)
+            projection = Projection.from_params(request.GET)
+        except ValidationError as e:
+            logger.error(f"Validation error in LaunchesAPIView: {str(e)}")
+            return Response({
+                'success': False,
+                'message': str(e),
+                'data': None
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            # Fetch launches from the local store or the external SpaceX API
+            # (or the snapshot the cursor was issued for) and answer the
+            # filters and sorting from the snapshot's indexes and orderings
+            paginator = SnapshotCursorPagination()
+            snapshot = paginator.get_snapshot(request, get_launch_snapshot(), launch_snapshots)
+            
+            # Answer from the client's or our own copy of an identical earlier response
+            cached = self.get_cached_response(request, snapshot.version, snapshot.last_modified)
+            if cached is not None:
+                return cached
+            
+            launches_list = snapshot.select(**selection)
+            
+            # Serialize the requested page, projected to the requested fields
+            page = snapshot.project(paginator.paginate_records(launches_list, snapshot, request), projection)
+            serializer = LaunchesResponseSerializer(launches_list, context={'page': page})
             
             return Response({
                 'success': True,
                 'message': 'SpaceX launches data retrieved successfully',
-                'data': serializer.data
+                'data': {**serializer.data, **paginator.get_pagination_data()}
             }, status=status.HTTP_200_OK)
         
+        except ValidationError as e:
+            logger.error(f"Validation error in LaunchesAPIView: {str(e)}")
+            return Response({
+                'success': False,
+                'message': str(e),
+                'data': None
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
         except APIError as e:
             logger.error(f"API error in LaunchesAPIView: {str(e)}")
             return Response({
@@ -81,7 +103,7 @@ class LaunchesAPIView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class LaunchDetailAPIView(APIView):
+class LaunchDetailAPIView(UpstreamAPIView):
     """
     API view to get detailed SpaceX launch information.
     Fetches detailed data for a specific launch using the link parameter.
@@ -93,21 +115,40 @@ class LaunchDetailAPIView(APIView):
         Returns detailed SpaceX launch information for the specified link.
         """
         try:
+            # Serve from the local mirror when the launch has been crawled
+            mirrored = get_mirrored_launch_detail(link)
+            if mirrored is not None:
+                mirrored, version = mirrored
+                cached = self.get_cached_response(request, version, last_modified(mirrored))
+                if cached is not None:
+                    return cached
+                
+                return Response({
+                    'success': True,
+                    'message': 'Launch details retrieved successfully',
+                    'data': mirrored
+                }, status=status.HTTP_200_OK)
+            
             # Fetch detailed data from the external SpaceX API
             raw_data = fetch_launch_detail(link)
             
-            # Try to serialize the data, but don't fail if validation errors occur
-            serializer = LaunchDetailSerializer(data=raw_data)
+            # Answer from the client's or our own copy of an identical earlier response
+            cached = self.get_cached_response(request, last_modified=last_modified(raw_data))
+            if cached is not None:
+                return cached
+            
+            # Try to validate the data, but don't fail if validation errors occur
+            validated_data, errors = launch_detail_schema.validate(raw_data)
             
-            if serializer.is_valid():
+            if errors is None:
                 return Response({
                     'success': True,
                     'message': f'Launch details retrieved successfully',
-                    'data': serializer.validated_data
+                    'data': validated_data
                 }, status=status.HTTP_200_OK)
             else:
                 # If validation fails, return the raw data but log the errors
-                logger.warning(f"Serializer validation errors for {link}: {serializer.errors}")
+                logger.warning(f"Serializer validation errors for {link}: {errors}")
                 return Response({
                     'success': True,
                     'message': 'Launch details retrieved successfully',
@@ -147,6 +188,157 @@ class LaunchDetailAPIView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class LaunchBatchAPIView(UpstreamAPIView):
+    """
+    API view to get the details of several SpaceX launches in one request.
+    Details are fetched concurrently, up to the BATCH_CONCURRENCY option of
+    the launch_detail endpoint at a time.
+    """
+    
+    def get_links(self, request):
+        """Return the requested links, or raise ValidationError"""
+        links = parse_links(request.GET.get('links'))
+        max_links = get_endpoint_options('launch_detail').get('BATCH_MAX_LINKS', 50)
+        
+        if not links:
+            raise ValidationError("The links query parameter is required.")
+        if len(links) > max_links:
+            raise ValidationError(f"At most {max_links} links can be requested at once.")
+        return links
+    
+    def get(self, request):
+        """
+        GET /launches/batch/?links=crew11,starlink-10-5
+        Returns the details of every requested launch keyed by link, each with
+        its own status: ok, not_found, invalid or error.
+        """
+        try:
+            links = self.get_links(request)
+        except ValidationError as e:
+            logger.error(f"Validation error in LaunchBatchAPIView: {str(e)}")
+            return Response({
+                'success': False,
+                'message': str(e),
+                'data': None
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            # Validate every link with the same rules as /launches/{link}/
+            valid_links, invalid_links = partition_links(links)
+            
+            # Fetch the valid links concurrently
+            fetched = fetch_launch_details(valid_links)
+            
+            # Complete batches are determined by the versions of their details
+            if not invalid_links and all(error is None for raw_data, error in fetched.values()):
+                cached = self.get_cached_response(request, last_modified=last_modified([raw_data for raw_data, error in fetched.values()]))
+                if cached is not None:
+                    return cached
+            
+            results = {}
+            for link in links:
+                if link in invalid_links:
+                    results[link] = {'status': 'invalid', 'message': 'Invalid request data provided.', 'data': None}
+                    continue
+                
+                raw_data, error = fetched[link]
+                if error is None:
+                    validated_data, errors = launch_detail_schema.validate(raw_data)
+                    if errors is None:
+                        results[link] = {'status': 'ok', 'data': validated_data}
+                    else:
+                        # If validation fails, return the raw data but log the errors
+                        logger.warning(f"Serializer validation errors for {link}: {errors}")
+                        results[link] = {'status': 'ok', 'data': raw_data}
+                elif isinstance(error, NotFoundError):
+                    results[link] = {'status': 'not_found', 'message': 'The requested launch was not found.', 'data': None}
+                elif isinstance(error, APIError):
+                    logger.error(f"API error in LaunchBatchAPIView for {link}: {str(error)}")
+                    results[link] = {'status': 'error', 'message': 'External service temporarily unavailable. Please try again later.', 'data': None}
+                else:
+                    logger.error(f"Unexpected error in LaunchBatchAPIView for {link}: {str(error)}")
+                    results[link] = {'status': 'error', 'message': 'An unexpected error occurred. Please try again later.', 'data': None}
+            
+            statuses = [result['status'] for result in results.values()]
+            if 'error' in statuses and 'ok' not in statuses and 'not_found' not in statuses:
+                return Response({
+                    'success': False,
+                    'message': 'External service temporarily unavailable. Please try again later.',
+                    'data': None
+                }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            
+            return Response({
+                'success': True,
+                'message': 'Launch details retrieved successfully',
+                'data': {
+                    'total': len(links),
+                    'succeeded': statuses.count('ok'),
+                    'results': results
+                }
+            }, status=status.HTTP_200_OK)
+        
+        except Exception as e:
+            logger.error(f"Unexpected error in LaunchBatchAPIView: {str(e)}")
+            return Response({
+                'success': False,
+                'message': 'An unexpected error occurred. Please try again later.',
+                'data': None
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class LaunchAnalyticsAPIView(UpstreamAPIView):
+    """
+    API view to get analytics of the SpaceX launch history.
+    Computed once per version of the launches data.
+    """
+    
+    def get(self, request):
+        """
+        GET /launches/analytics/
+        Returns launch counts per year, the monthly launch cadence with trailing
+        30/90/365-day counts, the distribution of intervals between launches and
+        launch counts per vehicle, launch site and mission type.
+        """
+        try:
+            # Fetch launches from the local store or the external SpaceX API
+            snapshot = get_launch_snapshot()
+            
+            # Answer from the client's or our own copy of an identical earlier response
+            cached = self.get_cached_response(request, snapshot.version, snapshot.last_modified)
+            if cached is not None:
+                return cached
+            
+            return Response({
+                'success': True,
+                'message': 'SpaceX launch analytics retrieved successfully',
+                'data': launch_analytics(snapshot)
+            }, status=status.HTTP_200_OK)
+        
+        except ValidationError as e:
+            logger.error(f"Validation error in LaunchAnalyticsAPIView: {str(e)}")
+            return Response({
+                'success': False,
+                'message': str(e),
+                'data': None
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        except APIError as e:
+            logger.error(f"API error in LaunchAnalyticsAPIView: {str(e)}")
+            return Response({
+                'success': False,
+                'message': 'External service temporarily unavailable. Please try again later.',
+                'data': None
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        
+        except Exception as e:
+            logger.error(f"Unexpected error in LaunchAnalyticsAPIView: {str(e)}")
+            return Response({
+                'success': False,
+                'message': 'An unexpected error occurred. Please try again later.',
+                'data': None
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 class HealthCheckView(APIView):
     """
     Simple health check endpoint
@@ -157,3 +349,55 @@ class HealthCheckView(APIView):
             'status': 'healthy',
             'message': 'Launches API is running'
         }, status=status.HTTP_200_OK)
+
+
+class AsyncLaunchesAPIView(AsyncUpstreamAPIView, LaunchesAPIView):
+    """
+    Async variant of LaunchesAPIView for ASGI deployments.
+    """
+    
+    @property
+    def uses_database(self):
+        return serve_from_store()
+    
+    async def prefetch(self, request):
+        if not serve_from_store():
+            await afetch_launches_data()
+
+
+class AsyncLaunchAnalyticsAPIView(AsyncUpstreamAPIView, LaunchAnalyticsAPIView):
+    """
+    Async variant of LaunchAnalyticsAPIView for ASGI deployments.
+    """
+    
+    @property
+    def uses_database(self):
+        return serve_from_store()
+    
+    async def prefetch(self, request):
+        if not serve_from_store():
+            await afetch_launches_data()
+
+
+class AsyncLaunchDetailAPIView(AsyncUpstreamAPIView, LaunchDetailAPIView):
+    """
+    Async variant of LaunchDetailAPIView for ASGI deployments.
+    """
+    
+    @property
+    def uses_database(self):
+        return serve_from_store()
+    
+    async def prefetch(self, request, link):
+        if not await ahas_mirrored_launch_detail(link):
+            await afetch_launch_detail(link)
+
+
+class AsyncLaunchBatchAPIView(AsyncUpstreamAPIView, LaunchBatchAPIView):
+    """
+    Async variant of LaunchBatchAPIView for ASGI deployments.
+    """
+    
+    async def prefetch(self, request):
+        valid_links, invalid_links = partition_links(self.get_links(request))
+        await afetch_launch_details(valid_links)
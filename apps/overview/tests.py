@@ -0,0 +1,138 @@
+import asyncio
+import time
+from urllib.parse import parse_qsl, urlsplit
+
+from django.test import AsyncRequestFactory, RequestFactory, override_settings
+
+from apps.launches.utils import LaunchSnapshot, launch_snapshots
+from apps.upstream.registry import registry
+from apps.upstream.testing import FakeUpstream, UpstreamTestCase
+
+from .views import AsyncOverviewAPIView, OverviewAPIView
+
+PAYLOADS = {
+    '/stats': {'id': 1, 'documentId': 'stats', 'totalLaunches': 10, 'totalLandings': 9, 'totalReflights': 8},
+    '/upcoming': [{'missionStatus': 'upcoming', 'missionType': 'starlink', 'vehicle': 'Falcon 9', 'launchSite': 'SLC-40'}],
+    '/launches': {'data': {'launches': []}},
+    '/dragon': {'glass.dgn_speed_f64': 7.5},
+}
+
+
+class SlowUpstream(FakeUpstream):
+    """Fake upstream with a delay per path"""
+
+    def __init__(self, payloads, delays):
+        super().__init__(payloads)
+        self.delays = delays
+
+    def handle(self, request):
+        time.sleep(self.delays.get(request.path, 0))
+        super().handle(request)
+
+
+class OverviewTests(UpstreamTestCase):
+    def get(self, upstream, use_async=False):
+        with registry.override(**{
+            'stats': f"{upstream.url}/stats",
+            'upcoming': f"{upstream.url}/upcoming",
+            'launches': f"{upstream.url}/launches",
+            'dragon': f"{upstream.url}/dragon",
+        }):
+            if use_async:
+                view = AsyncOverviewAPIView.as_view()
+                return asyncio.run(view(AsyncRequestFactory().get('/overview/')))
+            return OverviewAPIView.as_view()(RequestFactory().get('/overview/'))
+
+    def test_sources_are_fetched_concurrently(self):
+        delays = dict.fromkeys(PAYLOADS, 0.3)
+        for use_async in (False, True):
+            self.reset_upstream()
+            with SlowUpstream(PAYLOADS, delays) as upstream:
+                started = time.perf_counter()
+                response = self.get(upstream, use_async)
+                elapsed = time.perf_counter() - started
+
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(response.data['partial'])
+            self.assertEqual({section['status'] for section in response.data['data'].values()}, {'ok'})
+            self.assertEqual(response.data['data']['upcoming_stats']['data']['starlink_missions'], 1)
+            self.assertLess(elapsed, 0.9)
+
+    @override_settings(OVERVIEW_BUDGET=0.3)
+    def test_slow_source_is_reported_as_timeout(self):
+        for use_async in (False, True):
+            self.reset_upstream()
+            with SlowUpstream(PAYLOADS, {'/dragon': 1.0}) as upstream:
+                started = time.perf_counter()
+                response = self.get(upstream, use_async)
+                elapsed = time.perf_counter() - started
+
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.data['partial'])
+            self.assertEqual(response.data['data']['dragon'], {
+                'status': 'timeout',
+                'message': 'Data source did not respond in time.',
+                'data': None,
+            })
+            self.assertEqual(response.data['data']['stats']['status'], 'ok')
+            self.assertLess(elapsed, 0.9)
+
+    def test_failed_source_does_not_fail_the_response(self):
+        with SlowUpstream({**PAYLOADS, '/stats': {'unexpected': True}}, {}) as upstream:
+            del upstream.payloads['/launches']
+            response = self.get(upstream)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['data']['stats']['status'], 'error')
+        self.assertEqual(response.data['data']['launches']['status'], 'error')
+        self.assertEqual(response.data['data']['dragon']['status'], 'ok')
+
+    def test_all_sources_failing_returns_503(self):
+        with SlowUpstream({}, {}) as upstream:
+            response = self.get(upstream)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(response.data['success'])
+
+    def test_launches_section_shares_the_launches_list_ordering(self):
+        launches = [
+            {'title': 'first', 'launchDate': '2020-01-01', 'updatedAt': '2020-01-02T00:00:00.000Z'},
+            {'title': 'undated'},
+            {'title': 'latest', 'launchDate': '2024-05-01', 'launchTime': '10:00'},
+            {'title': 'middle', 'launchDate': '2022-03-04'},
+        ]
+        launch_snapshots.clear()
+        with SlowUpstream({**PAYLOADS, '/launches': {'data': {'launches': launches}}}, {}) as upstream:
+            response = self.get(upstream)
+            with registry.override(launches=f"{upstream.url}/launches"):
+                listed = self.client.get('/launches/?sort=datetime&page_size=10')
+
+        section = response.data['data']['launches']['data']
+        self.assertEqual([launch['title'] for launch in section['launches']], ['latest', 'middle', 'first', 'undated'])
+        self.assertEqual(section['total_launches'], 4)
+        self.assertEqual([launch['title'] for launch in listed.json()['data']['launches']], ['latest', 'middle', 'first', 'undated'])
+
+        # Both read the one snapshot and its one cached ordering
+        [(source, snapshot)] = launch_snapshots._entries.values()
+        self.assertIn(('ordering', LaunchSnapshot.parse_order('datetime')), snapshot._recent)
+
+    def test_launches_section_is_the_first_page_of_the_launches_list(self):
+        launches = [
+            {'documentId': f'doc-{index}', 'title': f'Mission {index}', 'launchDate': f'2024-01-{index:02d}'}
+            for index in range(1, 26)
+        ]
+        with SlowUpstream({**PAYLOADS, '/launches': {'data': {'launches': launches}}}, {}) as upstream:
+            section = self.get(upstream).data['data']['launches']['data']
+            with registry.override(launches=f"{upstream.url}/launches"):
+                first = self.client.get('/launches/?sort=datetime').json()['data']
+                rest = self.client.get(section['next']).json()['data']
+
+        self.assertEqual(section['total_launches'], 25)
+        self.assertEqual(section['page_size'], 20)
+        self.assertEqual(section['launches'], first['launches'])
+        self.assertIsNone(section['previous'])
+        next_url = urlsplit(section['next'])
+        self.assertEqual(next_url.path, '/launches/')
+        self.assertEqual(set(dict(parse_qsl(next_url.query))), {'sort', 'cursor'})
+        self.assertTrue(first['next'].endswith(section['next']))
+        self.assertEqual([launch['title'] for launch in rest['launches']], [f'Mission {index}' for index in range(5, 0, -1)])
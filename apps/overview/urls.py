@@ -0,0 +1,12 @@
+from django.conf import settings
+from django.urls import path
+from . import views
+
+app_name = 'overview'
+
+# Serve the async views when deployed under ASGI
+ASYNC_VIEWS = settings.UPSTREAM.get('ASYNC_VIEWS', False)
+
+urlpatterns = [
+    path('', (views.AsyncOverviewAPIView if ASYNC_VIEWS else views.OverviewAPIView).as_view(), name='spacex-overview'),
+]
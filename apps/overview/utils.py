@@ -0,0 +1,173 @@
+import asyncio
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.urls import reverse
+
+from apps.dragon.serializers import DragonRawDataSerializer
+from apps.dragon.utils import afetch_dragon_data, fetch_dragon_data
+from apps.launches.serializers import LaunchesResponseSerializer
+from apps.launches.utils import LaunchSnapshot, afetch_launches_data, fetch_launches_data, get_upstream_launch_snapshot
+from apps.stats.serializers import SpaceXStatsSerializer
+from apps.stats.utils import afetch_spacex_data, fetch_spacex_data
+from apps.upcoming.utils import afetch_upcoming_launches, fetch_upcoming_launches, summarize_upcoming_launches
+from apps.upstream.conditional import last_modified
+from apps.upstream.exceptions import APIError, DecryptionError, NotFoundError, ValidationError
+from apps.upstream.pagination import SnapshotCursorPagination
+
+logger = logging.getLogger(__name__)
+
+# Worker threads for the sync fan-out. A source that misses the budget keeps
+# its thread until the upstream call ends (bounded by the upstream timeout)
+# and still refreshes the cache for the next request.
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix='overview')
+
+
+def build_stats(raw_data):
+    serializer = SpaceXStatsSerializer(data=raw_data)
+    if not serializer.is_valid():
+        logger.warning(f"Serializer validation errors: {serializer.errors}")
+        raise ValidationError("Invalid data format received from SpaceX API")
+    return serializer.validated_data
+
+
+def build_launches(raw_data):
+    """
+    The first page of /launches/?sort=datetime with its pagination envelope;
+    ``next`` is a path to the following page of that endpoint. Shares the
+    snapshot and its cached ordering with the endpoint.
+    """
+    snapshot = get_upstream_launch_snapshot(raw_data)
+    launches_list = snapshot.select(order=LaunchSnapshot.parse_order('datetime'))
+    paginator = SnapshotCursorPagination()
+    page = paginator.first_page(launches_list, snapshot, f"{reverse('launches:spacex-launches')}?sort=datetime")
+    serializer = LaunchesResponseSerializer(launches_list, context={'page': snapshot.project(page, None)})
+    return {**serializer.data, **paginator.get_pagination_data()}
+
+
+def build_dragon(raw_data):
+    serializer = DragonRawDataSerializer(data=raw_data)
+    if serializer.is_valid():
+        return serializer.validated_data
+    logger.warning(f"Dragon serializer validation errors: {serializer.errors}")
+    return raw_data
+
+
+# Overview sections: name -> (sync fetch, async fetch, builder). Each builder
+# produces the same data as the standalone endpoint (/stats/,
+# /upcoming/stats/, the first page of /launches/?sort=datetime and /dragon/).
+SECTIONS = {
+    'stats': (fetch_spacex_data, afetch_spacex_data, build_stats),
+    'upcoming_stats': (fetch_upcoming_launches, afetch_upcoming_launches, summarize_upcoming_launches),
+    'launches': (fetch_launches_data, afetch_launches_data, build_launches),
+    'dragon': (fetch_dragon_data, afetch_dragon_data, build_dragon),
+}
+
+
+class Timeout(Exception):
+    """A source did not answer within the overview budget"""
+
+
+def get_budget():
+    """Return the overview latency budget in seconds"""
+    return getattr(settings, 'OVERVIEW_BUDGET', 2.0)
+
+
+def fetch_sections(budget=None):
+    """
+    Fetch every overview source concurrently in worker threads.
+    
+    Returns a dict of section name -> (raw data, error). Sources still
+    running when the budget runs out get a Timeout error. Each worker runs
+    in a copy of the caller's context, so stale payloads are still reported
+    to the view.
+    """
+    budget = get_budget() if budget is None else budget
+    futures = {
+        _executor.submit(contextvars.copy_context().run, fetch): name
+        for name, (fetch, afetch, build) in SECTIONS.items()
+    }
+    wait(futures, timeout=budget)
+    
+    outcomes = {}
+    for future, name in futures.items():
+        if not future.done():
+            outcomes[name] = (None, Timeout(f"No response within {budget}s"))
+        elif future.exception() is not None:
+            outcomes[name] = (None, future.exception())
+        else:
+            outcomes[name] = (future.result(), None)
+    return outcomes
+
+
+async def afetch_sections(budget=None):
+    """
+    Async version of fetch_sections() using the async upstream client.
+    
+    Sources that miss the budget are left running so they still refresh the cache.
+    """
+    budget = get_budget() if budget is None else budget
+    tasks = {asyncio.ensure_future(afetch()): name for name, (fetch, afetch, build) in SECTIONS.items()}
+    await asyncio.wait(tasks, timeout=budget)
+    
+    outcomes = {}
+    for task, name in tasks.items():
+        if not task.done():
+            outcomes[name] = (None, Timeout(f"No response within {budget}s"))
+        elif task.exception() is not None:
+            outcomes[name] = (None, task.exception())
+        else:
+            outcomes[name] = (task.result(), None)
+    return outcomes
+
+
+def sections_last_modified(outcomes):
+    """Return the newest ``updatedAt`` of the fetched sources as a POSIX timestamp, or None"""
+    timestamps = []
+    for name, (raw_data, error) in outcomes.items():
+        if error is None:
+            timestamps.append(get_upstream_launch_snapshot(raw_data).last_modified if name == 'launches' else last_modified(raw_data))
+    return max((timestamp for timestamp in timestamps if timestamp is not None), default=None)
+
+
+def error_message(error):
+    """Map a section error to the message its standalone endpoint would return"""
+    if isinstance(error, Timeout):
+        return 'Data source did not respond in time.'
+    if isinstance(error, DecryptionError):
+        return 'Data decryption failed. Please try again later.'
+    if isinstance(error, ValidationError):
+        return 'Invalid data format received from SpaceX API.'
+    if isinstance(error, NotFoundError):
+        return 'The requested resource was not found.'
+    if isinstance(error, APIError):
+        return 'External service temporarily unavailable. Please try again later.'
+    return 'An unexpected error occurred. Please try again later.'
+
+
+def compose_overview(outcomes):
+    """
+    Build the overview sections from fetched outcomes.
+    
+    Every section has a ``status`` of ``ok``, ``timeout`` or ``error``; failed
+    sections have ``data`` set to None and a ``message``.
+    """
+    sections = {}
+    for name, (fetch, afetch, build) in SECTIONS.items():
+        raw_data, error = outcomes[name]
+        if error is None:
+            try:
+                sections[name] = {'status': 'ok', 'data': build(raw_data)}
+                continue
+            except Exception as e:
+                error = e
+        
+        logger.error(f"Overview section {name} failed: {str(error)}")
+        sections[name] = {
+            'status': 'timeout' if isinstance(error, Timeout) else 'error',
+            'message': error_message(error),
+            'data': None,
+        }
+    return sections
@@ -0,0 +1,66 @@
+from apps.upstream.views import AsyncUpstreamAPIView, UpstreamAPIView
+from rest_framework.response import Response
+from rest_framework import status
+from .utils import afetch_sections, compose_overview, fetch_sections, sections_last_modified
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class OverviewAPIView(UpstreamAPIView):
+    """
+    API view combining stats, upcoming stats, recent launches and Dragon
+    tracking in one response.
+    The sources are fetched concurrently within a latency budget.
+    """
+    
+    def get(self, request):
+        """
+        GET /overview/
+        Returns one section per source, each with its own status. Sources that
+        fail or miss the latency budget are reported without failing the
+        whole response.
+        """
+        try:
+            # Fetch every source concurrently (async views have done it already)
+            outcomes = getattr(self, 'outcomes', None) or fetch_sections()
+            
+            # Complete overviews are determined by the versions of their sources
+            if all(error is None for raw_data, error in outcomes.values()):
+                cached = self.get_cached_response(request, last_modified=sections_last_modified(outcomes))
+                if cached is not None:
+                    return cached
+            
+            sections = compose_overview(outcomes)
+            failed = [name for name, section in sections.items() if section['status'] != 'ok']
+            
+            if len(failed) == len(sections):
+                return Response({
+                    'success': False,
+                    'message': 'External service temporarily unavailable. Please try again later.',
+                    'data': None
+                }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            
+            return Response({
+                'success': True,
+                'message': 'SpaceX overview retrieved successfully' if not failed else 'SpaceX overview partially retrieved',
+                'partial': bool(failed),
+                'data': sections
+            }, status=status.HTTP_200_OK)
+        
+        except Exception as e:
+            logger.error(f"Unexpected error in OverviewAPIView: {str(e)}")
+            return Response({
+                'success': False,
+                'message': 'An unexpected error occurred. Please try again later.',
+                'data': None
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class AsyncOverviewAPIView(AsyncUpstreamAPIView, OverviewAPIView):
+    """
+    Async variant of OverviewAPIView for ASGI deployments.
+    """
+    
+    async def prefetch(self, request):
+        self.outcomes = await afetch_sections()
@@ -1,6 +1,19 @@
+from functools import partial
+
 from django.apps import AppConfig
 
 
 class StatsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.stats"
+
+    def ready(self):
+        from apps.upstream.registry import registry
+        from apps.upstream.scheduler import refresh_scheduler
+        from apps.upstream.utils import serve_from_store
+        from .utils import STATS_ENCRYPTED_URL, fetch_spacex_data, sync_spacex_stats
+
+        registry.register('stats', STATS_ENCRYPTED_URL)
+        refresh_scheduler.register('stats', partial(fetch_spacex_data, refresh=True))
+        if serve_from_store():
+            refresh_scheduler.register('stats_store', sync_spacex_stats, endpoint='stats')
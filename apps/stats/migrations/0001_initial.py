@@ -0,0 +1,28 @@
+# Generated by Django 5.2.12 on 2026-10-18 03:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('document_id', models.CharField(blank=True, max_length=64)),
+                ('updated_at', models.CharField(blank=True, default='', max_length=40)),
+                ('data', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'ordering': ['-created_at', '-id'],
+                'get_latest_by': ['created_at', 'id'],
+            },
+        ),
+    ]
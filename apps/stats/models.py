@@ -1,3 +1,37 @@
 from django.db import models
 
-# Create your models here.
+
+class StatsSnapshot(models.Model):
+    """
+    A version of the upstream SpaceX stats payload.
+    A new snapshot is stored by sync_spacex_stats() whenever the payload's
+    documentId/updatedAt (or, without updatedAt, its content) changes.
+    """
+    document_id = models.CharField(max_length=64, blank=True)
+    updated_at = models.CharField(max_length=40, blank=True, default='')
+    data = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    class Meta:
+        ordering = ['-created_at', '-id']
+        get_latest_by = ['created_at', 'id']
+    
+    def __str__(self):
+        return f"{self.document_id} ({self.updated_at or self.created_at})"
+    
+    @classmethod
+    def sync(cls, raw_data):
+        """
+        Store the stats payload if it changed since the latest snapshot.
+        
+        Returns a tuple of (snapshot, created).
+        """
+        document_id = str(raw_data.get('documentId') or '')
+        updated_at = raw_data.get('updatedAt') or ''
+        
+        latest = cls.objects.first()
+        if latest is not None and latest.document_id == document_id:
+            if (updated_at and latest.updated_at == updated_at) or (not updated_at and latest.data == raw_data):
+                return latest, False
+        
+        return cls.objects.create(document_id=document_id, updated_at=updated_at, data=raw_data), True
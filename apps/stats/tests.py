@@ -1,3 +1,22 @@
 from django.test import TestCase
 
-# Create your tests here.
+from .models import StatsSnapshot
+
+
+class StatsSnapshotTests(TestCase):
+    def test_snapshot_is_stored_only_when_stats_change(self):
+        stats = {'documentId': 'stats', 'totalLaunches': 10, 'updatedAt': '2025-01-01T00:00:00.000Z'}
+
+        first, created = StatsSnapshot.sync(stats)
+        self.assertTrue(created)
+        self.assertEqual(StatsSnapshot.sync(dict(stats))[1], False)
+
+        latest, created = StatsSnapshot.sync(dict(stats, totalLaunches=11, updatedAt='2025-01-02T00:00:00.000Z'))
+        self.assertTrue(created)
+        self.assertEqual(StatsSnapshot.objects.latest().pk, latest.pk)
+        self.assertEqual(StatsSnapshot.objects.count(), 2)
+
+    def test_stats_without_updated_at_are_compared_by_content(self):
+        StatsSnapshot.sync({'documentId': 'stats', 'totalLaunches': 10})
+        self.assertFalse(StatsSnapshot.sync({'documentId': 'stats', 'totalLaunches': 10})[1])
+        self.assertTrue(StatsSnapshot.sync({'documentId': 'stats', 'totalLaunches': 11})[1])
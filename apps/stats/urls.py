@@ -1,9 +1,13 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 app_name = 'stats'
 
+# Serve the async views when deployed under ASGI
+ASYNC_VIEWS = settings.UPSTREAM.get('ASYNC_VIEWS', False)
+
 urlpatterns = [
-    path('', views.SpaceXStatsAPIView.as_view(), name='spacex-stats'),
+    path('', (views.AsyncSpaceXStatsAPIView if ASYNC_VIEWS else views.SpaceXStatsAPIView).as_view(), name='spacex-stats'),
     path('health/', views.HealthCheckView.as_view(), name='health-check'),
 ]
@@ -1,7 +1,9 @@
 from rest_framework.views import APIView
+from apps.upstream.conditional import last_modified
+from apps.upstream.views import AsyncUpstreamAPIView, UpstreamAPIView
 from rest_framework.response import Response
 from rest_framework import status
-from .utils import fetch_spacex_data
+from .utils import afetch_spacex_data, fetch_spacex_data
 from .serializers import SpaceXStatsSerializer
 from .exceptions import APIError, DecryptionError, ValidationError
 import logging
@@ -9,7 +11,7 @@ import logging
 logger = logging.getLogger(__name__)
 
 
-class SpaceXStatsAPIView(APIView):
+class SpaceXStatsAPIView(UpstreamAPIView):
     """
     API view to get SpaceX launch statistics.
     Fetches data from encrypted SpaceX API and returns structured response.
@@ -24,6 +26,11 @@ class SpaceXStatsAPIView(APIView):
             # Fetch data from the external SpaceX API
             raw_data = fetch_spacex_data()
             
+            # Answer from the client's or our own copy of an identical earlier response
+            cached = self.get_cached_response(request, last_modified=last_modified(raw_data))
+            if cached is not None:
+                return cached
+            
             # Serialize the data
             serializer = SpaceXStatsSerializer(data=raw_data)
             
@@ -85,3 +92,12 @@ class HealthCheckView(APIView):
             'status': 'healthy',
             'message': 'SpaceX API is running'
         }, status=status.HTTP_200_OK)
+
+
+class AsyncSpaceXStatsAPIView(AsyncUpstreamAPIView, SpaceXStatsAPIView):
+    """
+    Async variant of SpaceXStatsAPIView for ASGI deployments.
+    """
+    
+    async def prefetch(self, request):
+        await afetch_spacex_data()
@@ -1,6 +1,19 @@
+from functools import partial
+
 from django.apps import AppConfig
 
 
 class UpcomingConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.upcoming"
+
+    def ready(self):
+        from apps.upstream.registry import registry
+        from apps.upstream.scheduler import refresh_scheduler
+        from apps.upstream.utils import serve_from_store
+        from .utils import UPCOMING_ENCRYPTED_URL, fetch_upcoming_launches, sync_upcoming_launches
+
+        registry.register('upcoming', UPCOMING_ENCRYPTED_URL)
+        refresh_scheduler.register('upcoming', partial(fetch_upcoming_launches, refresh=True))
+        if serve_from_store():
+            refresh_scheduler.register('upcoming_store', sync_upcoming_launches, endpoint='upcoming')
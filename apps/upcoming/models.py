@@ -1,3 +1,33 @@
 from django.db import models
 
-# Create your models here.
+from apps.upstream.models import UpstreamRecord
+
+
+class UpcomingLaunch(UpstreamRecord):
+    """
+    A launch from the upstream upcoming launches list, synced by sync_upcoming_launches().
+    """
+    link = models.CharField(max_length=100, blank=True, db_index=True)
+    title = models.CharField(max_length=255, blank=True)
+    vehicle = models.CharField(max_length=100, blank=True, db_index=True)
+    launch_site = models.CharField(max_length=100, blank=True, db_index=True)
+    mission_type = models.CharField(max_length=100, blank=True, db_index=True)
+    mission_status = models.CharField(max_length=50, blank=True, db_index=True)
+    launch_date = models.CharField(max_length=40, blank=True, db_index=True)
+    is_live = models.BooleanField(default=False)
+    is_ongoing = models.BooleanField(default=False)
+    
+    record_fields = {
+        'link': 'link',
+        'title': 'title',
+        'vehicle': 'vehicle',
+        'launch_site': 'launchSite',
+        'mission_type': 'missionType',
+        'mission_status': 'missionStatus',
+        'launch_date': 'launchDate',
+        'is_live': 'isLive',
+        'is_ongoing': 'isOngoing',
+    }
+    
+    class Meta(UpstreamRecord.Meta):
+        verbose_name_plural = 'upcoming launches'
@@ -91,17 +91,27 @@ class UpcomingLaunchesResponseSerializer(serializers.Serializer):
     launches = UpcomingLaunchSerializer(many=True)
     
     def to_representation(self, instance):
-        """Create summary stats from the raw launch data"""
+        """
+        Create summary stats from the raw launch data, listing only the 'page'
+        in context if given. Stats come from the 'aggregates' in context
+        (the launches counted by missionStatus and missionType) if given.
+        """
         launches_data = instance if isinstance(instance, list) else []
+        aggregates = self.context.get('aggregates')
         
         # Calculate stats
-        total_count = len(launches_data)
-        upcoming_count = len([launch for launch in launches_data if launch.get('missionStatus') == 'upcoming'])
-        starlink_count = len([launch for launch in launches_data if launch.get('missionType') == 'starlink'])
+        if aggregates is not None:
+            total_count = aggregates.total
+            upcoming_count = aggregates.count('missionStatus', 'upcoming')
+            starlink_count = aggregates.count('missionType', 'starlink')
+        else:
+            total_count = len(launches_data)
+            upcoming_count = len([launch for launch in launches_data if launch.get('missionStatus') == 'upcoming'])
+            starlink_count = len([launch for launch in launches_data if launch.get('missionType') == 'starlink'])
         
         return {
             'total_count': total_count,
             'upcoming_count': upcoming_count,
             'starlink_count': starlink_count,
-            'launches': launches_data
+            'launches': self.context.get('page', launches_data)
         }
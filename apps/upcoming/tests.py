@@ -1,3 +1,79 @@
-from django.test import TestCase
+from django.test import RequestFactory
 
-# Create your tests here.
+from apps.upstream.registry import registry
+from apps.upstream.testing import FakeUpstream, UpstreamTestCase
+
+from .utils import snapshot_upcoming_launches, upcoming_snapshots, validate_upcoming_launches
+from .views import UpcomingStatsAPIView
+
+
+def upcoming(index, **values):
+    return dict({
+        'id': index,
+        'documentId': f'doc-{index}',
+        'title': f'Mission {index}',
+        'missionStatus': 'upcoming',
+        'missionType': 'starlink',
+        'vehicle': 'Falcon 9',
+        'launchSite': 'SLC-40',
+        'isLive': False,
+        'updatedAt': '2025-01-01T00:00:00.000Z',
+    }, **values)
+
+
+class UpcomingStatsTests(UpstreamTestCase):
+    launches = [
+        upcoming(1),
+        upcoming(2, missionType='crew', launchSite='LC-39A', isLive=True),
+        upcoming(3, vehicle='Falcon Heavy', missionStatus='complete'),
+        upcoming(4, missionType='crew', isOngoing=True),
+        {'id': 5, 'documentId': 'doc-5', 'missionStatus': 'upcoming'},
+    ]
+
+    def setUp(self):
+        super().setUp()
+        upcoming_snapshots.clear()
+
+    def get(self, **params):
+        with FakeUpstream({'/upcoming': self.launches}) as upstream:
+            with registry.override(upcoming=f"{upstream.url}/upcoming"):
+                return UpcomingStatsAPIView.as_view()(RequestFactory().get('/upcoming/stats/', params))
+
+    def test_stats_match_a_count_over_the_launches(self):
+        data = self.get().data['data']
+
+        self.assertEqual(data, {
+            'total_launches': 5,
+            'upcoming_launches': 4,
+            'starlink_missions': 2,
+            'live_launches': 1,
+            'ongoing_launches': 1,
+            'vehicles': {'Falcon 9': 3, 'Falcon Heavy': 1, 'Unknown': 1},
+            'launch_sites': {'SLC-40': 3, 'LC-39A': 1, 'Unknown': 1},
+        })
+
+    def test_group_by_combinations(self):
+        data = self.get(group_by='vehicle, missionType').data['data']
+
+        self.assertEqual(data['group_by'], ['vehicle', 'missionType'])
+        self.assertEqual(data['groups'][0], {'vehicle': 'Falcon 9', 'missionType': 'crew', 'count': 2})
+        self.assertCountEqual(data['groups'][1:], [
+            {'vehicle': 'Falcon 9', 'missionType': 'starlink', 'count': 1},
+            {'vehicle': 'Falcon Heavy', 'missionType': 'starlink', 'count': 1},
+            {'vehicle': 'Unknown', 'missionType': 'Unknown', 'count': 1},
+        ])
+
+    def test_invalid_group_by_is_rejected(self):
+        response = self.get(group_by='vehicle,rocket')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Cannot group by 'rocket'", response.data['message'])
+
+    def test_list_counts_cover_valid_launches_only(self):
+        snapshot = snapshot_upcoming_launches(self.launches)
+        validated_launches, launch_errors, aggregates = validate_upcoming_launches(snapshot)
+
+        self.assertEqual(aggregates.total, len(validated_launches))
+        self.assertEqual(aggregates.count('missionStatus', 'upcoming'), len([
+            launch for launch in validated_launches if launch['missionStatus'] == 'upcoming'
+        ]))
@@ -1,10 +1,14 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 app_name = 'upcoming'
 
+# Serve the async views when deployed under ASGI
+ASYNC_VIEWS = settings.UPSTREAM.get('ASYNC_VIEWS', False)
+
 urlpatterns = [
-    path('', views.UpcomingLaunchesAPIView.as_view(), name='spacex-upcoming'),
-    path('stats/', views.UpcomingStatsAPIView.as_view(), name='upcoming-stats'),
+    path('', (views.AsyncUpcomingLaunchesAPIView if ASYNC_VIEWS else views.UpcomingLaunchesAPIView).as_view(), name='spacex-upcoming'),
+    path('stats/', (views.AsyncUpcomingStatsAPIView if ASYNC_VIEWS else views.UpcomingStatsAPIView).as_view(), name='upcoming-stats'),
     path('health/', views.HealthCheckView.as_view(), name='health-check'),
 ]
@@ -1,80 +1,161 @@
-import base64
-import hashlib
-import requests
 import logging
-from cryptography.fernet import Fernet
-from django.conf import settings
-from .exceptions import APIError, DecryptionError, ValidationError
+from django.db.models import Count, Max
+from apps.upstream.aggregates import AggregateEngine
+from apps.upstream.snapshot import Snapshot, SnapshotCache
+from apps.upstream.utils import afetch_json, fetch_json, serve_from_store
+from apps.upstream.validation import MemoizedValidator, record_key
+from .exceptions import ValidationError
+from .models import UpcomingLaunch
+from .serializers import UpcomingLaunchSerializer
 
 logger = logging.getLogger(__name__)
 
+# Encrypted upstream URL, registered with the endpoint registry at startup
+UPCOMING_ENCRYPTED_URL = "gAAAAABotdJZNB02tWhl-EeJ_c4nqzsZV2m2paTBK7GNs6MeGyDuUd_83mBfICcDSC65rUraQ_1VOhYwGDbnYiZreqxy_JLUVxf4wcRF7CzuR7-6rZe6lwzaA9VCQpfA10q6HR_HJHtjiF1O4T8tdvmDEn_DutgYaPof252FMXaCMxmLBhriVRU="
 
-def decrypt_url(encrypted_data, key):
+
+def fetch_upcoming_launches(refresh=False):
+    """
+    Fetch the upcoming launches data from the upstream API.
+    """
+    return fetch_json('upcoming', label='upcoming launches data', expected_type=list, refresh=refresh)
+
+
+async def afetch_upcoming_launches(refresh=False):
+    """
+    Async version of fetch_upcoming_launches().
+    """
+    return await afetch_json('upcoming', label='upcoming launches data', expected_type=list, refresh=refresh)
+
+
+
+def sync_upcoming_launches():
+    """
+    Sync the local upcoming launch store with the upstream list.
+    """
+    counts = UpcomingLaunch.sync(fetch_upcoming_launches())
+    logger.info(f"Synced upcoming launch store: {counts}")
+    return counts
+
+
+class UpcomingSnapshot(Snapshot):
+    """
+    One version of the upcoming launches list.
+    """
+
+
+upcoming_snapshots = SnapshotCache(UpcomingSnapshot)
+
+# Validation results per upcoming launch version (documentId + updatedAt)
+upcoming_validator = MemoizedValidator(UpcomingLaunchSerializer)
+
+# Dimensions of the upcoming launch counts, usable in /upcoming/stats/?group_by=
+UPCOMING_DIMENSIONS = ('missionStatus', 'missionType', 'vehicle', 'launchSite', 'isLive', 'isOngoing')
+
+# Counts of every upcoming list, and of its valid launches for /upcoming/
+upcoming_aggregates = AggregateEngine(UPCOMING_DIMENSIONS)
+validated_upcoming_aggregates = AggregateEngine(('missionStatus', 'missionType'))
+
+
+def get_upcoming_snapshot():
+    """
+    Return the snapshot of the upcoming launches, read from the local store
+    when SERVE_FROM_STORE is set and the store has been synced, otherwise
+    from upstream.
+    """
+    if serve_from_store():
+        state = UpcomingLaunch.objects.aggregate(count=Count('id'), synced_at=Max('synced_at'))
+        if state['count']:
+            return upcoming_snapshots.get(('store', state['count'], state['synced_at']), UpcomingLaunch.load)
+    
+    return snapshot_upcoming_launches(fetch_upcoming_launches())
+
+
+def snapshot_upcoming_launches(raw_data):
+    """
+    Return the snapshot of an upstream upcoming launches payload.
+    """
+    return upcoming_snapshots.get(('upstream', id(raw_data)), lambda: raw_data, source=raw_data)
+
+
+def validate_upcoming_launches(snapshot):
+    """
+    Validate every launch of an upcoming snapshot.
+    
+    Returns (validated launches, errors, aggregates): each error has the
+    ``launch_index`` of the invalid launch, and the aggregates count the
+    valid launches by missionStatus and missionType. The result is kept for
+    the life of the snapshot, and launches unchanged since an earlier
+    snapshot reuse their earlier validation.
     """
-    Decrypt the encrypted URL using the provided key.
+    def build():
+        validated_launches = []
+        validated_keys = []
+        launch_errors = []
+        for idx, launch_data in enumerate(snapshot.records):
+            validated_data, errors = upcoming_validator.validate(launch_data)
+            if errors is None:
+                validated_launches.append(validated_data)
+                validated_keys.append(record_key(launch_data))
+            else:
+                launch_errors.append({
+                    'launch_index': idx,
+                    'errors': errors
+                })
+        aggregates = validated_upcoming_aggregates.aggregate(validated_launches, validated_keys)
+        return validated_launches, launch_errors, aggregates
+    return snapshot.memoize('validated', build)
+
+
+def aggregate_upcoming_launches(snapshot):
     """
-    try:
-        # Create a proper Fernet key from the Django secret key
-        hashed_key = hashlib.sha256(key.encode()).digest()
-        fernet_key = base64.urlsafe_b64encode(hashed_key)
-        
-        # Create Fernet cipher
-        cipher = Fernet(fernet_key)
-        
-        # Decrypt the URL
-        decrypted_url = cipher.decrypt(encrypted_data.encode())
-        
-        return decrypted_url.decode()
+    Return the counts of an upcoming snapshot's launches by UPCOMING_DIMENSIONS.
     
-    except Exception as e:
-        logger.error(f"URL decryption failed: {str(e)}")
-        raise DecryptionError("Failed to decrypt API URL")
+    Computed once per snapshot, starting from the counts of the previous
+    upcoming list so only new, changed or removed launches are counted again.
+    """
+    return snapshot.memoize('aggregates', lambda: upcoming_aggregates.aggregate(snapshot.records))
 
 
-def fetch_upcoming_launches():
+def parse_group_by(value):
     """
-    Decrypt the upcoming launches API URL and fetch the data.
+    Parse a comma-separated ``group_by`` query parameter into unique dimensions, in order.
+    
+    Raises:
+        ValidationError: If a dimension is not one of UPCOMING_DIMENSIONS
     """
-    encrypted_url = "gAAAAABotdJZNB02tWhl-EeJ_c4nqzsZV2m2paTBK7GNs6MeGyDuUd_83mBfICcDSC65rUraQ_1VOhYwGDbnYiZreqxy_JLUVxf4wcRF7CzuR7-6rZe6lwzaA9VCQpfA10q6HR_HJHtjiF1O4T8tdvmDEn_DutgYaPof252FMXaCMxmLBhriVRU="
-    secret_key = settings.SECRET_KEY
+    names = []
+    for name in (value or '').split(','):
+        name = name.strip()
+        if not name or name in names:
+            continue
+        if name not in UPCOMING_DIMENSIONS:
+            raise ValidationError(f"Cannot group by '{name}'. Group fields: {', '.join(UPCOMING_DIMENSIONS)}.")
+        names.append(name)
+    return tuple(names)
+
+
+def summarize_upcoming_launches(raw_data, group_by=()):
+    """
+    Calculate the statistics returned by /upcoming/stats/ from the upcoming launches data.
+    
+    With ``group_by`` (dimensions from parse_group_by), the statistics also
+    list the number of launches per combination of those dimensions.
+    """
+    aggregates = aggregate_upcoming_launches(snapshot_upcoming_launches(raw_data))
+    
+    summary = {
+        'total_launches': aggregates.total,
+        'upcoming_launches': aggregates.count('missionStatus', 'upcoming'),
+        'starlink_missions': aggregates.count('missionType', 'starlink'),
+        'live_launches': aggregates.count('isLive', True),
+        'ongoing_launches': aggregates.count('isOngoing', True),
+        'vehicles': aggregates.counts('vehicle'),
+        'launch_sites': aggregates.counts('launchSite')
+    }
     
-    try:
-        # Decrypt the URL
-        decrypted_url = decrypt_url(encrypted_url, secret_key)
-        
-        # Make the API request with timeout
-        response = requests.get(decrypted_url, timeout=30)
-        
-        # Check for HTTP errors
-        if response.status_code == 404:
-            raise APIError("Upcoming launches data not found")
-        elif response.status_code >= 500:
-            raise APIError("SpaceX API is currently unavailable")
-        elif response.status_code != 200:
-            raise APIError("Failed to retrieve upcoming launches data")
-        
-        # Validate response content
-        try:
-            data = response.json()
-            if not isinstance(data, list):
-                raise ValidationError("Invalid data format received from SpaceX API")
-            return data
-        except ValueError as e:
-            logger.error(f"Invalid JSON response from SpaceX API: {str(e)}")
-            raise ValidationError("Invalid response format from SpaceX API")
+    if group_by:
+        summary['group_by'] = list(group_by)
+        summary['groups'] = aggregates.rows(group_by)
     
-    except DecryptionError:
-        raise
-    except APIError:
-        raise
-    except ValidationError:
-        raise
-    except requests.exceptions.Timeout:
-        logger.error("Timeout while fetching upcoming launches data")
-        raise APIError("Request timeout - SpaceX API is taking too long to respond")
-    except requests.exceptions.ConnectionError:
-        logger.error("Connection error while fetching upcoming launches data")
-        raise APIError("Unable to connect to SpaceX API")
-    except Exception as e:
-        logger.error(f"Unexpected error fetching upcoming launches data: {str(e)}")
-        raise APIError("An unexpected error occurred while fetching upcoming launches data")
+    return summary
@@ -1,15 +1,19 @@
 from rest_framework.views import APIView
+from apps.upstream.views import AsyncUpstreamAPIView, UpstreamAPIView
 from rest_framework.response import Response
 from rest_framework import status
-from .utils import fetch_upcoming_launches
-from .serializers import UpcomingLaunchesResponseSerializer, UpcomingLaunchSerializer
+from apps.upstream.fields import Projection
+from apps.upstream.pagination import SnapshotCursorPagination
+from apps.upstream.utils import serve_from_store
+from .utils import afetch_upcoming_launches, upcoming_snapshots, fetch_upcoming_launches, get_upcoming_snapshot, parse_group_by, snapshot_upcoming_launches, summarize_upcoming_launches, validate_upcoming_launches
+from .serializers import UpcomingLaunchesResponseSerializer
 from .exceptions import APIError, DecryptionError, ValidationError
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-class UpcomingLaunchesAPIView(APIView):
+class UpcomingLaunchesAPIView(UpstreamAPIView):
     """
     API view to get upcoming SpaceX launches.
     Fetches data from encrypted SpaceX API and returns structured response.
@@ -19,32 +23,37 @@ class UpcomingLaunchesAPIView(APIView):
         """
         GET /upcoming/
         Returns upcoming SpaceX launches data with statistics.
+        Paginated with opaque cursors: page_size (default 20, max 100) and cursor
+        (from the next/previous links)
+        Supports sparse fieldsets: fields and exclude (comma-separated, dotted paths
+        for nested values, e.g. fields=title,link,imageDesktop.formats.thumbnail)
         """
         try:
-            # Fetch data from the external SpaceX API
-            raw_data = fetch_upcoming_launches()
+            projection = Projection.from_params(request.GET)
+            
+            # Fetch data from the local store or the external SpaceX API
+            # (or the snapshot the cursor was issued for)
+            paginator = SnapshotCursorPagination()
+            snapshot = paginator.get_snapshot(request, get_upcoming_snapshot(), upcoming_snapshots)
             
-            # Validate individual launches
-            launch_errors = []
-            validated_launches = []
+            # Answer from the client's or our own copy of an identical earlier response
+            cached = self.get_cached_response(request, snapshot.version, snapshot.last_modified)
+            if cached is not None:
+                return cached
             
-            for idx, launch_data in enumerate(raw_data):
-                launch_serializer = UpcomingLaunchSerializer(data=launch_data)
-                if launch_serializer.is_valid():
-                    validated_launches.append(launch_serializer.validated_data)
-                else:
-                    launch_errors.append({
-                        'launch_index': idx,
-                        'errors': launch_serializer.errors
-                    })
+            # Validate individual launches (only those not validated before)
+            validated_launches, launch_errors, aggregates = validate_upcoming_launches(snapshot)
             
-            # Create response with statistics
-            response_serializer = UpcomingLaunchesResponseSerializer(validated_launches)
+            # Create response with statistics and the requested page
+            page = paginator.paginate_records(validated_launches, snapshot, request)
+            if projection:
+                page = [projection.apply(launch) for launch in page]
+            response_serializer = UpcomingLaunchesResponseSerializer(validated_launches, context={'page': page, 'aggregates': aggregates})
             
             response_data = {
                 'success': True,
                 'message': 'Upcoming launches retrieved successfully',
-                'data': response_serializer.data
+                'data': {**response_serializer.data, **paginator.get_pagination_data()}
             }
             
             # Log validation errors but don't expose them to the user
@@ -87,7 +96,7 @@ class UpcomingLaunchesAPIView(APIView):
 
 
 
-class UpcomingStatsAPIView(APIView):
+class UpcomingStatsAPIView(UpstreamAPIView):
     """
     API view to get statistics about upcoming launches.
     """
@@ -96,42 +105,35 @@ class UpcomingStatsAPIView(APIView):
         """
         GET /upcoming/stats/
         Returns statistics about upcoming launches.
+        Supports query parameter: group_by, comma-separated dimensions (missionStatus,
+        missionType, vehicle, launchSite, isLive, isOngoing) to count launches per
+        combination of their values (e.g. group_by=vehicle,missionType)
         """
         try:
-            # Fetch data from the external SpaceX API
+            group_by = parse_group_by(request.GET.get('group_by'))
+        except ValidationError as e:
+            logger.error(f"Validation error in UpcomingStatsAPIView: {str(e)}")
+            return Response({
+                'success': False,
+                'message': str(e),
+                'data': None
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            # Fetch data from the external SpaceX API; its counts are
+            # maintained per snapshot
             raw_data = fetch_upcoming_launches()
+            snapshot = snapshot_upcoming_launches(raw_data)
             
-            # Calculate statistics
-            total_launches = len(raw_data)
-            upcoming_launches = len([launch for launch in raw_data if launch.get('missionStatus') == 'upcoming'])
-            starlink_missions = len([launch for launch in raw_data if launch.get('missionType') == 'starlink'])
-            live_launches = len([launch for launch in raw_data if launch.get('isLive') == True])
-            ongoing_launches = len([launch for launch in raw_data if launch.get('isOngoing') == True])
-            
-            # Group by vehicle
-            vehicles = {}
-            for launch in raw_data:
-                vehicle = launch.get('vehicle', 'Unknown')
-                vehicles[vehicle] = vehicles.get(vehicle, 0) + 1
-            
-            # Group by launch site
-            launch_sites = {}
-            for launch in raw_data:
-                site = launch.get('launchSite', 'Unknown')
-                launch_sites[site] = launch_sites.get(site, 0) + 1
+            # Answer from the client's or our own copy of an identical earlier response
+            cached = self.get_cached_response(request, last_modified=snapshot.last_modified)
+            if cached is not None:
+                return cached
             
             return Response({
                 'success': True,
                 'message': 'Upcoming launches statistics retrieved successfully',
-                'data': {
-                    'total_launches': total_launches,
-                    'upcoming_launches': upcoming_launches,
-                    'starlink_missions': starlink_missions,
-                    'live_launches': live_launches,
-                    'ongoing_launches': ongoing_launches,
-                    'vehicles': vehicles,
-                    'launch_sites': launch_sites
-                }
+                'data': summarize_upcoming_launches(raw_data, group_by)
             }, status=status.HTTP_200_OK)
         
         except DecryptionError as e:
@@ -177,3 +179,26 @@ class HealthCheckView(APIView):
             'status': 'healthy',
             'message': 'Upcoming Launches API is running'
         }, status=status.HTTP_200_OK)
+
+
+class AsyncUpcomingLaunchesAPIView(AsyncUpstreamAPIView, UpcomingLaunchesAPIView):
+    """
+    Async variant of UpcomingLaunchesAPIView for ASGI deployments.
+    """
+    
+    @property
+    def uses_database(self):
+        return serve_from_store()
+    
+    async def prefetch(self, request):
+        if not serve_from_store():
+            await afetch_upcoming_launches()
+
+
+class AsyncUpcomingStatsAPIView(AsyncUpstreamAPIView, UpcomingStatsAPIView):
+    """
+    Async variant of UpcomingStatsAPIView for ASGI deployments.
+    """
+    
+    async def prefetch(self, request):
+        await afetch_upcoming_launches()
@@ -0,0 +1,125 @@
+import threading
+
+from .validation import record_key
+
+# Dimension value of records that do not have the key
+UNKNOWN = 'Unknown'
+
+
+def dimension_value(record, name):
+    """Return the value a record is counted under for a dimension"""
+    value = record.get(name, UNKNOWN)
+    try:
+        hash(value)
+    except TypeError:
+        return str(value)
+    return value
+
+
+class Aggregates:
+    """
+    Record counts of one snapshot per combination of dimension values.
+
+    ``cells`` maps a tuple of values (one per dimension, in order) to the
+    number of records with those values. Any grouping is derived from the
+    cells, so its cost depends on the number of distinct combinations and
+    not on the number of records; each grouping is computed once.
+    """
+
+    def __init__(self, dimensions, cells, total):
+        self.dimensions = dimensions
+        self.cells = cells
+        self.total = total
+        self._groups = {}
+        self._lock = threading.Lock()
+
+    def group_by(self, names):
+        """Return a dict of value tuple (one value per name) -> record count"""
+        names = tuple(names)
+        groups = self._groups.get(names)
+        if groups is not None:
+            return groups
+
+        positions = [self.dimensions.index(name) for name in names]
+        groups = {}
+        for cell, count in self.cells.items():
+            key = tuple(cell[position] for position in positions)
+            groups[key] = groups.get(key, 0) + count
+        with self._lock:
+            return self._groups.setdefault(names, groups)
+
+    def counts(self, name):
+        """Return a dict of value -> record count for one dimension"""
+        return {key[0]: count for key, count in self.group_by((name,)).items()}
+
+    def count(self, name, value):
+        """Return the number of records whose ``name`` equals ``value``"""
+        return self.group_by((name,)).get((value,), 0)
+
+    def rows(self, names):
+        """Return the grouping by ``names`` as rows of values plus a count, largest groups first"""
+        groups = sorted(self.group_by(names).items(), key=lambda item: -item[1])
+        return [dict(zip(names, key), count=count) for key, count in groups]
+
+
+class AggregateEngine:
+    """
+    Maintains the Aggregates of successive versions of a record list.
+
+    The engine keeps the cell of every record of the last list it
+    aggregated, keyed by ``record_key`` (documentId plus updatedAt or a
+    content hash). The next list starts from the previous counts: only
+    records that were added, removed or changed move between cells.
+    """
+
+    def __init__(self, dimensions):
+        self.dimensions = tuple(dimensions)
+        self._cells = {}
+        self._record_cells = {}
+        self._lock = threading.Lock()
+
+    def cell(self, record):
+        return tuple(dimension_value(record, name) for name in self.dimensions)
+
+    def aggregate(self, records, keys=None):
+        """
+        Return the Aggregates of ``records``. ``keys`` are the records'
+        versions and default to their ``record_key``.
+        """
+        keys = [record_key(record) for record in records] if keys is None else list(keys)
+
+        # Number of records per key; duplicate records share a key
+        multiplicity = {}
+        first = {}
+        for key, record in zip(keys, records):
+            if key in multiplicity:
+                multiplicity[key] += 1
+            else:
+                multiplicity[key] = 1
+                first[key] = record
+
+        with self._lock:
+            previous = self._record_cells
+            cells = dict(self._cells)
+            record_cells = {}
+
+            # Records seen before keep their cell and only adjust its count
+            for key, count in multiplicity.items():
+                known = previous.get(key)
+                if known is None:
+                    cell, delta = self.cell(first[key]), count
+                else:
+                    cell, delta = known[0], count - known[1]
+                if delta:
+                    cells[cell] = cells.get(cell, 0) + delta
+                record_cells[key] = (cell, count)
+
+            # Records that are gone leave their cells
+            for key, (cell, count) in previous.items():
+                if key not in multiplicity:
+                    cells[cell] -= count
+            cells = {cell: count for cell, count in cells.items() if count > 0}
+
+            self._cells = cells
+            self._record_cells = record_cells
+            return Aggregates(self.dimensions, cells, len(keys))
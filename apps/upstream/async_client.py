@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import ssl
+import weakref
+
+import certifi
+import httpx
+
+from .client import UpstreamResponse, client, content_digest, get_endpoint_options
+from .exceptions import APIError
+from .registry import registry
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncUpstreamClient:
+    """
+    Asynchronous counterpart of UpstreamClient for the async views.
+
+    Keeps one pooled ``httpx.AsyncClient`` per endpoint and event loop (an
+    httpx client cannot be shared between loops). Requests, validators and
+    error mapping behave exactly like the sync client.
+    """
+
+    def __init__(self):
+        self._clients = weakref.WeakKeyDictionary()
+        self._ssl_context = None
+
+    def get_ssl_context(self):
+        """Return the SSL context shared by all clients; building one per client is slow"""
+        if self._ssl_context is None:
+            self._ssl_context = ssl.create_default_context(cafile=certifi.where())
+        return self._ssl_context
+
+    def get_client(self, endpoint):
+        """Return the pooled httpx client for an endpoint on the running loop"""
+        clients = self._clients.setdefault(asyncio.get_running_loop(), {})
+        http_client = clients.get(endpoint)
+        if http_client is None:
+            options = get_endpoint_options(endpoint)
+            http_client = clients[endpoint] = httpx.AsyncClient(
+                verify=self.get_ssl_context(),
+                timeout=httpx.Timeout(options['TIMEOUT'], connect=options['CONNECT_TIMEOUT'] or options['TIMEOUT']),
+                limits=httpx.Limits(
+                    max_connections=options.get('MAX_CONNECTIONS'),
+                    max_keepalive_connections=options['POOL_SIZE'],
+                ),
+            )
+        return http_client
+
+    async def fetch(self, endpoint, path=None, label='data', expected_type=None, etag=None, last_modified=None):
+        """
+        GET an endpoint (plus optional ``path``) and return an UpstreamResponse.
+
+        See ``UpstreamClient.fetch``; this is the same request made without
+        blocking the event loop.
+        """
+        url = registry.build_url(endpoint, path)
+
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        try:
+            response = await self.get_client(endpoint).get(url, headers=headers)
+        except httpx.TimeoutException:
+            logger.error(f"Timeout occurred while fetching {label}")
+            raise APIError("Service temporarily unavailable. Please try again later.")
+        except httpx.NetworkError:
+            logger.error(f"Connection error occurred while fetching {label}")
+            raise APIError("Unable to connect to data source. Please try again later.")
+        except Exception as e:
+            logger.error(f"Unexpected error fetching {label}: {str(e)}")
+            raise APIError("An unexpected error occurred. Please try again later.")
+
+        if response.status_code == 304 and headers:
+            return UpstreamResponse(
+                None,
+                etag=response.headers.get('ETag', etag),
+                last_modified=response.headers.get('Last-Modified', last_modified),
+                not_modified=True,
+            )
+
+        return UpstreamResponse(
+            client.parse_response(response, label, expected_type),
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified'),
+            digest=content_digest(response.content),
+        )
+
+    async def aclose(self):
+        """Close the clients of the running event loop"""
+        clients = self._clients.pop(asyncio.get_running_loop(), {})
+        for http_client in clients.values():
+            await http_client.aclose()
+
+
+async_client = AsyncUpstreamClient()
@@ -0,0 +1,285 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(endpoint, path=None):
+    """Return the cache key of an endpoint, qualified by ``path`` when given"""
+    if path:
+        return f"upstream:{endpoint}:{path}"
+    return f"upstream:{endpoint}"
+
+
+class CacheEntry:
+    """
+    A decoded upstream payload (or what the endpoint's registered loader
+    built from it) together with its freshness information, the
+    upstream validators (``ETag``/``Last-Modified``) used to revalidate it
+    and its ``version``, a digest of the upstream body.
+
+    Cached payloads are shared between requests and must be treated as
+    read-only by callers.
+    """
+
+    __slots__ = ('data', 'fetched_at', 'expires_at', 'etag', 'last_modified', 'version')
+
+    def __init__(self, data, fetched_at, expires_at, etag=None, last_modified=None, version=None):
+        self.data = data
+        self.fetched_at = fetched_at
+        self.expires_at = expires_at
+        self.etag = etag
+        self.last_modified = last_modified
+        self.version = version
+
+    @classmethod
+    def create(cls, data, ttl, etag=None, last_modified=None, version=None):
+        now = time.time()
+        return cls(data, now, now + ttl, etag, last_modified, version)
+
+    def revalidated(self, ttl, etag=None, last_modified=None):
+        """Return a copy of this entry that is fresh for another ``ttl`` seconds"""
+        return self.create(self.data, ttl, etag or self.etag, last_modified or self.last_modified, self.version)
+
+    def is_fresh(self, now=None):
+        return (now or time.time()) < self.expires_at
+
+    def age(self, now=None):
+        return max(0.0, (now or time.time()) - self.fetched_at)
+
+    def to_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, values):
+        return cls(**values)
+
+
+def stamp_key(key):
+    """Backend key of the ``fetched_at`` stored next to the payload of ``key``"""
+    return f'{key}:fetched_at'
+
+
+class TieredCache:
+    """
+    Two-tier cache for upstream payloads.
+
+    An in-process LRU tier answers most lookups without any serialization.
+    Behind it sits a Django cache backend, so entries survive worker restarts
+    and can be shared between workers when a shared backend is configured.
+
+    Next to each payload the backend keeps its ``fetched_at`` under a stamp
+    key. When the local entry has expired only the stamp is read, and the
+    payload is only read (and unpickled) when the backend holds a newer one.
+    """
+
+    def __init__(self, max_entries=512, alias='default'):
+        self.max_entries = max_entries
+        self.alias = alias
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = defaultdict(lambda: {'local_hits': 0, 'backend_hits': 0, 'misses': 0})
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def get(self, key, count=True):
+        """
+        Return the newest entry for ``key`` from either tier, or None.
+
+        The returned entry may be expired; callers decide what to do with it.
+        A fresh backend entry replaces an expired local one. Lookups made with
+        ``count=False`` do not update the hit/miss counters.
+        """
+        entry = self._get_local(key, count)
+        if entry is not None and entry.is_fresh():
+            return entry
+
+        try:
+            values = None
+            if entry is None or self._is_newer(self.backend.get(stamp_key(key)), entry):
+                values = self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Upstream cache backend read failed for {key}: {str(e)}")
+            values = None
+        return self._merge_backend(key, entry, values, count)
+
+    async def aget(self, key, count=True):
+        """Async version of ``get`` that does not block on the backend tier"""
+        entry = self._get_local(key, count)
+        if entry is not None and entry.is_fresh():
+            return entry
+
+        try:
+            values = None
+            if entry is None or self._is_newer(await self.backend.aget(stamp_key(key)), entry):
+                values = await self.backend.aget(key)
+        except Exception as e:
+            logger.warning(f"Upstream cache backend read failed for {key}: {str(e)}")
+            values = None
+        return self._merge_backend(key, entry, values, count)
+
+    def set(self, key, entry, timeout):
+        """Store ``entry`` in both tiers; ``timeout`` bounds the backend copy"""
+        self._store_local(key, entry)
+        try:
+            self.backend.set_many(self._backend_values(key, entry), timeout=max(1, int(timeout)))
+        except Exception as e:
+            logger.warning(f"Upstream cache backend write failed for {key}: {str(e)}")
+
+    async def aset(self, key, entry, timeout):
+        """Async version of ``set``"""
+        self._store_local(key, entry)
+        try:
+            await self.backend.aset_many(self._backend_values(key, entry), timeout=max(1, int(timeout)))
+        except Exception as e:
+            logger.warning(f"Upstream cache backend write failed for {key}: {str(e)}")
+
+    @staticmethod
+    def _backend_values(key, entry):
+        return {key: entry.to_dict(), stamp_key(key): entry.fetched_at}
+
+    @staticmethod
+    def _is_newer(fetched_at, entry):
+        """Whether a backend stamp is for a payload newer than the local ``entry``"""
+        return fetched_at is not None and fetched_at > entry.fetched_at
+
+    def _get_local(self, key, count):
+        """Return the local entry for ``key``, counting a hit when it is fresh"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                if count and entry.is_fresh():
+                    self._counters[key.split(':')[1]]['local_hits'] += 1
+            return entry
+
+    def _merge_backend(self, key, entry, values, count):
+        """Prefer a newer backend copy over the local entry and count the lookup"""
+        if values is not None:
+            backend_entry = CacheEntry.from_dict(values)
+            if entry is None or backend_entry.fetched_at > entry.fetched_at:
+                entry = backend_entry
+                self._store_local(key, entry)
+
+        if count:
+            with self._lock:
+                counters = self._counters[key.split(':')[1]]
+                if entry is not None and entry.is_fresh():
+                    counters['backend_hits'] += 1
+                else:
+                    counters['misses'] += 1
+        return entry
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+        try:
+            self.backend.delete_many([key, stamp_key(key)])
+        except Exception as e:
+            logger.warning(f"Upstream cache backend delete failed for {key}: {str(e)}")
+
+    def clear(self):
+        """Drop the local tier and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+
+    def _store_local(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        """Return hit/miss counters per endpoint plus the local tier size"""
+        with self._lock:
+            endpoints = {}
+            for endpoint, counters in sorted(self._counters.items()):
+                lookups = sum(counters.values())
+                hits = counters['local_hits'] + counters['backend_hits']
+                endpoints[endpoint] = dict(
+                    counters,
+                    hit_ratio=round(hits / lookups, 4) if lookups else None,
+                )
+            return {
+                'local_entries': len(self._entries),
+                'max_local_entries': self.max_entries,
+                'backend': self.alias,
+                'endpoints': endpoints,
+            }
+
+
+class SizedLRU:
+    """
+    Thread-safe LRU of byte strings bounded by their total size, with
+    hit/miss counters.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value[0]
+
+    def set(self, key, value, size=None):
+        """Store ``value`` (``size`` bytes, by default its length); oversized values are not kept"""
+        size = len(value) if size is None else size
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[1]
+            self._entries[key] = (value, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+upstream_cache = TieredCache(
+    max_entries=getattr(settings, 'UPSTREAM', {}).get('CACHE_MAX_ENTRIES', 512),
+    alias=getattr(settings, 'UPSTREAM', {}).get('CACHE_ALIAS', 'default'),
+)
+
+
+# Rendered bytes of successful API responses (see UpstreamAPIView.get_cached_response)
+rendered_responses = SizedLRU(getattr(settings, 'RENDERED_CACHE_MAX_BYTES', 32 * 1024 * 1024))
@@ -0,0 +1,189 @@
+import hashlib
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+from .exceptions import APIError, NotFoundError, ValidationError
+from .registry import registry
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_OPTIONS = {
+    'TIMEOUT': 30,
+    'CONNECT_TIMEOUT': None,
+    'POOL_SIZE': 10,
+    'TTL': 60,
+    'STALE_WHILE_REVALIDATE': 0,
+    'STALE_IF_ERROR': 0,
+    'BREAKER_FAILURE_THRESHOLD': 5,
+    'BREAKER_RESET_TIMEOUT': 30,
+    'BREAKER_SLOW_CALL': None,
+    'MAX_CONCURRENT': None,
+    'BULKHEAD_WAIT': 0,
+}
+
+
+def get_endpoint_options(endpoint):
+    """
+    Return the effective options for an upstream endpoint.
+
+    Values from ``settings.UPSTREAM['ENDPOINTS'][endpoint]`` override
+    ``settings.UPSTREAM['DEFAULTS']``, which override ``DEFAULT_OPTIONS``.
+    """
+    config = getattr(settings, 'UPSTREAM', {})
+    options = dict(DEFAULT_OPTIONS)
+    options.update(config.get('DEFAULTS', {}))
+    options.update(config.get('ENDPOINTS', {}).get(endpoint, {}))
+    return options
+
+
+def content_digest(content):
+    """Short digest of a response body, used as the version of its payload"""
+    return hashlib.sha1(content).hexdigest()[:16]
+
+
+class UpstreamResponse:
+    """
+    Decoded upstream payload plus the validators needed to revalidate it and
+    a digest of the body identifying this version of the payload.
+    """
+
+    __slots__ = ('data', 'etag', 'last_modified', 'not_modified', 'digest')
+
+    def __init__(self, data, etag=None, last_modified=None, not_modified=False, digest=None):
+        self.data = data
+        self.etag = etag
+        self.last_modified = last_modified
+        self.not_modified = not_modified
+        self.digest = digest
+
+
+class UpstreamClient:
+    """
+    Process-wide HTTP client for the upstream SpaceX API.
+
+    Each endpoint gets its own ``requests.Session`` with a keep-alive
+    connection pool sized from its options, so repeated calls reuse TCP/TLS
+    connections instead of paying a new handshake per request.
+    """
+
+    def __init__(self):
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def get_session(self, endpoint):
+        """Return the pooled session for an endpoint, creating it on first use"""
+        session = self._sessions.get(endpoint)
+        if session is not None:
+            return session
+
+        with self._lock:
+            session = self._sessions.get(endpoint)
+            if session is None:
+                pool_size = get_endpoint_options(endpoint)['POOL_SIZE']
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+                session = requests.Session()
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._sessions[endpoint] = session
+        return session
+
+    def get_timeout(self, endpoint):
+        """Return the ``requests`` timeout for an endpoint"""
+        options = get_endpoint_options(endpoint)
+        if options['CONNECT_TIMEOUT'] is None:
+            return options['TIMEOUT']
+        return (options['CONNECT_TIMEOUT'], options['TIMEOUT'])
+
+    def get_json(self, endpoint, path=None, label='data', expected_type=None):
+        """
+        GET an endpoint (plus optional ``path``) and return the decoded JSON.
+        """
+        return self.fetch(endpoint, path, label=label, expected_type=expected_type).data
+
+    def fetch(self, endpoint, path=None, label='data', expected_type=None, etag=None, last_modified=None):
+        """
+        GET an endpoint (plus optional ``path``) and return an UpstreamResponse.
+
+        The URL comes from the endpoint registry and the request goes through
+        the endpoint's connection pool. When ``etag``/``last_modified``
+        validators from an earlier response are given, the request is
+        conditional; a 304 answer is returned with ``not_modified`` set and
+        no body is read or parsed.
+
+        Transport and HTTP failures and unparseable bodies are mapped onto
+        APIError and NotFoundError, and payloads of an unexpected type onto
+        ValidationError, so every app handles upstream errors the same way.
+        """
+        url = registry.build_url(endpoint, path)
+
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        try:
+            response = self.get_session(endpoint).get(url, headers=headers, timeout=self.get_timeout(endpoint))
+        except requests.exceptions.Timeout:
+            logger.error(f"Timeout occurred while fetching {label}")
+            raise APIError("Service temporarily unavailable. Please try again later.")
+        except requests.exceptions.ConnectionError:
+            logger.error(f"Connection error occurred while fetching {label}")
+            raise APIError("Unable to connect to data source. Please try again later.")
+        except Exception as e:
+            logger.error(f"Unexpected error fetching {label}: {str(e)}")
+            raise APIError("An unexpected error occurred. Please try again later.")
+
+        if response.status_code == 304 and headers:
+            return UpstreamResponse(
+                None,
+                etag=response.headers.get('ETag', etag),
+                last_modified=response.headers.get('Last-Modified', last_modified),
+                not_modified=True,
+            )
+
+        return UpstreamResponse(
+            self.parse_response(response, label, expected_type),
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified'),
+            digest=content_digest(response.content),
+        )
+
+    def parse_response(self, response, label='data', expected_type=None):
+        """Map the status code of a response and decode its JSON body"""
+        if response.status_code != 200:
+            logger.error(f"HTTP error occurred while fetching {label}: {response.status_code}")
+            if response.status_code == 404:
+                raise NotFoundError(f"{label[:1].upper()}{label[1:]} not found.")
+            elif response.status_code >= 500:
+                raise APIError("External service error. Please try again later.")
+            else:
+                raise APIError(f"Failed to retrieve {label}.")
+
+        try:
+            data = response.json()
+        except ValueError as e:
+            logger.error(f"Invalid JSON response while fetching {label}: {str(e)}")
+            # A broken upstream body is a server-side failure, not a bad request
+            raise APIError("Invalid response format from SpaceX API")
+
+        if expected_type is not None and not isinstance(data, expected_type):
+            logger.error(f"Unexpected payload type while fetching {label}: {type(data).__name__}")
+            raise ValidationError("Invalid data format received from SpaceX API")
+
+        return data
+
+    def close(self):
+        """Close every pooled session"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+client = UpstreamClient()
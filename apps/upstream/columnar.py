@@ -0,0 +1,273 @@
+"""
+Compact, columnar storage for the records of a snapshot.
+
+Decoded JSON holds every record as a dict with its own copy of each
+string value, so the values that repeat across thousands of records
+(vehicles, launch sites, image mime types and providers) are stored again
+for every record. ``ColumnarRecords`` stores one column per top-level key
+instead:
+
+- keys with few distinct scalar values become categorical columns: a
+  compact array of codes into the distinct values;
+- integer and float keys become ``array`` columns;
+- anything else is kept per record, with nested dicts stored as
+  ``CompactRecord`` (``__slots__``, a key tuple shared by every record of
+  the same shape and a value tuple), lists as tuples and strings shared.
+
+Records are materialized back into dicts, identical to the originals, only
+when they are read. ``get()``, ``rows()`` and ``column()`` read values from
+the columns without building the dicts.
+"""
+from array import array
+from collections.abc import Sequence
+
+# Placeholder of absent keys in the columns; presence is kept by each record's shape
+MISSING = None
+
+# Categorical columns are used when there are at most this many records per distinct value
+CATEGORICAL_RATIO = 4
+
+SCALARS = frozenset((str, int, float, bool, type(None)))
+
+
+def code_array(count):
+    """Return an empty array able to hold codes below ``count``"""
+    if count <= 1 << 8:
+        return array('B')
+    if count <= 1 << 16:
+        return array('H')
+    return array('L')
+
+
+class CompactRecord:
+    """A nested dict as a shared key tuple plus a tuple of compacted values"""
+
+    __slots__ = ('keys', 'values')
+
+    def __init__(self, keys, values):
+        self.keys = keys
+        self.values = values
+
+    def expand(self):
+        return {key: expand(value) for key, value in zip(self.keys, self.values)}
+
+
+def label_key(value):
+    """Key of a scalar value that tells apart values Python compares equal (1, 1.0, True, 0.0, -0.0)"""
+    if type(value) is float:
+        return (float, repr(value))
+    return (type(value), value)
+
+
+class CompactList(tuple):
+    """A list stored as a tuple"""
+
+    __slots__ = ()
+
+
+def compactor(shared):
+    """
+    Return a function compacting decoded JSON values: nested dicts become
+    CompactRecords, lists become CompactLists and equal strings, numbers and
+    key tuples become the one object kept in ``shared``. Values of other
+    types, subclasses included, are kept as they are.
+    """
+    share = shared.setdefault
+
+    def compact(value):
+        kind = type(value)
+        if kind is str:
+            return share(value, value)
+        if kind is dict:
+            keys = tuple(value)
+            return CompactRecord(share(keys, keys), tuple([compact(item) for item in value.values()]))
+        if kind is list:
+            return CompactList([compact(item) for item in value])
+        if kind is int or kind is float:
+            return share(label_key(value), value)
+        return value
+
+    return compact
+
+
+def expand(value):
+    """Return a compacted value as decoded JSON"""
+    kind = type(value)
+    if kind is CompactRecord:
+        return value.expand()
+    if kind is CompactList:
+        return [expand(item) for item in value]
+    return value
+
+
+class CategoricalColumn:
+    __slots__ = ('codes', 'labels')
+
+    def __init__(self, values, compact):
+        lookup = {}
+        self.labels = []
+        codes = []
+        for value in values:
+            key = label_key(value)
+            code = lookup.get(key)
+            if code is None:
+                code = lookup[key] = len(self.labels)
+                self.labels.append(compact(value))
+            codes.append(code)
+        self.codes = code_array(len(self.labels))
+        self.codes.extend(codes)
+
+    def __getitem__(self, position):
+        return self.labels[self.codes[position]]
+
+    def values(self):
+        labels = self.labels
+        return [labels[code] for code in self.codes]
+
+
+class ArrayColumn:
+    __slots__ = ('items',)
+
+    def __init__(self, typecode, values):
+        self.items = array(typecode, (0 if value is MISSING else value for value in values))
+
+    def __getitem__(self, position):
+        return self.items[position]
+
+    def values(self):
+        return self.items.tolist()
+
+
+class ObjectColumn:
+    __slots__ = ('items',)
+
+    def __init__(self, values, compact):
+        self.items = [compact(value) for value in values]
+
+    def __getitem__(self, position):
+        return expand(self.items[position])
+
+    def values(self):
+        return [expand(item) for item in self.items]
+
+
+def build_column(values, present, compact):
+    """Return the most compact column that reproduces ``values`` exactly"""
+    types = {type(value) for value in present}
+    if types == {int} and all(-(1 << 63) <= value < 1 << 63 for value in present):
+        return ArrayColumn('q', values)
+    if types == {float}:
+        return ArrayColumn('d', values)
+    if types <= SCALARS:
+        column = CategoricalColumn(values, compact)
+        if len(column.labels) * CATEGORICAL_RATIO <= len(values):
+            return column
+    return ObjectColumn(values, compact)
+
+
+class Row:
+    """Dict-like ``get`` access to one record of a ColumnarRecords"""
+
+    __slots__ = ('records', 'position')
+
+    def __init__(self, records, position):
+        self.records = records
+        self.position = position
+
+    def get(self, key, default=None):
+        return self.records.get(self.position, key, default)
+
+
+class ColumnarRecords(Sequence):
+    """
+    The records of a list payload stored by column. Indexing and iteration
+    return new dicts equal to the original records; treat them as read-only
+    copies.
+
+    Items of the list that are not dicts have no columns: they are kept
+    whole (compacted) under the ``NOT_A_RECORD`` shape, read back as they
+    were and have no values for any key.
+    """
+
+    # Shape of the items that are not dicts
+    NOT_A_RECORD = None
+
+    def __init__(self, records):
+        shared = {}
+        compact = compactor(shared)
+        shape_ids = {}
+        shapes = []
+        shape_codes = []
+        columns = {}
+        self.others = {}
+        for position, record in enumerate(records):
+            if not isinstance(record, dict):
+                self.others[position] = compact(record)
+                shape = self.NOT_A_RECORD
+            else:
+                shape = tuple(record)
+            code = shape_ids.get(shape)
+            if code is None:
+                code = shape_ids[shape] = len(shapes)
+                shapes.append(shape)
+            shape_codes.append(code)
+            if shape is self.NOT_A_RECORD:
+                continue
+            for key, value in record.items():
+                column = columns.get(key)
+                if column is None:
+                    column = columns[key] = [MISSING] * len(records)
+                column[position] = value
+
+        self.length = len(records)
+        self.shapes = [shared.setdefault(shape, shape) for shape in shapes]
+        self.shape_keys = [frozenset(shape or ()) for shape in shapes]
+        self.shape_codes = code_array(len(shapes))
+        self.shape_codes.extend(shape_codes)
+
+        self.columns = {}
+        for key, values in columns.items():
+            present = values if self.in_every_shape(key) else [
+                value for value, code in zip(values, shape_codes) if key in self.shape_keys[code]
+            ]
+            self.columns[key] = build_column(values, present, compact)
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[index] for index in range(*position.indices(self.length))]
+        if position < 0:
+            position += self.length
+        if not 0 <= position < self.length:
+            raise IndexError('record index out of range')
+        shape = self.shapes[self.shape_codes[position]]
+        if shape is self.NOT_A_RECORD:
+            return expand(self.others[position])
+        columns = self.columns
+        return {key: columns[key][position] for key in shape}
+
+    def in_every_shape(self, key):
+        return all(key in keys for keys in self.shape_keys)
+
+    def get(self, position, key, default=None):
+        """Return one value of the record at ``position`` without materializing it"""
+        if key not in self.shape_keys[self.shape_codes[position]]:
+            return default
+        return self.columns[key][position]
+
+    def rows(self):
+        """Return a Row for every record, by position"""
+        return [Row(self, position) for position in range(self.length)]
+
+    def column(self, key, default=None):
+        """Return the value of ``key`` of every record (``default`` where absent), by position"""
+        column = self.columns.get(key)
+        if column is None:
+            return [default] * self.length
+        values = column.values()
+        if not self.in_every_shape(key):
+            shape_keys = self.shape_keys
+            values = [value if key in shape_keys[code] else default for value, code in zip(values, self.shape_codes)]
+        return values
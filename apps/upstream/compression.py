@@ -0,0 +1,106 @@
+import gzip
+import hashlib
+import re
+
+import brotli
+from django.conf import settings
+
+from .cache import SizedLRU
+from .singleflight import SingleFlight
+
+DEFAULT_OPTIONS = {
+    'MIN_SIZE': 1024,
+    'CACHE_MAX_BYTES': 32 * 1024 * 1024,
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 5,
+}
+
+# Preferred first when the client accepts several with the same q-value
+ENCODINGS = ('br', 'gzip')
+
+COMPRESSIBLE_TYPES = re.compile(r'^(text/|application/(json|javascript|xml)|[^;]*\+json)')
+
+
+def get_compression_options():
+    """Return the RESPONSE_COMPRESSION settings merged with the defaults"""
+    return dict(DEFAULT_OPTIONS, **getattr(settings, 'RESPONSE_COMPRESSION', {}))
+
+
+def negotiate_encoding(accept_encoding):
+    """
+    Return the content coding to use for an ``Accept-Encoding`` header
+    ('br', 'gzip') or None when the client accepts neither.
+    """
+    accepted = {}
+    for item in (accept_encoding or '').split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            accepted[coding] = quality
+
+    best, best_quality = None, 0.0
+    for coding in ENCODINGS:
+        quality = accepted.get(coding, accepted.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+class ResponseCompressor:
+    """
+    Compresses response bodies and keeps the compressed bytes.
+
+    Compressed bodies are cached by a digest of the uncompressed body and
+    the coding, in an LRU bounded by total size. A body that does not change
+    between requests (the same data version rendered the same way) is
+    therefore compressed once; concurrent requests for the same body wait
+    for a single compression.
+    """
+
+    def __init__(self):
+        self.cache = SizedLRU(get_compression_options()['CACHE_MAX_BYTES'])
+        self._flight = SingleFlight()
+
+    def compress(self, content, encoding):
+        """Return ``content`` compressed with ``encoding``, from the cache when possible"""
+        key = (hashlib.sha1(content).digest(), encoding)
+        compressed = self.cache.get(key)
+        if compressed is None:
+            compressed = self._flight.do(key, lambda: self._compress_and_store(key, content, encoding))
+        return compressed
+
+    def _compress_and_store(self, key, content, encoding):
+        options = get_compression_options()
+        if encoding == 'br':
+            compressed = brotli.compress(content, quality=options['BROTLI_QUALITY'])
+        else:
+            compressed = gzip.compress(content, compresslevel=options['GZIP_LEVEL'], mtime=0)
+        self.cache.set(key, compressed)
+        return compressed
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self):
+        return self.cache.stats()
+
+
+response_compressor = ResponseCompressor()
+
+
+def should_compress(response):
+    """Whether a response may be sent compressed (before looking at the client)"""
+    return (
+        not response.streaming
+        and not response.has_header('Content-Encoding')
+        and COMPRESSIBLE_TYPES.match(response.get('Content-Type', ''))
+        and len(response.content) >= get_compression_options()['MIN_SIZE']
+    )
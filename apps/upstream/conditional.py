@@ -0,0 +1,66 @@
+"""
+Validators for conditional GET requests to the API.
+
+Responses built from a known version of the upstream data carry a strong
+``ETag`` (a hash of that version and of the request) and a ``Last-Modified``
+taken from the newest ``updatedAt`` of the records they were built from.
+"""
+import hashlib
+import json
+from collections.abc import Sequence
+from datetime import datetime, timezone
+
+
+def content_version(data):
+    """
+    Content hash of a decoded payload, stable across processes. Lists (and
+    other sequences of records) are hashed item by item, so a large list is
+    never dumped to one string.
+    """
+    if isinstance(data, dict) or not isinstance(data, Sequence) or isinstance(data, (str, bytes)):
+        return hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+    digest = hashlib.sha1(b'[')
+    for item in data:
+        # Dumped JSON never contains a raw newline, so items cannot run together
+        digest.update(json.dumps(item, sort_keys=True, default=str).encode())
+        digest.update(b'\n')
+    return digest.hexdigest()[:16]
+
+
+def make_etag(*parts):
+    """Return a strong entity tag for the given request and data parts"""
+    return '"' + hashlib.sha1(repr(parts).encode()).hexdigest()[:32] + '"'
+
+
+def parse_updated_at(value):
+    """Return the POSIX timestamp of an ``updatedAt`` value, or None"""
+    if not isinstance(value, str) or not value:
+        return None
+    # The upstream writes UTC as ``Z``, which fromisoformat() only accepts from Python 3.11
+    if value.endswith(('Z', 'z')):
+        value = value[:-1] + '+00:00'
+    try:
+        updated_at = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    return int(updated_at.timestamp())
+
+
+def last_modified(data):
+    """
+    Return the newest ``updatedAt`` of a record or list of records as a
+    POSIX timestamp, or None when no record has one.
+    """
+    if isinstance(data, dict):
+        return parse_updated_at(data.get('updatedAt'))
+    if isinstance(data, (list, tuple)):
+        timestamps = [
+            timestamp
+            for timestamp in (parse_updated_at(record.get('updatedAt')) for record in data if isinstance(record, dict))
+            if timestamp is not None
+        ]
+        return max(timestamps, default=None)
+    return None
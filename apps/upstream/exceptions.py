@@ -0,0 +1,35 @@
+"""
+Shared exceptions for calls to the upstream SpaceX API.
+
+Every app re-exports these from its own exceptions module so views keep
+catching the names they always have.
+"""
+
+class APIError(Exception):
+    """Raised when external API call fails or returns error"""
+    pass
+
+
+class NotFoundError(APIError):
+    """Raised when the upstream answers 404"""
+    pass
+
+
+class ValidationError(APIError):
+    """Raised when data validation fails"""
+    pass
+
+
+class DecryptionError(APIError):
+    """Raised when URL decryption fails"""
+    pass
+
+
+class CircuitOpenError(APIError):
+    """Raised without calling the upstream while its circuit breaker is open"""
+    pass
+
+
+class BulkheadFullError(APIError):
+    """Raised when an endpoint already has its maximum of concurrent calls"""
+    pass
@@ -0,0 +1,94 @@
+from .exceptions import ValidationError
+
+
+def parse_paths(value, param='fields'):
+    """
+    Parse a comma-separated list of dotted field paths (e.g.
+    ``title,imageDesktop.formats.thumbnail``) into a sorted tuple of paths,
+    each a tuple of keys. Raises ValidationError for malformed paths.
+    """
+    paths = set()
+    for item in (value or '').split(','):
+        item = item.strip()
+        if not item:
+            continue
+        path = tuple(item.split('.'))
+        if not all(path):
+            raise ValidationError(f"Invalid path '{item}' in {param}.")
+        paths.add(path)
+    return tuple(sorted(paths))
+
+
+def build_tree(paths):
+    """Merge paths into a nested dict; ``True`` selects the whole value"""
+    tree = {}
+    for path in paths:
+        node = tree
+        for key in path[:-1]:
+            child = node.get(key)
+            if child is True:
+                break
+            node = node.setdefault(key, {})
+        else:
+            node[path[-1]] = True
+    return tree
+
+
+def include(value, tree):
+    """Return ``value`` reduced to the paths of ``tree``"""
+    if isinstance(value, list):
+        return [include(item, tree) for item in value]
+    if not isinstance(value, dict):
+        return value
+    return {
+        key: value[key] if subtree is True else include(value[key], subtree)
+        for key, subtree in tree.items()
+        if key in value
+    }
+
+
+def exclude(value, tree):
+    """Return ``value`` without the paths of ``tree``"""
+    if isinstance(value, list):
+        return [exclude(item, tree) for item in value]
+    if not isinstance(value, dict):
+        return value
+    return {
+        key: item if key not in tree else exclude(item, tree[key])
+        for key, item in value.items()
+        if tree.get(key) is not True
+    }
+
+
+class Projection:
+    """
+    A sparse fieldset: the ``fields`` to keep and the ``exclude`` paths to
+    drop from every record of a list response. Nested values are selected
+    with dotted paths; lists are projected item by item.
+    """
+
+    def __init__(self, fields=(), excluded=()):
+        self.fields = fields
+        self.excluded = excluded
+        self.include_tree = build_tree(fields)
+        self.exclude_tree = build_tree(excluded)
+
+    @classmethod
+    def from_params(cls, params):
+        """Build the projection requested by the ``fields``/``exclude`` query parameters"""
+        return cls(parse_paths(params.get('fields'), 'fields'), parse_paths(params.get('exclude'), 'exclude'))
+
+    @property
+    def key(self):
+        """Hashable identity of the fieldset, for caching projected records"""
+        return (self.fields, self.excluded)
+
+    def __bool__(self):
+        return bool(self.fields or self.excluded)
+
+    def apply(self, record):
+        if self.fields:
+            record = include(record, self.include_tree)
+        if self.excluded:
+            record = exclude(record, self.exclude_tree)
+        return record
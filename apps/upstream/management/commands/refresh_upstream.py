@@ -0,0 +1,58 @@
+import threading
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.upstream.scheduler import refresh_scheduler
+
+
+class Command(BaseCommand):
+    help = (
+        "Refresh cached upstream payloads on a schedule, before they expire. "
+        "Run it next to the web workers with a shared CACHES backend, or use "
+        "--once to warm the cache (e.g. after a deploy)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'jobs', nargs='*',
+            help='Jobs to run (default: all). Available: ' + ', '.join(sorted(refresh_scheduler.jobs)),
+        )
+        parser.add_argument('--once', action='store_true', help='Run the selected jobs once and exit.')
+
+    def handle(self, *args, **options):
+        names = options['jobs'] or None
+        unknown = set(names or []) - set(refresh_scheduler.jobs)
+        if unknown:
+            raise CommandError(f"Unknown refresh jobs: {', '.join(sorted(unknown))}")
+
+        if options['once']:
+            jobs = refresh_scheduler.run_all(names)
+            for job in jobs:
+                self.write_report(job.report())
+            if any(job.last_error for job in jobs):
+                raise CommandError("Some refresh jobs failed.")
+            return
+
+        stop = threading.Event()
+        self.stdout.write(f"Refreshing {', '.join(names or sorted(refresh_scheduler.jobs))}; press CTRL-C to stop.")
+        try:
+            while not stop.is_set():
+                for job in refresh_scheduler.run_pending(names):
+                    self.write_report(job.report())
+                stop.wait(refresh_scheduler.tick)
+        except KeyboardInterrupt:
+            pass
+
+    def write_report(self, report):
+        last_success = report['last_success_at']
+        if last_success is not None:
+            last_success = datetime.fromtimestamp(last_success, tz=timezone.utc).isoformat(timespec='seconds')
+        line = (
+            f"{report['name']}: {report['last_duration']:.3f}s, last success {last_success}, "
+            f"next run in {report['next_run_in']}s"
+        )
+        if report['last_error']:
+            self.stderr.write(f"{line} - failed: {report['last_error']}")
+        else:
+            self.stdout.write(line)
@@ -0,0 +1,99 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.utils.cache import patch_vary_headers
+from whitenoise.middleware import WhiteNoiseMiddleware as BaseWhiteNoiseMiddleware
+
+from .compression import negotiate_encoding, response_compressor, should_compress
+
+
+class WhiteNoiseMiddleware(BaseWhiteNoiseMiddleware):
+    """
+    WhiteNoise middleware that also runs natively under ASGI.
+
+    The stock middleware is sync-only, which makes Django run the whole
+    middleware chain, async views included, in its single thread-sensitive
+    executor and so serializes requests. This subclass only leaves the
+    event loop to look up and serve URLs under STATIC_URL, and does so in
+    worker threads rather than the thread-sensitive executor.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        static_file = None
+        if not self.autorefresh:
+            static_file = self.files.get(request.path_info)
+        elif request.path_info.startswith(self.static_prefix):
+            # Looking files up hits the disk; keep it off the thread-sensitive executor
+            static_file = await sync_to_async(self.find_file, thread_sensitive=False)(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve, thread_sensitive=False)(static_file, request)
+        return await self.get_response(request)
+
+
+class CompressionMiddleware:
+    """
+    Compresses API responses with brotli or gzip, as negotiated through
+    ``Accept-Encoding``.
+
+    Bodies smaller than RESPONSE_COMPRESSION['MIN_SIZE'] and non-text
+    responses are sent as they are. Every response that could have been
+    compressed carries ``Vary: Accept-Encoding`` so caches keep the variants
+    apart. Compressed bytes come from ``response_compressor``, so an
+    unchanged body is only compressed once.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        encoding = self.select_encoding(request, response)
+        if encoding is None:
+            return response
+        return self.apply(response, encoding, response_compressor.compress(response.content, encoding))
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        encoding = self.select_encoding(request, response)
+        if encoding is None:
+            return response
+        # Compressing a large body would block the event loop
+        compressed = await sync_to_async(response_compressor.compress, thread_sensitive=False)(response.content, encoding)
+        return self.apply(response, encoding, compressed)
+
+    def select_encoding(self, request, response):
+        """Return the coding to compress the response with, or None"""
+        if not should_compress(response):
+            return None
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return negotiate_encoding(request.META.get('HTTP_ACCEPT_ENCODING'))
+
+    def apply(self, response, encoding, compressed):
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        # The compressed body is no longer byte-identical to the validated one
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = f'W/{etag}'
+        return response
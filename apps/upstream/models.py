@@ -0,0 +1,134 @@
+import logging
+
+from django.db import models, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamRecord(models.Model):
+    """
+    A record of an upstream list payload, stored locally.
+
+    Records are keyed by the upstream ``documentId``. ``updated_at`` keeps the
+    upstream ``updatedAt`` value as received, so a sync only writes records
+    that changed. ``data`` holds the record exactly as received and
+    ``position`` its index in the upstream list, so the stored list can be
+    served in the upstream order. Subclasses map indexed columns to upstream
+    keys with ``record_fields``.
+    """
+
+    document_id = models.CharField(max_length=64, unique=True)
+    upstream_id = models.IntegerField(null=True, blank=True)
+    updated_at = models.CharField(max_length=40, blank=True, default='')
+    position = models.PositiveIntegerField(db_index=True)
+    data = models.JSONField()
+    synced_at = models.DateTimeField(default=timezone.now)
+
+    # Model field -> upstream key of the columns copied out of ``data``
+    record_fields = {}
+
+    class Meta:
+        abstract = True
+        ordering = ['position']
+
+    def __str__(self):
+        return self.document_id
+
+    def apply(self, record, position):
+        """Copy an upstream record (and its list position) onto this instance"""
+        self.upstream_id = record.get('id') if isinstance(record.get('id'), int) else None
+        self.updated_at = record.get('updatedAt') or ''
+        self.position = position
+        self.data = record
+        self.synced_at = timezone.now()
+        for field, key in self.record_fields.items():
+            value = record.get(key)
+            if self._meta.get_field(field).get_internal_type() == 'BooleanField':
+                value = bool(value)
+            elif value is None:
+                value = ''
+            setattr(self, field, value)
+
+    @classmethod
+    def sync(cls, records):
+        """
+        Upsert an upstream list into the store.
+
+        Only new records and records whose ``updatedAt`` changed are written
+        in full. Records that only moved in the list get their position
+        updated. Stored records missing from the list are deleted and records
+        without a ``documentId`` are skipped. Returns the number of created,
+        updated, moved, deleted and unchanged records.
+
+        The diff is read and written in one transaction and rows already
+        inserted by a concurrent sync are skipped, so overlapping syncs (the
+        in-process scheduler in several workers, or ``refresh_upstream`` next
+        to it) do not fail on the unique ``document_id``.
+        """
+        with transaction.atomic():
+            stored = {
+                document_id: (updated_at, position)
+                for document_id, updated_at, position in cls.objects.values_list('document_id', 'updated_at', 'position')
+            }
+
+            changed, moved = {}, {}
+            seen = set()
+            skipped = 0
+            for position, record in enumerate(records):
+                document_id = record.get('documentId') if isinstance(record, dict) else None
+                if not document_id or document_id in seen:
+                    skipped += 1
+                    continue
+                seen.add(document_id)
+                if document_id not in stored or stored[document_id][0] != (record.get('updatedAt') or ''):
+                    changed[document_id] = (record, position)
+                elif stored[document_id][1] != position:
+                    moved[document_id] = position
+
+            existing = cls.objects.in_bulk(
+                [document_id for document_id in [*changed, *moved] if document_id in stored],
+                field_name='document_id',
+            )
+            to_create, to_update, to_move = [], [], []
+            for document_id, (record, position) in changed.items():
+                obj = existing.get(document_id)
+                if obj is None:
+                    obj = cls(document_id=document_id)
+                    to_create.append(obj)
+                else:
+                    to_update.append(obj)
+                obj.apply(record, position)
+            for document_id, position in moved.items():
+                obj = existing[document_id]
+                obj.position = position
+                obj.synced_at = timezone.now()
+                to_move.append(obj)
+
+            removed = [document_id for document_id in stored if document_id not in seen]
+            if removed:
+                cls.objects.filter(document_id__in=removed).delete()
+            if to_update:
+                fields = ['upstream_id', 'updated_at', 'position', 'data', 'synced_at', *cls.record_fields]
+                cls.objects.bulk_update(to_update, fields, batch_size=500)
+            if to_move:
+                cls.objects.bulk_update(to_move, ['position', 'synced_at'], batch_size=500)
+            if to_create:
+                # Rows another sync inserted meanwhile are left to it
+                cls.objects.bulk_create(to_create, batch_size=500, ignore_conflicts=True)
+
+        if skipped:
+            logger.warning(f"Skipped {skipped} {cls.__name__} records without a unique documentId")
+
+        return {
+            'created': len(to_create),
+            'updated': len(to_update),
+            'moved': len(to_move),
+            'deleted': len(removed),
+            'unchanged': len(seen) - len(changed) - len(moved),
+        }
+
+    @classmethod
+    def load(cls):
+        """Return the stored records as received from upstream, in upstream order"""
+        return list(cls.objects.order_by('position').values_list('data', flat=True))
@@ -0,0 +1,137 @@
+import base64
+import binascii
+import json
+
+from rest_framework.pagination import BasePagination
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .exceptions import ValidationError
+from .snapshot import Selection
+
+
+class SnapshotCursorPagination(BasePagination):
+    """
+    Cursor pagination over the records of a snapshot.
+
+    A cursor is an opaque token holding the snapshot version, the offset of
+    the first record of the page and that record's key. While the snapshot
+    a cursor was issued for is still retained, its pages are served from it,
+    so paging through a list is consistent even if the data is refreshed in
+    between. Once it is gone, the page resumes at the record's key in the
+    current snapshot.
+    """
+
+    page_size = api_settings.PAGE_SIZE or 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    key_field = 'documentId'
+
+    def __init__(self):
+        self.cursor = None
+        self.page_size_used = self.page_size
+        self.next = None
+        self.previous = None
+
+    def get_page_size(self, request):
+        value = request.query_params.get(self.page_size_query_param)
+        if value is None:
+            return self.page_size
+        try:
+            page_size = int(value)
+        except ValueError:
+            raise ValidationError(f"{self.page_size_query_param} must be a positive integer.")
+        if page_size < 1:
+            raise ValidationError(f"{self.page_size_query_param} must be a positive integer.")
+        return min(page_size, self.max_page_size)
+
+    def decode_cursor(self, request):
+        """Return the (version, offset, key) of the request's cursor, or None"""
+        value = request.query_params.get(self.cursor_query_param)
+        if not value:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(value + '=' * (-len(value) % 4)))
+            version, offset, key = cursor['v'], int(cursor['o']), cursor['k']
+        except (binascii.Error, ValueError, KeyError, TypeError):
+            raise ValidationError("Invalid cursor.")
+        if offset < 0:
+            raise ValidationError("Invalid cursor.")
+        return version, offset, key
+
+    def encode_cursor(self, version, offset, key):
+        cursor = json.dumps({'v': version, 'o': offset, 'k': key}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(cursor.encode()).decode().rstrip('=')
+
+    def get_snapshot(self, request, snapshot, snapshots):
+        """
+        Return the snapshot to page through: the one the cursor was issued
+        for when ``snapshots`` (a SnapshotCache) still has it, else ``snapshot``.
+        """
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None or self.cursor[0] == snapshot.version:
+            return snapshot
+        return snapshots.find(self.cursor[0]) or snapshot
+
+    def paginate_records(self, records, snapshot, request):
+        """
+        Return the page of ``records`` (a list derived from ``snapshot`` for
+        this request) selected by the cursor.
+        """
+        self.page_size_used = self.get_page_size(request)
+        if self.cursor is None:
+            self.cursor = self.decode_cursor(request)
+
+        offset = 0
+        if self.cursor is not None:
+            version, offset, key = self.cursor
+            if version != snapshot.version:
+                offset = self.find_key(records, key)
+
+        page = records[offset:offset + self.page_size_used]
+        url = request.build_absolute_uri()
+        self.next = self.previous = None
+        if offset + self.page_size_used < len(records):
+            self.next = self.link(url, snapshot, records, offset + self.page_size_used)
+        if offset > 0:
+            previous = max(0, offset - self.page_size_used)
+            if previous == 0:
+                self.previous = remove_query_param(url, self.cursor_query_param)
+            else:
+                self.previous = self.link(url, snapshot, records, previous)
+        return page
+
+    def first_page(self, records, snapshot, url):
+        """
+        Return the first page of ``records`` (derived from ``snapshot``) at the
+        default page size, with the next page linked from the list ``url``.
+        For responses that embed a list outside of its own endpoint.
+        """
+        self.page_size_used = self.page_size
+        self.next = self.previous = None
+        if self.page_size < len(records):
+            self.next = self.link(url, snapshot, records, self.page_size)
+        return records[:self.page_size]
+
+    def find_key(self, records, key):
+        if isinstance(records, Selection):
+            keys = records.values(self.key_field)
+        else:
+            keys = [record.get(self.key_field) for record in records]
+        for position, record_key in enumerate(keys):
+            if record_key == key:
+                return position
+        raise ValidationError("The cursor has expired. Start again from the first page.")
+
+    def link(self, url, snapshot, records, offset):
+        cursor = self.encode_cursor(snapshot.version, offset, records[offset].get(self.key_field))
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_pagination_data(self):
+        """Return the pagination metadata added to list responses"""
+        return {
+            'page_size': self.page_size_used,
+            'next': self.next,
+            'previous': self.previous,
+        }
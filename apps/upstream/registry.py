@@ -0,0 +1,135 @@
+import base64
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from cryptography.fernet import Fernet
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from .exceptions import DecryptionError
+
+logger = logging.getLogger(__name__)
+
+
+def decrypt_url(encrypted_data, key):
+    """
+    Decrypt the encrypted URL using the provided key.
+    """
+    try:
+        # Create a proper Fernet key from the Django secret key
+        hashed_key = hashlib.sha256(key.encode()).digest()
+        fernet_key = base64.urlsafe_b64encode(hashed_key)
+
+        # Create Fernet cipher
+        cipher = Fernet(fernet_key)
+
+        # Decrypt the URL
+        decrypted_url = cipher.decrypt(encrypted_data.encode())
+
+        return decrypted_url.decode()
+
+    except Exception as e:
+        logger.error(f"URL decryption failed: {str(e)}")
+        raise DecryptionError("Failed to decrypt API URL")
+
+
+def validate_url(url):
+    """Raise DecryptionError unless ``url`` is an absolute http(s) URL"""
+    parsed = urlparse(url)
+    if parsed.scheme not in ('http', 'https') or not parsed.netloc:
+        raise DecryptionError("Decrypted API URL is not a valid http(s) URL")
+    return url.rstrip('/')
+
+
+class EndpointRegistry:
+    """
+    Plain-text URLs of the upstream endpoints, resolved once at startup.
+
+    Each app registers its encrypted URL from ``AppConfig.ready()``. The URL
+    is decrypted and validated right away, so a ``SECRET_KEY`` that cannot
+    decrypt it stops the process at boot instead of failing every request.
+
+    An endpoint may also register a ``load`` function that turns its decoded
+    payload into what is cached and returned by ``fetch_json`` (e.g. a
+    compact snapshot), so the decoded payload is not kept.
+    """
+
+    def __init__(self):
+        self._urls = {}
+        self._errors = {}
+        self._loaders = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, encrypted_url, load=None):
+        """Decrypt and store the URL of an upstream endpoint, and its payload loader"""
+        with self._lock:
+            if load is None:
+                self._loaders.pop(name, None)
+            else:
+                self._loaders[name] = load
+
+        try:
+            url = validate_url(decrypt_url(encrypted_url, settings.SECRET_KEY))
+        except DecryptionError as e:
+            if getattr(settings, 'UPSTREAM', {}).get('FAIL_FAST', True):
+                raise ImproperlyConfigured(
+                    f"Upstream endpoint '{name}' could not be decrypted with SECRET_KEY: {str(e)}"
+                )
+            logger.error(f"Upstream endpoint '{name}' is unavailable: {str(e)}")
+            with self._lock:
+                self._errors[name] = str(e)
+                self._urls.pop(name, None)
+            return
+
+        with self._lock:
+            self._urls[name] = url
+            self._errors.pop(name, None)
+
+    def get(self, name):
+        """Return the base URL of an endpoint"""
+        url = self._urls.get(name)
+        if url is None:
+            if name in self._errors:
+                raise DecryptionError("Failed to decrypt API URL")
+            raise DecryptionError(f"Upstream endpoint '{name}' is not registered")
+        return url
+
+    def build_url(self, name, path=None):
+        """Return the URL of an endpoint, with ``path`` appended when given"""
+        url = self.get(name)
+        if path:
+            return f"{url}/{path}"
+        return url
+
+    def load(self, name, data):
+        """Return a decoded payload of an endpoint as its loader builds it"""
+        load = self._loaders.get(name)
+        if load is None:
+            return data
+        return load(data)
+
+    def names(self):
+        """Return the names of every registered endpoint"""
+        return sorted(set(self._urls) | set(self._errors))
+
+    @contextmanager
+    def override(self, **urls):
+        """Temporarily point endpoints at other URLs (used by tests)"""
+        with self._lock:
+            previous = {name: self._urls.get(name) for name in urls}
+            self._urls.update(urls)
+        try:
+            yield self
+        finally:
+            with self._lock:
+                for name, url in previous.items():
+                    if url is None:
+                        self._urls.pop(name, None)
+                    else:
+                        self._urls[name] = url
+
+
+registry = EndpointRegistry()
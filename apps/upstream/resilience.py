@@ -0,0 +1,296 @@
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+
+from .client import get_endpoint_options
+from .exceptions import APIError, BulkheadFullError, CircuitOpenError, NotFoundError, ValidationError
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+def is_failure(error):
+    """
+    Whether an error says the upstream is unhealthy.
+
+    A 404 or a malformed payload is still an answer, so only the other
+    APIErrors (timeouts, connection errors, 5xx) count.
+    """
+    return isinstance(error, APIError) and not isinstance(error, (NotFoundError, ValidationError))
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker.
+
+    After ``failure_threshold`` consecutive failed or slow calls the circuit
+    opens and calls fail fast with CircuitOpenError. After ``reset_timeout``
+    seconds one probe call is let through (half-open). Its success closes the
+    circuit again and its failure re-opens it. A call counts as slow when it
+    takes at least ``slow_call_duration`` seconds, even if it succeeds.
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30, slow_call_duration=None, history=20):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.slow_call_duration = slow_call_duration
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.counters = {'calls': 0, 'failures': 0, 'slow_calls': 0, 'rejected': 0}
+        self.transitions = {OPEN: 0, HALF_OPEN: 0, CLOSED: 0}
+        self.changes = deque(maxlen=history)
+        self._lock = threading.Lock()
+
+    def _set_state(self, state):
+        if state == self.state:
+            return
+        logger.warning(f"Circuit breaker for {self.name}: {self.state} -> {state}")
+        self.changes.append({'from': self.state, 'to': state, 'at': time.time()})
+        self.transitions[state] += 1
+        self.state = state
+        if state == OPEN:
+            self.opened_at = time.monotonic()
+
+    def before_call(self):
+        """Let a call through or raise CircuitOpenError"""
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self._set_state(HALF_OPEN)
+            if self.state == OPEN or (self.state == HALF_OPEN and self.probing):
+                self.counters['rejected'] += 1
+                raise CircuitOpenError("Service temporarily unavailable. Please try again later.")
+            if self.state == HALF_OPEN:
+                self.probing = True
+            self.counters['calls'] += 1
+
+    def release(self):
+        """Forget a call let through by ``before_call`` that never reached the upstream"""
+        with self._lock:
+            self.counters['calls'] -= 1
+            self.probing = False
+
+    def after_call(self, duration, error=None):
+        """Record the outcome of a call let through by ``before_call``"""
+        slow = self.slow_call_duration is not None and duration >= self.slow_call_duration
+        failed = is_failure(error)
+        with self._lock:
+            self.probing = False
+            if slow:
+                self.counters['slow_calls'] += 1
+            if failed:
+                self.counters['failures'] += 1
+
+            if not (failed or slow):
+                self.consecutive_failures = 0
+                self._set_state(CLOSED)
+                return
+
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state == OPEN:
+                    self.opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+    def report(self):
+        with self._lock:
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = round(max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)), 1)
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'retry_in': retry_in,
+                'transitions': dict(self.transitions),
+                'recent_changes': list(self.changes),
+                **self.counters,
+            }
+
+
+class Bulkhead:
+    """
+    Caps the number of concurrent upstream calls to one endpoint.
+
+    A call that cannot start within ``max_wait`` seconds fails with
+    BulkheadFullError, so a hanging endpoint ties up at most
+    ``max_concurrent`` worker threads. Async calls have their own cap per
+    event loop.
+    """
+
+    def __init__(self, name, max_concurrent=10, max_wait=0.0):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_wait = max_wait
+        self.active = 0
+        self.rejected = 0
+        self._semaphore = threading.BoundedSemaphore(max_concurrent)
+        self._async_semaphores = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _reject(self):
+        with self._lock:
+            self.rejected += 1
+        logger.warning(f"Bulkhead for {self.name} is full ({self.max_concurrent} calls in flight)")
+        raise BulkheadFullError("Service temporarily unavailable. Please try again later.")
+
+    def _count(self, delta):
+        with self._lock:
+            self.active += delta
+
+    @contextmanager
+    def acquire(self):
+        if not self._semaphore.acquire(timeout=self.max_wait):
+            self._reject()
+        self._count(1)
+        try:
+            yield
+        finally:
+            self._count(-1)
+            self._semaphore.release()
+
+    @asynccontextmanager
+    async def aacquire(self):
+        loop = asyncio.get_running_loop()
+        semaphore = self._async_semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._async_semaphores[loop] = asyncio.Semaphore(self.max_concurrent)
+        if semaphore.locked() and not self.max_wait:
+            self._reject()
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=self.max_wait or None)
+        except asyncio.TimeoutError:
+            self._reject()
+        self._count(1)
+        try:
+            yield
+        finally:
+            self._count(-1)
+            semaphore.release()
+
+    def report(self):
+        with self._lock:
+            return {'max_concurrent': self.max_concurrent, 'active': self.active, 'rejected': self.rejected}
+
+
+class RateLimiter:
+    """
+    Spaces out calls to at most ``rate`` per second across threads.
+
+    ``wait()`` blocks until the caller's slot comes up. Used by batch jobs
+    such as the launch detail crawler so they stay polite to the upstream.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_at = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_at)
+            self._next_at = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class EndpointGuards:
+    """
+    The circuit breaker and bulkhead of every upstream endpoint.
+
+    Both are created on first use from the endpoint's options:
+    BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT, BREAKER_SLOW_CALL,
+    MAX_CONCURRENT and BULKHEAD_WAIT. ``MAX_CONCURRENT: None`` disables the
+    bulkhead.
+    """
+
+    def __init__(self):
+        self._breakers = {}
+        self._bulkheads = {}
+        self._lock = threading.Lock()
+
+    def _create(self, endpoint):
+        options = get_endpoint_options(endpoint)
+        self._breakers[endpoint] = CircuitBreaker(
+            endpoint,
+            failure_threshold=options['BREAKER_FAILURE_THRESHOLD'],
+            reset_timeout=options['BREAKER_RESET_TIMEOUT'],
+            slow_call_duration=options['BREAKER_SLOW_CALL'],
+        )
+        if options['MAX_CONCURRENT']:
+            self._bulkheads[endpoint] = Bulkhead(endpoint, options['MAX_CONCURRENT'], options['BULKHEAD_WAIT'])
+
+    def get(self, endpoint):
+        """Return the (breaker, bulkhead or None) pair of an endpoint"""
+        with self._lock:
+            if endpoint not in self._breakers:
+                self._create(endpoint)
+            return self._breakers[endpoint], self._bulkheads.get(endpoint)
+
+    def call(self, endpoint, fn):
+        """Run ``fn`` (the upstream request) behind the endpoint's breaker and bulkhead"""
+        breaker, bulkhead = self.get(endpoint)
+        breaker.before_call()
+        try:
+            with bulkhead.acquire() if bulkhead is not None else nullcontext():
+                # Time spent queued for the bulkhead is not upstream latency
+                started = time.monotonic()
+                result = fn()
+        except BulkheadFullError:
+            breaker.release()
+            raise
+        except Exception as e:
+            breaker.after_call(time.monotonic() - started, e)
+            raise
+        breaker.after_call(time.monotonic() - started)
+        return result
+
+    async def acall(self, endpoint, coro_fn):
+        """Async version of ``call``: ``coro_fn`` returns the coroutine to await"""
+        breaker, bulkhead = self.get(endpoint)
+        breaker.before_call()
+        try:
+            async with bulkhead.aacquire() if bulkhead is not None else nullcontext():
+                started = time.monotonic()
+                result = await coro_fn()
+        except (BulkheadFullError, asyncio.CancelledError):
+            breaker.release()
+            raise
+        except Exception as e:
+            breaker.after_call(time.monotonic() - started, e)
+            raise
+        breaker.after_call(time.monotonic() - started)
+        return result
+
+    def report(self):
+        """Return breaker and bulkhead metrics per endpoint"""
+        with self._lock:
+            endpoints = sorted(self._breakers)
+        report = {}
+        for endpoint in endpoints:
+            breaker, bulkhead = self.get(endpoint)
+            report[endpoint] = {
+                'breaker': breaker.report(),
+                'bulkhead': bulkhead.report() if bulkhead is not None else None,
+            }
+        return report
+
+    def reset(self):
+        """Forget every breaker and bulkhead (they are rebuilt from the current options)"""
+        with self._lock:
+            self._breakers.clear()
+            self._bulkheads.clear()
+
+
+guards = EndpointGuards()
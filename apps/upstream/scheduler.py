@@ -0,0 +1,167 @@
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+
+from .client import get_endpoint_options
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshJob:
+    """
+    A periodic refresh of one upstream payload (or group of payloads).
+
+    The job runs every ``interval`` seconds, randomized by ``jitter`` (a
+    fraction of the interval) so workers do not refresh in lockstep. After a
+    failure the delay doubles per consecutive failure, up to ``max_backoff``.
+    ``clock`` and ``rng`` (a ``random.Random``-like source) can be replaced
+    for tests.
+    """
+
+    def __init__(self, name, func, interval, jitter=0.1, max_backoff=15 * 60, clock=time.time, rng=random):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self.rng = rng
+        self.next_run_at = 0.0
+        self.last_run_at = None
+        self.last_success_at = None
+        self.last_duration = None
+        self.last_error = None
+        self.consecutive_failures = 0
+        self.runs = 0
+
+    def is_due(self, now):
+        return now >= self.next_run_at
+
+    def run(self):
+        """Run the job once and schedule the next run"""
+        started = self.clock()
+        self.last_run_at = started
+        self.runs += 1
+        try:
+            self.func()
+        except Exception as e:
+            self.consecutive_failures += 1
+            self.last_error = str(e)
+            logger.warning(f"Refresh job '{self.name}' failed ({self.consecutive_failures} in a row): {str(e)}")
+        else:
+            self.consecutive_failures = 0
+            self.last_error = None
+            self.last_success_at = self.clock()
+        finally:
+            finished = self.clock()
+            self.last_duration = finished - started
+            self.next_run_at = finished + self.next_delay()
+
+    def next_delay(self):
+        delay = self.interval
+        if self.consecutive_failures:
+            delay = min(self.interval * 2 ** self.consecutive_failures, max(self.max_backoff, self.interval))
+        return delay * self.rng.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def report(self):
+        return {
+            'name': self.name,
+            'interval': self.interval,
+            'runs': self.runs,
+            'last_run_at': self.last_run_at,
+            'last_success_at': self.last_success_at,
+            'last_duration': round(self.last_duration, 4) if self.last_duration is not None else None,
+            'last_error': self.last_error,
+            'consecutive_failures': self.consecutive_failures,
+            'next_run_in': round(max(0.0, self.next_run_at - self.clock()), 1),
+        }
+
+
+class RefreshScheduler:
+    """
+    Keeps cached upstream payloads warm by refreshing them before they expire.
+
+    Apps register their jobs from ``AppConfig.ready()``. The scheduler can be
+    driven by the ``refresh_upstream`` management command or, with
+    ``UPSTREAM['REFRESH_IN_PROCESS']``, by a daemon thread in each worker.
+    """
+
+    tick = 1.0
+
+    def __init__(self, clock=time.time, rng=random):
+        self.clock = clock
+        self.rng = rng
+        self.jobs = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def register(self, name, func, endpoint=None, interval=None):
+        """
+        Add a job. Its interval defaults to the endpoint's REFRESH_INTERVAL
+        option, or 80% of its TTL so payloads are replaced before they expire.
+        """
+        if interval is None:
+            options = get_endpoint_options(endpoint or name)
+            interval = options.get('REFRESH_INTERVAL') or options['TTL'] * 0.8
+        with self._lock:
+            self.jobs[name] = RefreshJob(name, func, interval, clock=self.clock, rng=self.rng)
+
+    def _select(self, names):
+        with self._lock:
+            return [job for job in self.jobs.values() if names is None or job.name in names]
+
+    def run_pending(self, names=None):
+        """Run every due job (restricted to ``names`` when given) and return them"""
+        now = self.clock()
+        jobs = [job for job in self._select(names) if job.is_due(now)]
+        for job in jobs:
+            job.run()
+        return jobs
+
+    def run_all(self, names=None):
+        """Run every job (restricted to ``names`` when given) right away and return them"""
+        jobs = self._select(names)
+        for job in jobs:
+            job.run()
+        return jobs
+
+    def run_forever(self, names=None, stop=None):
+        stop = stop or self._stop
+        while not stop.is_set():
+            self.run_pending(names)
+            stop.wait(self.tick)
+
+    def start(self):
+        """Run the scheduler in a daemon thread of the current process"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run_forever, name='upstream-refresh-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def report(self):
+        with self._lock:
+            return [job.report() for job in self.jobs.values()]
+
+
+refresh_scheduler = RefreshScheduler()
+
+
+def start_in_process_refresh():
+    """
+    Start the scheduler thread when UPSTREAM['REFRESH_IN_PROCESS'] is set.
+    Called from the WSGI/ASGI entry points so management commands never start it.
+    """
+    if getattr(settings, 'UPSTREAM', {}).get('REFRESH_IN_PROCESS', False):
+        refresh_scheduler.start()
@@ -0,0 +1,263 @@
+"""
+Compiled validation for the upstream record serializers.
+
+DRF validates a payload by deep-copying the serializer's declared fields
+for every serializer instance, nested ones included, and then walking them
+through its generic ``run_validation`` machinery. ``CompiledSerializer``
+builds the field tree once and turns it into plain check functions that
+produce the same ``validated_data`` for valid payloads.
+
+The compiled checks only ever accept. When a check meets a value it
+cannot accept, the payload is validated by DRF itself. Rejections and
+their error shapes are therefore DRF's own. Anything the compiler does not
+know how to check exactly is also left to DRF: custom ``validate``
+methods, serializer validators, ``source`` mappings and unknown serializer
+classes. Unknown field classes run their own ``run_validation``.
+"""
+import re
+import threading
+from collections.abc import Mapping
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.validators import MaxLengthValidator, ProhibitNullCharactersValidator
+from rest_framework import fields, serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import ProhibitSurrogateCharactersValidator, SkipField, empty
+
+SURROGATES = re.compile('[\ud800-\udfff]')
+
+# Field classes whose ``to_internal_value`` is used as is; everything else
+# about them (empty values, validators) is compiled
+CONVERTED_FIELDS = (
+    fields.IntegerField,
+    fields.FloatField,
+    fields.BooleanField,
+    fields.DateField,
+    fields.TimeField,
+    fields.DateTimeField,
+    fields.JSONField,
+)
+
+# Serializer hooks that must be DRF's own for a serializer to be compiled
+SERIALIZER_HOOKS = ('run_validation', 'to_internal_value', 'validate', 'run_validators', 'validate_empty_values', 'get_value')
+
+
+class Reject(Exception):
+    """A compiled check cannot accept the payload; DRF validates it instead"""
+
+
+class NotCompilable(Exception):
+    """A serializer uses something the compiler cannot reproduce exactly"""
+
+
+def _validator_check(field):
+    """Return a function running the field's validators, rejecting on any error"""
+    validators = []
+    for validator in field.validators:
+        if type(validator) is MaxLengthValidator and isinstance(validator.limit_value, int):
+            limit = validator.limit_value
+            validators.append(lambda value, limit=limit: len(value) > limit)
+        elif type(validator) is ProhibitNullCharactersValidator:
+            validators.append(lambda value: '\x00' in str(value))
+        elif type(validator) is ProhibitSurrogateCharactersValidator:
+            validators.append(lambda value: SURROGATES.search(str(value)) is not None)
+        elif getattr(validator, 'requires_context', False):
+            validators.append(lambda value, validator=validator: validator(value, field) and False)
+        else:
+            validators.append(lambda value, validator=validator: validator(value) and False)
+
+    def check(value):
+        try:
+            for invalid in validators:
+                if invalid(value):
+                    raise Reject
+        except (ValidationError, DjangoValidationError):
+            raise Reject
+        return value
+
+    return check if validators else None
+
+
+def _compile_char_field(field):
+    allow_blank = field.allow_blank
+    trim = field.trim_whitespace
+    run_validators = _validator_check(field)
+
+    def convert(value):
+        if value == '' or (trim and str(value).strip() == ''):
+            if not allow_blank:
+                raise Reject
+            return ''
+        if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+            raise Reject
+        value = str(value)
+        if trim:
+            value = value.strip()
+        return run_validators(value) if run_validators else value
+
+    return convert
+
+
+def _compile_converted_field(field):
+    to_internal_value = field.to_internal_value
+    run_validators = _validator_check(field)
+
+    def convert(value):
+        try:
+            value = to_internal_value(value)
+        except (ValidationError, DjangoValidationError):
+            raise Reject
+        return run_validators(value) if run_validators else value
+
+    return convert
+
+
+def _compile_list_serializer(field):
+    if type(field) is not serializers.ListSerializer:
+        raise NotCompilable(f"{type(field).__name__} is not a plain ListSerializer")
+    if field.validators:
+        raise NotCompilable(f"{field.field_name} has list validators")
+
+    child = _compile_item(field.child)
+    allow_empty = field.allow_empty
+    max_length = field.max_length
+    min_length = field.min_length
+
+    def convert(value):
+        if not isinstance(value, list):
+            raise Reject
+        if (not allow_empty and not value) or (max_length is not None and len(value) > max_length) \
+                or (min_length is not None and len(value) < min_length):
+            raise Reject
+        return [child(item) for item in value]
+
+    return convert
+
+
+def _compile_item(field):
+    """Compile the child of a ListSerializer, which gets no missing values"""
+    convert = _compile_value(field)
+    allow_null = field.allow_null
+
+    def check(value):
+        if value is None:
+            if not allow_null:
+                raise Reject
+            return None
+        return convert(value)
+
+    return check
+
+
+def _compile_value(field):
+    """Return a function converting a present, non-null value of ``field``"""
+    if isinstance(field, serializers.ListSerializer):
+        return _compile_list_serializer(field)
+    if isinstance(field, serializers.Serializer):
+        return _compile_serializer(field)
+    if type(field) in (fields.CharField, fields.URLField):
+        return _compile_char_field(field)
+    if type(field) in CONVERTED_FIELDS:
+        return _compile_converted_field(field)
+    return None
+
+
+def _compile_serializer(serializer):
+    cls = type(serializer)
+    for hook in SERIALIZER_HOOKS:
+        if getattr(cls, hook) is not getattr(serializers.Serializer, hook):
+            raise NotCompilable(f"{cls.__name__} overrides {hook}()")
+    if serializer.validators:
+        raise NotCompilable(f"{cls.__name__} has serializer validators")
+
+    plan = []
+    for field in serializer._writable_fields:
+        if getattr(serializer, 'validate_' + field.field_name, None) is not None:
+            raise NotCompilable(f"{cls.__name__} has validate_{field.field_name}()")
+        if field.source_attrs != [field.field_name]:
+            raise NotCompilable(f"{cls.__name__}.{field.field_name} has a source")
+        if getattr(field.default, 'requires_context', False):
+            raise NotCompilable(f"{cls.__name__}.{field.field_name} has a default that requires context")
+
+        convert = _compile_value(field)
+        if convert is None:
+            plan.append((field.field_name, None, None, None, field))
+        else:
+            plan.append((field.field_name, field.required, field.allow_null, field.default, convert))
+
+    def check(data):
+        if not isinstance(data, Mapping) or hasattr(data, 'getlist'):
+            raise Reject
+
+        ret = {}
+        for name, required, allow_null, default, convert in plan:
+            if required is None:
+                # A field class the compiler does not know: let it validate itself
+                field = convert
+                try:
+                    ret[name] = field.run_validation(field.get_value(data))
+                except SkipField:
+                    pass
+                except (ValidationError, DjangoValidationError):
+                    raise Reject
+                continue
+
+            value = data.get(name, empty)
+            if value is empty:
+                if required:
+                    raise Reject
+                if default is not empty:
+                    ret[name] = default() if callable(default) else default
+            elif value is None:
+                if not allow_null:
+                    raise Reject
+                ret[name] = None
+            else:
+                ret[name] = convert(value)
+        return ret
+
+    return check
+
+
+class CompiledSerializer:
+    """
+    Validates payloads like ``serializer_class(data=payload).is_valid()``,
+    with the serializer's checks compiled on first use.
+
+    Serializers that cannot be compiled are validated by DRF every time.
+    """
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        self._check = None
+        self._compiled = False
+        self._lock = threading.Lock()
+
+    @property
+    def check(self):
+        """The compiled check of the serializer, or None when it cannot be compiled"""
+        if not self._compiled:
+            with self._lock:
+                if not self._compiled:
+                    try:
+                        self._check = _compile_serializer(self.serializer_class())
+                    except NotCompilable:
+                        self._check = None
+                    self._compiled = True
+        return self._check
+
+    def validate(self, data):
+        """Return (validated data, None) for a valid payload, or (None, errors)"""
+        check = self.check
+        if check is not None:
+            try:
+                return check(data), None
+            except Reject:
+                pass
+        return self.validate_with_drf(data)
+
+    def validate_with_drf(self, data):
+        serializer = self.serializer_class(data=data)
+        if serializer.is_valid():
+            return serializer.validated_data, None
+        return None, serializer.errors
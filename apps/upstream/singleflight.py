@@ -0,0 +1,89 @@
+import asyncio
+import threading
+import weakref
+
+
+class _Call:
+    """An in-flight call whose outcome is shared by every waiting caller"""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Per-key request coalescing within a process.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight block until it finishes and then get the same result or
+    exception. Under WSGI each request has its own thread; under ASGI the
+    sync views run in asgiref's executor threads. This thread-based
+    primitive therefore covers both servers. Async callers use ``ado``,
+    which coalesces coroutines on the same event loop.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._async_calls = weakref.WeakKeyDictionary()
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def ado(self, key, coro_fn):
+        """Async version of ``do``: ``coro_fn`` returns the coroutine to await"""
+        loop = asyncio.get_running_loop()
+        calls = self._async_calls.setdefault(loop, {})
+        future = calls.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = calls[key] = loop.create_future()
+        try:
+            result = await coro_fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del calls[key]
+
+    def in_flight(self):
+        """Return the number of keys currently being fetched"""
+        with self._lock:
+            return len(self._calls) + sum(len(calls) for calls in list(self._async_calls.values()))
+
+
+upstream_flight = SingleFlight()
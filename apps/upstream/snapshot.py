@@ -0,0 +1,390 @@
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from collections.abc import Sequence
+from datetime import date, datetime
+
+from .columnar import ColumnarRecords
+from .conditional import content_version, last_modified
+from .exceptions import ValidationError
+
+
+def index_value(value):
+    """Normalize a record or query value for exact, case-insensitive matching"""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if value is None:
+        return ''
+    return str(value).strip().casefold()
+
+
+def sort_value(value):
+    """Normalize a text value for sorting; empty values sort last"""
+    value = index_value(value)
+    return value or None
+
+
+def parse_date(value):
+    """Return a ``date`` for the date formats the upstream uses, or None"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if not isinstance(value, str):
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(value, '%m/%d/%Y').date()
+    except ValueError:
+        return None
+
+
+class Selection(Sequence):
+    """
+    Records of a snapshot picked by position. Records are only read (and,
+    for columnar snapshots, materialized) when accessed, so taking a page of
+    a large selection costs what the page costs. Slices are selections too.
+    """
+
+    def __init__(self, records, positions):
+        self.records = records
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return Selection(self.records, self.positions[index])
+        return self.records[self.positions[index]]
+
+    def values(self, key):
+        """Return the value of ``key`` of every selected record, without materializing them"""
+        if isinstance(self.records, ColumnarRecords):
+            return [self.records.get(position, key) for position in self.positions]
+        return [self.records[position].get(key) for position in self.positions]
+
+
+class Snapshot:
+    """
+    One version of an upstream list payload plus indexes derived from it.
+
+    Indexes are built on first use and kept for the life of the snapshot, so
+    every request against the same data shares them. ``filter_fields`` maps
+    query parameter names to record keys indexed by exact value;
+    ``date_field`` is the record key behind the sorted date index used for
+    ranges. ``sort_fields`` maps sort field names to functions returning a
+    record's sort key (None sorts last); keys are computed once per snapshot
+    and the ``max_recent`` most recently requested orderings are kept.
+    Records are shared and must be treated as read-only.
+
+    Snapshots of ``columnar`` classes keep their records as
+    ColumnarRecords: indexes and sort keys read the columns, and records
+    are materialized as dicts only when a selection is read.
+    """
+
+    filter_fields = {}
+    date_field = None
+    sort_fields = {}
+    sort_aliases = {}
+    columnar = False
+    # Values derived from query parameters (orderings, ranks, projections) kept per snapshot
+    max_recent = 16
+    # Derived values kept when a snapshot is pickled (e.g. into a cache backend)
+    pickled_indexes = ('version', 'last_modified')
+
+    def __init__(self, records):
+        self._indexes = {}
+        self._recent = OrderedDict()
+        self._lock = threading.Lock()
+        if self.columnar:
+            # Derived from the records as received, before they are compacted
+            self._indexes['version'] = content_version(records)
+            self._indexes['last_modified'] = last_modified(records)
+            records = ColumnarRecords(records)
+        self.records = records
+
+    def __getstate__(self):
+        indexes = {key: self._indexes[key] for key in self.pickled_indexes if key in self._indexes}
+        return {'records': self.records, 'indexes': indexes}
+
+    def __setstate__(self, state):
+        self._indexes = dict(state['indexes'])
+        self._recent = OrderedDict()
+        self._lock = threading.Lock()
+        self.records = state['records']
+
+    def memoize(self, key, build):
+        """Return the derived value stored under ``key``, building it once"""
+        try:
+            return self._indexes[key]
+        except KeyError:
+            pass
+        value = build()
+        with self._lock:
+            return self._indexes.setdefault(key, value)
+
+    def memoize_recent(self, key, build):
+        """
+        Like ``memoize()`` for values keyed by query parameters: only the
+        ``max_recent`` most recently used are kept, so distinct queries
+        cannot grow the snapshot without bound.
+        """
+        with self._lock:
+            value = self._recent.get(key)
+            if value is not None:
+                self._recent.move_to_end(key)
+                return value
+        value = build()
+        with self._lock:
+            value = self._recent.setdefault(key, value)
+            self._recent.move_to_end(key)
+            while len(self._recent) > self.max_recent:
+                self._recent.popitem(last=False)
+            return value
+
+    @property
+    def version(self):
+        """Content hash of the records, stable across processes"""
+        return self.memoize('version', lambda: content_version(self.records))
+
+    @property
+    def last_modified(self):
+        """Newest ``updatedAt`` of the records as a POSIX timestamp, or None"""
+        return self.memoize('last_modified', lambda: last_modified(self.records))
+
+    def values(self, key):
+        """Return the value of ``key`` of every record (None where absent), by position"""
+        if isinstance(self.records, ColumnarRecords):
+            return self.records.column(key)
+        return [record.get(key) for record in self.records]
+
+    def rows(self):
+        """Return every record, by position, as an object with a dict-like ``get``"""
+        if isinstance(self.records, ColumnarRecords):
+            return self.records.rows()
+        return self.records
+
+    def index(self, name):
+        """Return the hash index of a filter field: normalized value -> record positions"""
+        def build():
+            index = {}
+            for position, value in enumerate(self.values(self.filter_fields[name])):
+                index.setdefault(index_value(value), []).append(position)
+            return index
+        return self.memoize(('index', name), build)
+
+    def date_index(self):
+        """Return (sorted dates, positions in the same order) for the date field"""
+        def build():
+            entries = sorted(
+                (date, position)
+                for position, value in enumerate(self.values(self.date_field))
+                if (date := parse_date(value)) is not None
+            )
+            return [date for date, position in entries], [position for date, position in entries]
+        return self.memoize('date_index', build)
+
+    def value_positions(self, name, value):
+        """Return the set of record positions indexed under ``value`` for a filter field"""
+        return self.memoize(('value_positions', name, value), lambda: frozenset(self.index(name)[value]))
+
+    def dates(self):
+        """Return the parsed date field of every record (None where absent), by position"""
+        def build():
+            dates = [None] * len(self.records)
+            for date, position in zip(*self.date_index()):
+                dates[position] = date
+            return dates
+        return self.memoize('dates', build)
+
+    def filter_constraint(self, name, values):
+        """
+        Return (size, positions, contains) for records whose filter field has
+        one of ``values``: the number of matches, a function listing them and
+        a function returning a membership test for a single position.
+        """
+        index = self.index(name)
+        values = [value for value in values if value in index]
+
+        def contains():
+            sets = [self.value_positions(name, value) for value in values]
+            return lambda position: any(position in positions for positions in sets)
+
+        return (
+            sum(len(index[value]) for value in values),
+            lambda: [position for value in values for position in index[value]],
+            contains,
+        )
+
+    def date_constraint(self, date_from, date_to):
+        """Like filter_constraint() for records dated from ``date_from`` to ``date_to``"""
+        dates, positions = self.date_index()
+        start = bisect_left(dates, date_from) if date_from is not None else 0
+        end = bisect_right(dates, date_to) if date_to is not None else len(dates)
+
+        def contains():
+            by_position = self.dates()
+            return lambda position: (
+                (date := by_position[position]) is not None
+                and (date_from is None or date >= date_from)
+                and (date_to is None or date <= date_to)
+            )
+
+        return max(0, end - start), lambda: positions[start:end], contains
+
+    def sort_keys(self, name):
+        """Return the sort key of every record for a sort field, by position"""
+        return self.memoize(('sort_keys', name), lambda: [self.sort_fields[name](record) for record in self.rows()])
+
+    def ordering(self, order):
+        """
+        Return the record positions sorted by ``order``, a tuple of
+        (sort field, descending) pairs. Records without a key for a field
+        sort after the others whatever the direction.
+        """
+        def build():
+            positions = list(range(len(self.records)))
+            # Stable sorts from the least to the most significant key
+            for name, descending in reversed(order):
+                keys = self.sort_keys(name)
+                present = [position for position in positions if keys[position] is not None]
+                missing = [position for position in positions if keys[position] is None]
+                present.sort(key=keys.__getitem__, reverse=descending)
+                positions = present + missing
+            return positions
+        return self.memoize_recent(('ordering', order), build)
+
+    def rank(self, order):
+        """Return the rank of every record in ``ordering(order)``, by position"""
+        def build():
+            rank = [0] * len(self.records)
+            for index, position in enumerate(self.ordering(order)):
+                rank[position] = index
+            return rank
+        return self.memoize_recent(('rank', order), build)
+
+    def project(self, records, projection):
+        """
+        Return ``records`` (a Selection of this snapshot) as a list, projected
+        to a sparse fieldset. Each record is projected once per fieldset, for
+        the ``max_recent`` most recently used fieldsets.
+        """
+        if not projection:
+            return list(records)
+        projected = self.memoize_recent(('projection', projection.key), dict)
+        results = []
+        for position in records.positions:
+            result = projected.get(position)
+            if result is None:
+                result = projected.setdefault(position, projection.apply(self.records[position]))
+            results.append(result)
+        return results
+
+    @classmethod
+    def parse_order(cls, value):
+        """
+        Parse a sort parameter such as ``-launchDate,vehicle`` into a tuple of
+        (sort field, descending) pairs. A field given more than once keeps its
+        first direction, so an order has at most one pair per sort field.
+        Raises ValidationError for unknown fields.
+        """
+        order = {}
+        for item in (value or '').split(','):
+            item = item.strip()
+            if not item:
+                continue
+            if item in cls.sort_aliases:
+                pairs = cls.parse_order(cls.sort_aliases[item])
+            else:
+                name = item.lstrip('-+')
+                if name not in cls.sort_fields:
+                    raise ValidationError(f"Cannot sort by '{name}'. Sort fields: {', '.join(cls.sort_fields)}.")
+                pairs = ((name, item.startswith('-')),)
+            for name, descending in pairs:
+                order.setdefault(name, descending)
+        return tuple(order.items())
+
+    def select(self, filters=None, date_from=None, date_to=None, order=()):
+        """
+        Return a Selection of the records matching every filter, sorted by
+        ``order`` (see parse_order()) or else in snapshot order.
+
+        ``filters`` maps filter field names to sets of accepted normalized
+        values; ``date_from``/``date_to`` bound the date field (inclusive).
+        Only the smallest candidate set is listed; every other filter probes
+        sets memoized per index value (or the dates by position), so the cost
+        is driven by the smallest candidate set, not the snapshot size.
+        """
+        constraints = [self.filter_constraint(name, values) for name, values in (filters or {}).items()]
+        if date_from is not None or date_to is not None:
+            constraints.append(self.date_constraint(date_from, date_to))
+
+        if not constraints:
+            if order:
+                return Selection(self.records, self.ordering(order))
+            return Selection(self.records, range(len(self.records)))
+
+        constraints.sort(key=lambda constraint: constraint[0])
+        selected = constraints[0][1]()
+        for size, positions, contains in constraints[1:]:
+            if not selected:
+                break
+            contains = contains()
+            selected = [position for position in selected if contains(position)]
+        key = self.rank(order).__getitem__ if order else None
+        return Selection(self.records, sorted(selected, key=key))
+
+
+class SnapshotCache:
+    """
+    Keeps the snapshots of the most recent payload versions.
+
+    Snapshots are keyed by a cheap version key. When the key identifies a
+    payload object (e.g. a cached upstream payload), pass it as ``source``:
+    the snapshot is only reused for that very object.
+    """
+
+    def __init__(self, snapshot_class, max_entries=4):
+        self.snapshot_class = snapshot_class
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, load, source=None):
+        """
+        Return the snapshot for ``key``, building it from the records
+        ``load()`` returns when needed; ``load()`` may also return a snapshot
+        built already.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is source:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        snapshot = load()
+        if not isinstance(snapshot, Snapshot):
+            snapshot = self.snapshot_class(snapshot)
+        with self._lock:
+            self._entries[key] = (source, snapshot)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return snapshot
+
+    def find(self, version):
+        """Return the retained snapshot with the given version, or None"""
+        with self._lock:
+            snapshots = [snapshot for source, snapshot in self._entries.values()]
+        for snapshot in reversed(snapshots):
+            if snapshot.version == version:
+                return snapshot
+        return None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
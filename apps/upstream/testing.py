@@ -0,0 +1,154 @@
+"""
+Helpers for exercising the upstream client against a local stand-in API.
+
+Used by the test suite and the scripts in ``benchmarks/``.
+"""
+import hashlib
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from .cache import rendered_responses, upstream_cache
+from .compression import response_compressor
+from .resilience import guards
+
+
+class UpstreamTestCase(SimpleTestCase):
+    """Resets the upstream cache, circuit breakers, bulkheads and response caches around every test"""
+
+    def setUp(self):
+        self.reset_upstream()
+
+    def tearDown(self):
+        self.reset_upstream()
+
+    def reset_upstream(self):
+        upstream_cache.clear()
+        caches[upstream_cache.alias].clear()
+        guards.reset()
+        response_compressor.clear()
+        rendered_responses.clear()
+
+
+def endpoint_options(endpoint, **options):
+    """Override some options of one upstream endpoint (usable as decorator or context manager)"""
+    upstream = dict(settings.UPSTREAM)
+    endpoints = dict(upstream.get('ENDPOINTS', {}))
+    endpoints[endpoint] = dict(endpoints.get(endpoint, {}), **options)
+    upstream['ENDPOINTS'] = endpoints
+    return override_settings(UPSTREAM=upstream)
+
+
+class _Server(ThreadingHTTPServer):
+    # Room for the connection bursts of the concurrency tests and benchmarks
+    request_queue_size = 128
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients that gave up on a slow answer are expected in the tests
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class FakeUpstream:
+    """
+    Local stand-in for the upstream SpaceX API.
+
+    Serves ``payloads`` (a dict of path -> JSON body) over HTTP on a random
+    port, records every request (and its headers) and can delay its answers.
+    """
+
+    def __init__(self, payloads, delay=0):
+        self.payloads = payloads
+        self.delay = delay
+        self.requests = []
+        self.headers = []
+        self._lock = threading.Lock()
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                with upstream._lock:
+                    upstream.requests.append(self.path)
+                    upstream.headers.append(dict(self.headers))
+                if upstream.delay:
+                    time.sleep(upstream.delay)
+                upstream.handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = _Server(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def handle(self, request):
+        if request.path not in self.payloads:
+            self.send(request, 404, {})
+        else:
+            self.send(request, 200, self.payloads[request.path])
+
+    def send(self, request, status_code, body, headers=None):
+        content = json.dumps(body).encode() if body is not None else b''
+        request.send_response(status_code)
+        for name, value in (headers or {}).items():
+            request.send_header(name, value)
+        request.send_header('Content-Type', 'application/json')
+        request.send_header('Content-Length', str(len(content)))
+        request.end_headers()
+        request.wfile.write(content)
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class ConditionalUpstream(FakeUpstream):
+    """
+    Stand-in upstream that sends ETag/Last-Modified validators and answers
+    conditional requests with 304 when the payload has not changed.
+    """
+
+    last_modified = 'Wed, 01 Jan 2025 00:00:00 GMT'
+
+    def __init__(self, payloads, use_etag=True, **kwargs):
+        super().__init__(payloads, **kwargs)
+        self.use_etag = use_etag
+        self.status_codes = []
+
+    def etag(self, path):
+        body = json.dumps(self.payloads[path]).encode()
+        return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+    def handle(self, request):
+        if request.path not in self.payloads:
+            self.status_codes.append(404)
+            return self.send(request, 404, {})
+
+        headers = {'Last-Modified': self.last_modified}
+        if self.use_etag:
+            headers['ETag'] = self.etag(request.path)
+            not_modified = request.headers.get('If-None-Match') == headers['ETag']
+        else:
+            not_modified = request.headers.get('If-Modified-Since') == self.last_modified
+
+        if not_modified:
+            self.status_codes.append(304)
+            request.send_response(304)
+            for name, value in headers.items():
+                request.send_header(name, value)
+            request.end_headers()
+        else:
+            self.status_codes.append(200)
+            self.send(request, 200, self.payloads[request.path], headers)
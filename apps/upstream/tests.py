@@ -0,0 +1,1353 @@
+import asyncio
+import base64
+import copy
+import datetime
+import decimal
+import gzip
+import hashlib
+import importlib
+import io
+import json
+import random
+import sys
+import threading
+import time
+from collections import OrderedDict
+from unittest import mock
+
+import brotli
+
+from asgiref.sync import sync_to_async
+from cryptography.fernet import Fernet
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, override_settings
+from django.http import HttpResponse
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from apps.launches.serializers import ImageSerializer, LaunchDetailSerializer, LaunchSerializer
+from apps.launches.views import AsyncLaunchDetailAPIView, LaunchDetailAPIView
+from apps.upcoming.serializers import UpcomingLaunchSerializer
+
+from .aggregates import AggregateEngine
+from .cache import CacheEntry, TieredCache, rendered_responses, upstream_cache
+from .client import client
+from .columnar import ColumnarRecords, CompactRecord
+from .compression import negotiate_encoding, response_compressor
+from .conditional import content_version, parse_updated_at
+from .exceptions import APIError, BulkheadFullError, CircuitOpenError, DecryptionError, NotFoundError, ValidationError
+from .fields import Projection, parse_paths
+from .middleware import WhiteNoiseMiddleware
+from .renderers import ORJSONRenderer
+from .registry import EndpointRegistry, registry
+from .resilience import guards
+from .scheduler import RefreshJob, RefreshScheduler, refresh_scheduler
+from .schema import CompiledSerializer
+from .snapshot import Snapshot
+from .testing import ConditionalUpstream, FakeUpstream, UpstreamTestCase, endpoint_options
+from .utils import _refreshing, afetch_json, fetch_json
+from .validation import MemoizedValidator
+from .views import RenderedResponse
+
+
+class InvalidJSONUpstream(FakeUpstream):
+    """Fake upstream answering 200 with a body that is not JSON"""
+
+    def handle(self, request):
+        content = b'<html>Bad gateway</html>'
+        request.send_response(200)
+        request.send_header('Content-Type', 'text/html')
+        request.send_header('Content-Length', str(len(content)))
+        request.end_headers()
+        request.wfile.write(content)
+
+
+class UpstreamClientTests(UpstreamTestCase):
+    def fetch(self, url, **kwargs):
+        with registry.override(dragon=url):
+            return client.fetch('dragon', label='Dragon tracking data', **kwargs)
+
+    @endpoint_options('dragon', TIMEOUT=0.1)
+    def test_timeout_is_an_api_error(self):
+        with FakeUpstream({'/dragon': {}}, delay=0.5) as upstream:
+            with self.assertRaisesMessage(APIError, 'Service temporarily unavailable. Please try again later.'):
+                self.fetch(f"{upstream.url}/dragon")
+
+    def test_connection_error_is_an_api_error(self):
+        with self.assertRaisesMessage(APIError, 'Unable to connect to data source. Please try again later.'):
+            self.fetch('http://127.0.0.1:9/dragon')
+
+    def test_http_errors_are_mapped(self):
+        with FailingUpstream({}) as upstream:
+            with self.assertRaisesMessage(APIError, 'External service error. Please try again later.'):
+                self.fetch(f"{upstream.url}/dragon")
+            upstream.failing = False
+            with self.assertRaisesMessage(NotFoundError, 'Dragon tracking data not found.'):
+                self.fetch(f"{upstream.url}/dragon")
+
+    def test_invalid_json_is_an_api_error_not_a_validation_error(self):
+        with InvalidJSONUpstream({}) as upstream:
+            with self.assertRaisesMessage(APIError, 'Invalid response format from SpaceX API') as raised:
+                self.fetch(f"{upstream.url}/dragon")
+
+        self.assertNotIsInstance(raised.exception, ValidationError)
+
+    def test_unexpected_payload_type_is_a_validation_error(self):
+        with FakeUpstream({'/dragon': [1, 2]}) as upstream:
+            with self.assertRaises(ValidationError):
+                self.fetch(f"{upstream.url}/dragon", expected_type=dict)
+
+    def test_invalid_launch_detail_body_returns_503(self):
+        with InvalidJSONUpstream({}) as upstream:
+            with registry.override(launch_detail=f"{upstream.url}/detail"):
+                response = LaunchDetailAPIView.as_view()(RequestFactory().get('/launches/mission/'), link='mission')
+
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(response.data['success'])
+
+
+class SingleFlightTests(UpstreamTestCase):
+    callers = 25
+
+    def test_concurrent_threads_share_one_upstream_call(self):
+        with FakeUpstream({'/upcoming': [{'id': 1}]}, delay=0.2) as upstream:
+            with registry.override(upcoming=f"{upstream.url}/upcoming"):
+                barrier = threading.Barrier(self.callers)
+                results = [None] * self.callers
+
+                def call(index):
+                    barrier.wait()
+                    results[index] = fetch_json('upcoming', expected_type=list)
+
+                threads = [threading.Thread(target=call, args=(i,)) for i in range(self.callers)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+
+        self.assertEqual(upstream.requests, ['/upcoming'])
+        self.assertEqual(results, [[{'id': 1}]] * self.callers)
+
+    def test_concurrent_threads_share_one_error(self):
+        with FakeUpstream({}, delay=0.2) as upstream:
+            with registry.override(dragon=f"{upstream.url}/dragon"):
+                barrier = threading.Barrier(self.callers)
+                errors = []
+
+                def call():
+                    barrier.wait()
+                    try:
+                        fetch_json('dragon', expected_type=dict)
+                    except Exception as e:
+                        errors.append(e)
+
+                threads = [threading.Thread(target=call) for _ in range(self.callers)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+
+        self.assertEqual(upstream.requests, ['/dragon'])
+        self.assertEqual(len(errors), self.callers)
+
+    def test_concurrent_coroutines_share_one_upstream_call(self):
+        async def fetch_all():
+            return await asyncio.gather(*[afetch_json('upcoming', expected_type=list) for _ in range(self.callers)])
+
+        with FakeUpstream({'/upcoming': [{'id': 1}]}, delay=0.2) as upstream:
+            with registry.override(upcoming=f"{upstream.url}/upcoming"):
+                results = asyncio.run(fetch_all())
+
+        self.assertEqual(upstream.requests, ['/upcoming'])
+        self.assertEqual(results, [[{'id': 1}]] * self.callers)
+
+    def test_concurrent_coroutines_share_one_error(self):
+        async def fetch_all():
+            return await asyncio.gather(
+                *[afetch_json('dragon', expected_type=dict) for _ in range(self.callers)],
+                return_exceptions=True,
+            )
+
+        with FakeUpstream({}, delay=0.2) as upstream:
+            with registry.override(dragon=f"{upstream.url}/dragon"):
+                errors = asyncio.run(fetch_all())
+
+        self.assertEqual(upstream.requests, ['/dragon'])
+        self.assertTrue(all(isinstance(error, NotFoundError) for error in errors))
+        # Every waiter gets the very exception the leader raised
+        self.assertEqual(len({id(error) for error in errors}), 1)
+
+
+class ConditionalRequestTests(UpstreamTestCase):
+    def test_refresh_sends_etag_and_reuses_payload_on_304(self):
+        payload = {'glass.dgn_speed_f64': 7.5}
+        with ConditionalUpstream({'/dragon': payload}) as upstream:
+            with registry.override(dragon=f"{upstream.url}/dragon"):
+                first = fetch_json('dragon', expected_type=dict)
+                entry = upstream_cache.get('upstream:dragon', count=False)
+                time.sleep(0.01)
+                second = fetch_json('dragon', expected_type=dict, refresh=True)
+                refreshed = upstream_cache.get('upstream:dragon', count=False)
+
+        self.assertEqual(upstream.status_codes, [200, 304])
+        self.assertEqual(upstream.headers[1].get('If-None-Match'), upstream.etag('/dragon'))
+        self.assertEqual(first, payload)
+        self.assertIs(second, first)
+        self.assertGreater(refreshed.expires_at, entry.expires_at)
+
+    def test_changed_payload_is_downloaded_again(self):
+        payloads = {'/upcoming': [{'id': 1}]}
+        with ConditionalUpstream(payloads) as upstream:
+            with registry.override(upcoming=f"{upstream.url}/upcoming"):
+                fetch_json('upcoming', expected_type=list)
+                payloads['/upcoming'] = [{'id': 1}, {'id': 2}]
+                data = fetch_json('upcoming', expected_type=list, refresh=True)
+
+        self.assertEqual(upstream.status_codes, [200, 200])
+        self.assertEqual(data, [{'id': 1}, {'id': 2}])
+
+    def test_refresh_sends_last_modified_without_etag(self):
+        with ConditionalUpstream({'/stats': {'id': 1}}, use_etag=False) as upstream:
+            with registry.override(stats=f"{upstream.url}/stats"):
+                fetch_json('stats', expected_type=dict)
+                data = fetch_json('stats', expected_type=dict, refresh=True)
+
+        self.assertEqual(upstream.status_codes, [200, 304])
+        self.assertNotIn('If-None-Match', upstream.headers[1])
+        self.assertEqual(upstream.headers[1].get('If-Modified-Since'), ConditionalUpstream.last_modified)
+        self.assertEqual(data, {'id': 1})
+
+
+class AsyncViewTests(UpstreamTestCase):
+    detail = {
+        'id': 1,
+        'documentId': 'doc',
+        'title': 'Mission',
+        'callToAction': 'Watch',
+        'missionStatus': 'complete',
+        'followDragonEnabled': False,
+        'returnFromIssEnabled': False,
+        'toTheIssEnabled': False,
+    }
+
+    def responses(self, link):
+        """Render the sync and async launch detail views for ``link``"""
+        sync_response = LaunchDetailAPIView.as_view()(RequestFactory().get(f'/launches/{link}/'), link=link)
+        self.reset_upstream()
+        async_response = asyncio.run(
+            AsyncLaunchDetailAPIView.as_view()(AsyncRequestFactory().get(f'/launches/{link}/'), link=link)
+        )
+        return sync_response, async_response
+
+    def test_async_view_matches_sync_view(self):
+        with FakeUpstream({'/detail/mission': self.detail}) as upstream:
+            with registry.override(launch_detail=f"{upstream.url}/detail"):
+                for link in ('mission', 'missing', 'bad.link'):
+                    sync_response, async_response = self.responses(link)
+                    self.assertEqual(async_response.status_code, sync_response.status_code)
+                    self.assertEqual(async_response.data, sync_response.data)
+
+        # The async view fetched through the async client, not the sync one
+        self.assertEqual(upstream.requests.count('/detail/mission'), 2)
+
+    def test_async_view_reports_upstream_errors_like_sync_view(self):
+        with FakeUpstream({}) as upstream:
+            url = upstream.url
+        with registry.override(launch_detail=f"{url}/detail"):
+            sync_response, async_response = self.responses('mission')
+
+        self.assertEqual(sync_response.status_code, 503)
+        self.assertEqual(async_response.status_code, 503)
+        self.assertEqual(async_response.data, sync_response.data)
+
+
+class FailingUpstream(FakeUpstream):
+    """Fake upstream that answers 500 while ``failing`` is set"""
+
+    failing = True
+
+    def handle(self, request):
+        if self.failing:
+            self.send(request, 500, {})
+        else:
+            super().handle(request)
+
+
+class CircuitBreakerTests(UpstreamTestCase):
+    @endpoint_options('stats', BREAKER_FAILURE_THRESHOLD=2, BREAKER_RESET_TIMEOUT=0.2, STALE_IF_ERROR=0)
+    def test_breaker_opens_fails_fast_and_recovers_after_probe(self):
+        with FailingUpstream({'/stats': {'id': 1}}) as upstream:
+            with registry.override(stats=f"{upstream.url}/stats"):
+                for _ in range(2):
+                    with self.assertRaises(APIError):
+                        fetch_json('stats', expected_type=dict)
+                with self.assertRaises(CircuitOpenError):
+                    fetch_json('stats', expected_type=dict)
+                self.assertEqual(len(upstream.requests), 2)
+
+                time.sleep(0.25)
+                upstream.failing = False
+                self.assertEqual(fetch_json('stats', expected_type=dict), {'id': 1})
+
+        report = guards.report()['stats']['breaker']
+        self.assertEqual(report['state'], 'closed')
+        self.assertEqual(report['transitions'], {'open': 1, 'half_open': 1, 'closed': 1})
+        self.assertEqual(report['rejected'], 1)
+
+    @endpoint_options('stats', BREAKER_FAILURE_THRESHOLD=1, BREAKER_RESET_TIMEOUT=60, STALE_WHILE_REVALIDATE=0)
+    def test_open_breaker_serves_cached_payload(self):
+        with FailingUpstream({'/stats': {'id': 1}}) as upstream:
+            upstream.failing = False
+            with registry.override(stats=f"{upstream.url}/stats"):
+                fetch_json('stats', expected_type=dict)
+                upstream.failing = True
+                # Refresh fails and opens the breaker; the next read fails fast and serves the cache
+                with self.assertRaises(APIError):
+                    fetch_json('stats', expected_type=dict, refresh=True)
+                upstream_cache.set('upstream:stats', upstream_cache.get('upstream:stats').revalidated(-1), 60)
+                self.assertEqual(fetch_json('stats', expected_type=dict), {'id': 1})
+
+        self.assertEqual(len(upstream.requests), 2)
+
+    @endpoint_options('dragon', BREAKER_FAILURE_THRESHOLD=1, BREAKER_SLOW_CALL=0.1)
+    def test_slow_calls_open_the_breaker(self):
+        with FakeUpstream({'/dragon': {'glass.dgn_speed_f64': 7.5}}, delay=0.15) as upstream:
+            with registry.override(dragon=f"{upstream.url}/dragon"):
+                fetch_json('dragon', expected_type=dict, refresh=True)
+                with self.assertRaises(CircuitOpenError):
+                    fetch_json('dragon', expected_type=dict, refresh=True)
+
+        self.assertEqual(guards.report()['dragon']['breaker']['slow_calls'], 1)
+
+
+class BulkheadTests(UpstreamTestCase):
+    @endpoint_options('launch_detail', MAX_CONCURRENT=2, BULKHEAD_WAIT=0)
+    def test_bulkhead_caps_concurrent_calls_per_endpoint(self):
+        payloads = {f'/detail/mission-{i}': {'id': i} for i in range(5)}
+        with FakeUpstream(payloads, delay=0.2) as upstream:
+            with registry.override(launch_detail=f"{upstream.url}/detail"):
+                barrier = threading.Barrier(5)
+                errors = []
+
+                def call(index):
+                    barrier.wait()
+                    try:
+                        fetch_json('launch_detail', f'mission-{index}')
+                    except Exception as e:
+                        errors.append(e)
+
+                threads = [threading.Thread(target=call, args=(i,)) for i in range(5)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+
+        self.assertEqual(len(upstream.requests), 2)
+        self.assertEqual(len(errors), 3)
+        self.assertTrue(all(isinstance(error, BulkheadFullError) for error in errors))
+        report = guards.report()['launch_detail']
+        self.assertEqual(report['bulkhead'], {'max_concurrent': 2, 'active': 0, 'rejected': 3})
+        # Rejections say nothing about the upstream's health
+        self.assertEqual(report['breaker']['state'], 'closed')
+
+    @endpoint_options('launch_detail', MAX_CONCURRENT=2, BULKHEAD_WAIT=0)
+    def test_async_bulkhead_caps_concurrent_calls(self):
+        payloads = {f'/detail/mission-{i}': {'id': i} for i in range(5)}
+
+        async def fetch_all():
+            return await asyncio.gather(
+                *[afetch_json('launch_detail', f'mission-{i}') for i in range(5)],
+                return_exceptions=True,
+            )
+
+        with FakeUpstream(payloads, delay=0.2) as upstream:
+            with registry.override(launch_detail=f"{upstream.url}/detail"):
+                results = asyncio.run(fetch_all())
+
+        self.assertEqual(len(upstream.requests), 2)
+        self.assertEqual(sum(isinstance(result, BulkheadFullError) for result in results), 3)
+
+    @endpoint_options('launch_detail', MAX_CONCURRENT=1, BULKHEAD_WAIT=1, BREAKER_FAILURE_THRESHOLD=1, BREAKER_SLOW_CALL=0.25)
+    def test_time_queued_for_the_bulkhead_is_not_a_slow_call(self):
+        # The second call waits ~0.15s for the slot; only its own 0.15s counts
+        threads = [
+            threading.Thread(target=guards.call, args=('launch_detail', lambda: time.sleep(0.15)))
+            for _ in range(2)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        breaker = guards.report()['launch_detail']['breaker']
+        self.assertEqual(breaker['slow_calls'], 0)
+        self.assertEqual(breaker['state'], 'closed')
+
+    @endpoint_options('launch_detail', MAX_CONCURRENT=1, BULKHEAD_WAIT=1, BREAKER_FAILURE_THRESHOLD=1, BREAKER_SLOW_CALL=0.25)
+    def test_async_time_queued_for_the_bulkhead_is_not_a_slow_call(self):
+        async def call_all():
+            await asyncio.gather(*[guards.acall('launch_detail', lambda: asyncio.sleep(0.15)) for _ in range(2)])
+
+        asyncio.run(call_all())
+
+        breaker = guards.report()['launch_detail']['breaker']
+        self.assertEqual(breaker['slow_calls'], 0)
+        self.assertEqual(breaker['state'], 'closed')
+
+
+class ProjectionTests(SimpleTestCase):
+    record = {
+        'title': 'Mission',
+        'link': 'mission',
+        'imageDesktop': {
+            'id': 1,
+            'formats': {'large': {'url': 'l'}, 'thumbnail': {'url': 't', 'size': 1}},
+        },
+        'videoDesktop': [{'url': 'a', 'mime': 'video/mp4'}, {'url': 'b'}],
+    }
+
+    def project(self, fields='', exclude=''):
+        return Projection.from_params({'fields': fields, 'exclude': exclude}).apply(self.record)
+
+    def test_fields_keep_top_level_and_nested_paths(self):
+        self.assertEqual(
+            self.project('title,imageDesktop.formats.thumbnail.url,missing'),
+            {'title': 'Mission', 'imageDesktop': {'formats': {'thumbnail': {'url': 't'}}}},
+        )
+        self.assertEqual(self.project('videoDesktop.url'), {'videoDesktop': [{'url': 'a'}, {'url': 'b'}]})
+        # A parent path selects the whole value
+        self.assertEqual(self.project('imageDesktop,imageDesktop.id'), {'imageDesktop': self.record['imageDesktop']})
+
+    def test_exclude_drops_paths_without_touching_the_record(self):
+        projected = self.project(exclude='link,videoDesktop,imageDesktop.formats.large')
+        self.assertEqual(projected, {
+            'title': 'Mission',
+            'imageDesktop': {'id': 1, 'formats': {'thumbnail': {'url': 't', 'size': 1}}},
+        })
+        self.assertIn('large', self.record['imageDesktop']['formats'])
+
+    def test_malformed_paths_are_rejected(self):
+        self.assertEqual(parse_paths('b, a ,b'), (('a',), ('b',)))
+        with self.assertRaises(ValidationError):
+            parse_paths('imageDesktop..formats')
+
+
+class CompressionTests(UpstreamTestCase):
+    launches = [{'id': i, 'documentId': f'doc-{i}', 'title': f'Mission {i}', 'launchDate': '2025-01-01'} for i in range(20)]
+
+    def get(self, accept_encoding=None, path='/launches/'):
+        headers = {'HTTP_ACCEPT_ENCODING': accept_encoding} if accept_encoding else {}
+        with FakeUpstream({'/launches': self.launches}) as upstream:
+            with registry.override(launches=f"{upstream.url}/launches"):
+                return self.client.get(path, **headers)
+
+    def test_negotiation(self):
+        self.assertEqual(negotiate_encoding('gzip, deflate, br'), 'br')
+        self.assertEqual(negotiate_encoding('gzip;q=1.0, br;q=0.5'), 'gzip')
+        self.assertEqual(negotiate_encoding('br;q=0, *'), 'gzip')
+        self.assertIsNone(negotiate_encoding('identity'))
+        self.assertIsNone(negotiate_encoding(''))
+
+    def test_responses_are_compressed_once_per_body(self):
+        plain = self.get()
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertIn('Accept-Encoding', plain['Vary'])
+
+        first = self.get('gzip, br')
+        second = self.get('br')
+        self.assertEqual(first['Content-Encoding'], 'br')
+        self.assertIn('Accept-Encoding', first['Vary'])
+        self.assertEqual(int(first['Content-Length']), len(first.content))
+        self.assertEqual(brotli.decompress(first.content), plain.content)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(gzip.decompress(self.get('gzip').content), plain.content)
+        self.assertEqual(response_compressor.stats()['misses'], 2)
+        self.assertEqual(response_compressor.stats()['hits'], 1)
+
+    def test_small_responses_are_not_compressed(self):
+        response = self.get('br', path='/launches/health/')
+        self.assertNotIn('Content-Encoding', response)
+        self.assertNotIn('Accept-Encoding', response.get('Vary', ''))
+
+    async def test_async_requests_are_compressed(self):
+        plain = await asyncio.to_thread(self.get)
+        with FakeUpstream({'/launches': self.launches}) as upstream:
+            with registry.override(launches=f"{upstream.url}/launches"):
+                response = await self.async_client.get('/launches/', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    def test_output_matches_the_stock_renderer(self):
+        data = OrderedDict([
+            ('success', True),
+            ('when', datetime.datetime(2025, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc)),
+            ('date', datetime.date(2025, 1, 2)),
+            ('time', datetime.time(12, 30)),
+            ('size', decimal.Decimal('1.5')),
+            ('items', (1, 2.5, None, 'Falcon 9 – Crew\u2028')),
+            (3, {'nested': []}),
+        ])
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+        self.assertEqual(
+            ORJSONRenderer().render(data, 'application/json; indent=4'),
+            JSONRenderer().render(data, 'application/json; indent=4'),
+        )
+
+
+class RenderedResponseCacheTests(UpstreamTestCase):
+    payload = {'glass.dgn_speed_f64': 7.5}
+
+    def get(self, upstream, query=''):
+        with registry.override(dragon=f"{upstream.url}/dragon"):
+            return self.client.get(f'/dragon/{query}')
+
+    def test_unchanged_data_is_rendered_once_per_url(self):
+        with ConditionalUpstream({'/dragon': self.payload}) as upstream:
+            first = self.get(upstream, '?a=1&b=2')
+            second = self.get(upstream, '?b=2&a=1')
+            other = self.get(upstream)
+
+        self.assertNotIsInstance(first, RenderedResponse)
+        self.assertIsInstance(second, RenderedResponse)
+        self.assertNotIsInstance(other, RenderedResponse)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['Content-Type'], first['Content-Type'])
+        self.assertEqual(rendered_responses.stats()['hits'], 1)
+
+    def test_new_data_version_is_rendered_again(self):
+        payloads = {'/dragon': self.payload}
+        with ConditionalUpstream(payloads) as upstream:
+            first = self.get(upstream)
+            payloads['/dragon'] = {'glass.dgn_speed_f64': 8.0}
+            with registry.override(dragon=f"{upstream.url}/dragon"):
+                fetch_json('dragon', expected_type=dict, refresh=True)
+            second = self.get(upstream)
+
+        self.assertNotIsInstance(second, RenderedResponse)
+        self.assertNotEqual(second.content, first.content)
+
+    @endpoint_options('dragon', TTL=0, STALE_WHILE_REVALIDATE=60)
+    def test_stale_responses_are_not_cached(self):
+        with ConditionalUpstream({'/dragon': self.payload}) as upstream:
+            self.get(upstream)
+            stale = self.get(upstream)
+
+        # The stale response is neither served from nor stored in the cache
+        self.assertNotIsInstance(stale, RenderedResponse)
+        self.assertTrue(stale.json()['stale'])
+        self.assertEqual(rendered_responses.stats()['entries'], 1)
+
+
+class ConditionalResponseTests(UpstreamTestCase):
+    payload = {'glass.dgn_speed_f64': 7.5, 'updatedAt': '2025-01-02T03:04:05.000Z'}
+
+    def get(self, upstream, query='', **headers):
+        with registry.override(dragon=f"{upstream.url}/dragon"):
+            return self.client.get(f'/dragon/{query}', headers=headers)
+
+    def test_matching_etag_gets_not_modified(self):
+        with ConditionalUpstream({'/dragon': self.payload}) as upstream:
+            first = self.get(upstream, '?a=1')
+            not_modified = self.get(upstream, '?a=1', if_none_match=first['ETag'])
+            other_query = self.get(upstream, '?a=2', if_none_match=first['ETag'])
+
+        self.assertRegex(first['ETag'], r'^"[0-9a-f]{32}"$')
+        self.assertEqual(first['Last-Modified'], 'Thu, 02 Jan 2025 03:04:05 GMT')
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b'')
+        self.assertEqual(not_modified['ETag'], first['ETag'])
+        self.assertEqual(other_query.status_code, 200)
+        self.assertNotEqual(other_query['ETag'], first['ETag'])
+
+    def test_if_modified_since_uses_the_newest_update(self):
+        with ConditionalUpstream({'/dragon': self.payload}) as upstream:
+            not_modified = self.get(upstream, if_modified_since='Thu, 02 Jan 2025 03:04:05 GMT')
+            modified = self.get(upstream, if_modified_since='Thu, 02 Jan 2025 03:04:04 GMT')
+
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(modified.status_code, 200)
+
+    def test_updated_at_in_the_upstream_format_is_parsed(self):
+        class StrictDatetime(datetime.datetime):
+            """fromisoformat() as in Python 3.10, which rejects a ``Z`` suffix"""
+
+            @classmethod
+            def fromisoformat(cls, value):
+                if value.endswith('Z'):
+                    raise ValueError(f'Invalid isoformat string: {value!r}')
+                return super().fromisoformat(value)
+
+        with mock.patch('apps.upstream.conditional.datetime', StrictDatetime):
+            self.assertEqual(parse_updated_at('2025-01-02T03:04:05.000Z'), 1735787045)
+            self.assertEqual(parse_updated_at('2025-01-02T03:04:05.000+00:00'), 1735787045)
+            self.assertEqual(parse_updated_at('2025-01-02T03:04:05'), 1735787045)
+            self.assertIsNone(parse_updated_at('Z'))
+            self.assertIsNone(parse_updated_at('yesterday'))
+
+    def test_content_version_hashes_lists_item_by_item(self):
+        records = [{'id': index, 'title': f'Mission {index}'} for index in range(3)]
+        dumps = json.dumps
+
+        def dump_items_only(value, **kwargs):
+            self.assertNotIsInstance(value, list)
+            return dumps(value, **kwargs)
+
+        with mock.patch('apps.upstream.conditional.json.dumps', side_effect=dump_items_only):
+            version = content_version(records)
+            self.assertEqual(content_version(tuple(records)), version)
+            self.assertEqual(content_version(ColumnarRecords(records)), version)
+        self.assertNotEqual(content_version(records[::-1]), version)
+        self.assertNotEqual(content_version(records[0]), content_version(records[:1]))
+
+    def test_new_data_version_changes_the_etag(self):
+        payloads = {'/dragon': self.payload}
+        with ConditionalUpstream(payloads) as upstream:
+            first = self.get(upstream)
+            payloads['/dragon'] = dict(self.payload, **{'glass.dgn_speed_f64': 8.0})
+            with registry.override(dragon=f"{upstream.url}/dragon"):
+                fetch_json('dragon', expected_type=dict, refresh=True)
+            second = self.get(upstream, if_none_match=first['ETag'])
+
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second['ETag'], first['ETag'])
+
+    @endpoint_options('dragon', TTL=0, STALE_WHILE_REVALIDATE=60)
+    def test_stale_responses_have_no_validators(self):
+        with ConditionalUpstream({'/dragon': self.payload}) as upstream:
+            first = self.get(upstream)
+            stale = self.get(upstream, if_none_match=first['ETag'])
+
+        self.assertEqual(stale.status_code, 200)
+        self.assertTrue(stale.json()['stale'])
+        self.assertFalse(stale.has_header('ETag'))
+
+
+class MemoizedValidatorTests(SimpleTestCase):
+    class CountingSerializer(serializers.Serializer):
+        documentId = serializers.CharField()
+        size = serializers.IntegerField()
+        calls = 0
+
+        def validate(self, attrs):
+            type(self).calls += 1
+            return attrs
+
+    def setUp(self):
+        self.CountingSerializer.calls = 0
+        self.validator = MemoizedValidator(self.CountingSerializer)
+
+    def test_unchanged_records_are_validated_once(self):
+        record = {'documentId': 'a', 'size': 1, 'updatedAt': '2025-01-01T00:00:00.000Z'}
+        first = self.validator.validate(record)
+        second = self.validator.validate(dict(record))
+        updated = self.validator.validate(dict(record, size=2, updatedAt='2025-01-02T00:00:00.000Z'))
+
+        self.assertIs(second[0], first[0])
+        self.assertEqual(updated[0]['size'], 2)
+        self.assertEqual(self.CountingSerializer.calls, 2)
+        self.assertEqual(self.validator.stats()['hits'], 1)
+
+    def test_records_without_updated_at_are_keyed_by_content(self):
+        self.validator.validate({'documentId': 'a', 'size': 1})
+        self.validator.validate({'documentId': 'a', 'size': 1})
+        changed = self.validator.validate({'documentId': 'a', 'size': 2})
+
+        self.assertEqual(changed[0]['size'], 2)
+        self.assertEqual(self.CountingSerializer.calls, 2)
+
+    def test_errors_are_memoized(self):
+        record = {'documentId': 'a', 'size': 'large', 'updatedAt': '2025-01-01T00:00:00.000Z'}
+        validated_data, errors = self.validator.validate(record)
+
+        self.assertIsNone(validated_data)
+        self.assertIn('size', errors)
+        self.assertEqual(self.validator.validate(record), (None, errors))
+        self.assertEqual(self.validator.stats(), dict(self.validator.stats(), entries=1, hits=1, misses=1))
+
+
+def image_payload(index):
+    def image_format(name, width):
+        return {
+            'ext': '.jpg', 'url': f'https://cdn.example.com/{name}_{index}.jpg', 'hash': f'{name}_{index}',
+            'mime': 'image/jpeg', 'name': f'{name}_{index}.jpg', 'path': None, 'size': 120.5,
+            'width': width, 'height': width // 2, 'sizeInBytes': 120500,
+        }
+
+    return {
+        'id': index, 'name': f'image-{index}.jpg', 'alternativeText': None, 'caption': 'Liftoff',
+        'width': 1920, 'height': 1080, 'hash': f'image_{index}', 'ext': '.jpg', 'mime': 'image/jpeg',
+        'size': 350.2, 'url': f'https://cdn.example.com/image_{index}.jpg', 'previewUrl': None,
+        'provider': 'aws-s3', 'provider_metadata': None, 'folderPath': '/',
+        'createdAt': '2025-01-01T00:00:00.000Z', 'updatedAt': '2025-01-02T10:30:00.000Z',
+        'documentId': f'image-{index}', 'locale': None, 'publishedAt': '2025-01-01T00:00:00.000Z',
+        'formats': {name: image_format(name, width) for name, width in
+                    (('large', 1000), ('small', 500), ('medium', 750), ('thumbnail', 245))},
+    }
+
+
+def launch_payload(index):
+    return {
+        'id': index, 'documentId': f'doc-{index}', 'correlationId': None, 'endDate': None, 'endTime': None,
+        'title': f'Mission {index}', 'subtitle': None, 'quickDetail': 'Falcon 9 launch', 'link': f'mission-{index}',
+        'youtubeVideoId': None, 'streamingVideoType': None, 'callToAction': 'WATCH',
+        'missionStatus': 'complete', 'vehicle': 'Falcon 9', 'returnSite': None, 'launchSite': 'SLC-40',
+        'isOngoing': False, 'launchDate': '2025-01-05', 'launchTime': '12:00:00', 'missionType': 'starlink',
+        'directToCell': False, 'isLive': False, 'returnDateTime': None, 'showLaunchTimeInsteadOfWindow': 'false',
+        'imageDesktop': image_payload(index), 'imageMobile': image_payload(index + 1),
+        'ongoingMissionImageDesktop': None, 'ongoingMissionImageMobile': None,
+        'videoDesktop': None, 'videoMobile': {'url': 'https://cdn.example.com/video.mp4'},
+    }
+
+
+def launch_detail_payload(index):
+    timeline = {
+        'id': 1, 'name': 'Pre-launch', 'title': 'Countdown', 'disclaimer': None, 'timeHeader': 'HR/MIN/SEC',
+        'descriptionHeader': 'EVENT', 'createdAt': '2025-01-01T00:00:00.000Z', 'documentId': 'timeline-1',
+        'timelineEntries': [{'id': i, 'time': f'-00:{i:02d}:00', 'description': f'Step {i}'} for i in range(5)],
+    }
+    return {
+        'id': index, 'documentId': f'doc-{index}', 'missionId': 'crew-11', 'title': f'Mission {index}',
+        'callToAction': 'WATCH', 'missionStatus': 'complete', 'endDate': '2025-02-01',
+        'followDragonEnabled': True, 'returnFromIssEnabled': False, 'toTheIssEnabled': 'true',
+        'imageDesktop': image_payload(index), 'infographicDesktop': None,
+        'preLaunchTimeline': timeline, 'postLaunchTimeline': None,
+        'astronauts': [{'id': 1, 'name': 'Astronaut', 'bioLink': 'https://www.nasa.gov/people/', 'portrait': image_payload(9)}],
+        'webcasts': [{'id': 1, 'videoId': 'abc', 'streamingVideoType': 'youtube', 'date': '2025-01-05', 'isFeatured': None}],
+        'paragraphs': [{'id': 1, 'content': 'Paragraph'}],
+        'carousel': {'id': 1, 'carouselItems': [{'id': 1, 'caption': None, 'imageDesktop': image_payload(3)}]},
+    }
+
+
+# Replacement values for the fuzzed payloads: valid and invalid values of
+# every field type, plus values that are only valid after coercion
+FUZZ_VALUES = [
+    None, '', '   ', ' padded ', 'x' * 600, 'text', '\x00', '\ud800', 0, 1, -7, 2.5, 1e308, True, False,
+    '1', '1.0', '1.5', 'yes', 'off', 'null', [], [1], {}, {'id': 1}, '2025-01-05', '01/05/2025',
+    '12:00', '12:00:00.123', '2025-01-05T12:00:00Z', '2025-01-05T12:00:00+07:00', '2025-01-05 12:00',
+    'https://example.com/a.png', 'example.com', 'http://', 'ftp://example.com/file',
+]
+
+
+def fuzz(payload, rng):
+    """Return a copy of ``payload`` with one value replaced or removed"""
+    payload = copy.deepcopy(payload)
+    paths = []
+
+    def walk(value, path):
+        if isinstance(value, dict):
+            for key, item in value.items():
+                paths.append(path + (key,))
+                walk(item, path + (key,))
+        elif isinstance(value, list):
+            for index, item in enumerate(value):
+                paths.append(path + (index,))
+                walk(item, path + (index,))
+
+    walk(payload, ())
+    *parents, last = rng.choice(paths)
+    container = payload
+    for key in parents:
+        container = container[key]
+    if isinstance(container, dict) and rng.random() < 0.2:
+        del container[last]
+    else:
+        container[last] = copy.deepcopy(rng.choice(FUZZ_VALUES))
+    return payload
+
+
+class CompiledSerializerParityTests(SimpleTestCase):
+    cases = [
+        (UpcomingLaunchSerializer, launch_payload),
+        (LaunchSerializer, launch_payload),
+        (LaunchDetailSerializer, launch_detail_payload),
+        (ImageSerializer, image_payload),
+    ]
+
+    def assertParity(self, serializer_class, payload):
+        serializer = serializer_class(data=payload)
+        expected = (serializer.validated_data, None) if serializer.is_valid() else (None, serializer.errors)
+        result = CompiledSerializer(serializer_class).validate(payload)
+        self.assertEqual(result, expected)
+        if expected[0] is not None:
+            self.assertEqual(list(result[0]), list(expected[0]))
+        return expected[0] is not None
+
+    def test_serializers_compile(self):
+        for serializer_class, build in self.cases:
+            self.assertIsNotNone(CompiledSerializer(serializer_class).check, serializer_class.__name__)
+
+    def test_recorded_payloads(self):
+        for serializer_class, build in self.cases:
+            with self.subTest(serializer_class.__name__):
+                self.assertParity(serializer_class, build(1))
+                self.assertParity(serializer_class, {})
+                self.assertParity(serializer_class, None)
+                self.assertParity(serializer_class, [build(1)])
+
+    def test_fuzzed_payloads(self):
+        rng = random.Random(22)
+        for serializer_class, build in self.cases:
+            payload = build(1)
+            for _ in range(150):
+                mutated = fuzz(payload, rng)
+                with self.subTest(serializer_class.__name__, payload=mutated):
+                    # Mutations accumulate on valid payloads so several fields change at once
+                    if self.assertParity(serializer_class, mutated):
+                        payload = mutated
+
+    def test_uncompilable_serializers_use_drf(self):
+        class CheckedSerializer(serializers.Serializer):
+            size = serializers.IntegerField()
+
+            def validate_size(self, value):
+                if value > 10:
+                    raise serializers.ValidationError('Too large.')
+                return value
+
+        schema = CompiledSerializer(CheckedSerializer)
+        self.assertIsNone(schema.check)
+        self.assertEqual(schema.validate({'size': '3'}), ({'size': 3}, None))
+        self.assertEqual(schema.validate({'size': 11})[1], {'size': ['Too large.']})
+
+
+class AggregateEngineTests(SimpleTestCase):
+    dimensions = ('vehicle', 'missionType', 'isLive')
+
+    def records(self, count, rng):
+        return [
+            {
+                'documentId': f'doc-{index}',
+                'updatedAt': '2025-01-01T00:00:00.000Z',
+                'vehicle': rng.choice(['Falcon 9', 'Falcon Heavy', None]),
+                'missionType': rng.choice(['starlink', 'crew']),
+                'isLive': rng.choice([True, False]),
+            }
+            for index in range(count)
+        ]
+
+    def test_incremental_counts_match_a_fresh_count(self):
+        rng = random.Random(23)
+        engine = AggregateEngine(self.dimensions)
+        records = self.records(50, rng)
+        engine.aggregate(records)
+
+        # Change, add, remove and duplicate a few records
+        records = list(records)
+        records[3] = dict(records[3], vehicle='Starship', updatedAt='2025-01-02T00:00:00.000Z')
+        records.append(dict(records[10], documentId='doc-new'))
+        del records[20]
+        records.append(records[0])
+        with mock.patch.object(engine, 'cell', wraps=engine.cell) as cell:
+            incremental = engine.aggregate(records)
+        fresh = AggregateEngine(self.dimensions).aggregate(records)
+
+        self.assertEqual(cell.call_count, 2)
+        self.assertEqual(incremental.cells, fresh.cells)
+        self.assertEqual(incremental.total, 51)
+        self.assertEqual(incremental.counts('vehicle')['Starship'], 1)
+
+    def test_group_by_any_combination(self):
+        records = self.records(40, random.Random(1))
+        aggregates = AggregateEngine(self.dimensions).aggregate(records)
+
+        for names in (('vehicle',), ('missionType', 'vehicle'), ('isLive', 'vehicle', 'missionType')):
+            expected = {}
+            for record in records:
+                key = tuple(record[name] for name in names)
+                expected[key] = expected.get(key, 0) + 1
+            self.assertEqual(aggregates.group_by(names), expected)
+
+        rows = aggregates.rows(('vehicle', 'missionType'))
+        self.assertEqual(sum(row['count'] for row in rows), 40)
+        self.assertEqual(set(rows[0]), {'vehicle', 'missionType', 'count'})
+        self.assertEqual(aggregates.count('vehicle', 'Unknown'), 0)
+
+
+class ColumnarSnapshot(Snapshot):
+    filter_fields = {'vehicle': 'vehicle'}
+    date_field = 'launchDate'
+    sort_fields = {'title': lambda record: record.get('title')}
+    columnar = True
+
+
+class ColumnarRecordsTests(SimpleTestCase):
+    def records(self):
+        records = [launch_payload(index) for index in range(12)]
+        records[1] = dict(records[1], vehicle='Falcon Heavy', isLive=True, id=1.5)
+        records[2] = {key: value for key, value in records[2].items() if key != 'subtitle'}
+        records[3] = dict(records[3], subtitle=0, correlationId=-0.0, quickDetail=['a', {'b': None, 'c': [1, 1.0, True, 0.0, -0.0]}])
+        records[4] = dict(reversed(list(records[4].items())))
+        return records
+
+    def test_records_round_trip_exactly(self):
+        records = self.records()
+        columnar = ColumnarRecords(copy.deepcopy(records))
+
+        self.assertEqual(len(columnar), 12)
+        for original, materialized in zip(records, columnar):
+            self.assertEqual(materialized, original)
+            self.assertEqual(list(materialized), list(original))
+            self.assertEqual(repr(materialized), repr(original))
+        self.assertEqual(columnar[-1], records[-1])
+        self.assertEqual(columnar[1:3], records[1:3])
+
+    def test_items_that_are_not_dicts_are_kept_as_they_are(self):
+        records = [launch_payload(0), None, 'launch', ['a', {'b': 1}], 5, launch_payload(1)]
+        columnar = ColumnarRecords(copy.deepcopy(records))
+
+        self.assertEqual(list(columnar), records)
+        self.assertEqual(columnar.get(0, 'title'), records[0]['title'])
+        self.assertIsNone(columnar.get(1, 'title'))
+        self.assertEqual(columnar.get(3, 'title', 'none'), 'none')
+        self.assertEqual(columnar.column('title'), [records[0]['title'], None, None, None, None, records[5]['title']])
+        self.assertEqual([row.get('title') for row in columnar.rows()], columnar.column('title'))
+
+    def test_repeated_values_are_shared(self):
+        columnar = ColumnarRecords([launch_payload(index) for index in range(12)])
+
+        self.assertEqual(columnar.columns['vehicle'].labels, ['Falcon 9'])
+        images = columnar.columns['imageDesktop'].items
+        self.assertIsInstance(images[0], CompactRecord)
+        self.assertIs(images[0].keys, images[1].keys)
+        mime = images[0].keys.index('mime')
+        self.assertIs(images[0].values[mime], images[1].values[mime])
+
+    def test_columns_and_rows_read_values_without_materializing(self):
+        records = self.records()
+        columnar = ColumnarRecords(records)
+
+        self.assertEqual(columnar.column('subtitle', 'absent')[:4], [None, None, 'absent', 0])
+        self.assertEqual(columnar.rows()[1].get('vehicle'), 'Falcon Heavy')
+        self.assertEqual(columnar.get(2, 'subtitle', 'absent'), 'absent')
+        self.assertEqual(columnar.column('missing'), [None] * 12)
+
+    def test_snapshot_materializes_only_the_records_read(self):
+        records = self.records()
+        snapshot = ColumnarSnapshot(copy.deepcopy(records))
+
+        self.assertEqual(snapshot.version, Snapshot(records).version)
+        self.assertEqual(snapshot.last_modified, Snapshot(records).last_modified)
+        with mock.patch.object(ColumnarRecords, '__getitem__', autospec=True, side_effect=ColumnarRecords.__getitem__) as getitem:
+            selection = snapshot.select(filters={'vehicle': {'falcon 9'}}, order=(('title', True),))
+            page = snapshot.project(selection[:3], Projection())
+            self.assertEqual(getitem.call_count, 3)
+
+        self.assertEqual(len(selection), 11)
+        self.assertEqual(page, [records[9], records[8], records[7]])
+        self.assertEqual(selection.values('id')[:2], [9, 8])
+
+
+def encrypt_url(url, key):
+    """Encrypt ``url`` the way the registry expects, with the Fernet key derived from ``key``"""
+    fernet_key = base64.urlsafe_b64encode(hashlib.sha256(key.encode()).digest())
+    return Fernet(fernet_key).encrypt(url.encode()).decode()
+
+
+class EndpointRegistryTests(SimpleTestCase):
+    def fail_fast(self, enabled):
+        return override_settings(UPSTREAM=dict(settings.UPSTREAM, FAIL_FAST=enabled))
+
+    def test_urls_are_decrypted_at_registration(self):
+        endpoints = EndpointRegistry()
+        endpoints.register('launches', encrypt_url('https://api.example.com/launches/', settings.SECRET_KEY))
+
+        self.assertEqual(endpoints.get('launches'), 'https://api.example.com/launches')
+        self.assertEqual(endpoints.build_url('launches', 'crew11'), 'https://api.example.com/launches/crew11')
+
+    def test_wrong_key_stops_the_process_with_fail_fast(self):
+        endpoints = EndpointRegistry()
+        with self.fail_fast(True):
+            with self.assertRaises(ImproperlyConfigured):
+                endpoints.register('launches', encrypt_url('https://api.example.com/launches', 'another key'))
+            with self.assertRaises(ImproperlyConfigured):
+                endpoints.register('dragon', encrypt_url('ftp://api.example.com/dragon', settings.SECRET_KEY))
+
+    def test_wrong_key_degrades_to_unavailable_endpoint_without_fail_fast(self):
+        endpoints = EndpointRegistry()
+        endpoints.register('stats', encrypt_url('https://api.example.com/stats', settings.SECRET_KEY))
+        with self.fail_fast(False):
+            endpoints.register('launches', encrypt_url('https://api.example.com/launches', 'another key'))
+
+        self.assertEqual(endpoints.names(), ['launches', 'stats'])
+        with self.assertRaisesMessage(DecryptionError, 'Failed to decrypt API URL'):
+            endpoints.get('launches')
+        with self.assertRaisesMessage(DecryptionError, "'upcoming' is not registered"):
+            endpoints.get('upcoming')
+        self.assertEqual(endpoints.get('stats'), 'https://api.example.com/stats')
+
+    def test_payloads_are_built_by_the_registered_loader(self):
+        endpoints = EndpointRegistry()
+        endpoints.register('launches', encrypt_url('https://api.example.com/launches', settings.SECRET_KEY), load=len)
+        endpoints.register('stats', encrypt_url('https://api.example.com/stats', settings.SECRET_KEY))
+
+        self.assertEqual(endpoints.load('launches', ['a', 'b']), 2)
+        self.assertEqual(endpoints.load('stats', ['a', 'b']), ['a', 'b'])
+        endpoints.register('launches', encrypt_url('https://api.example.com/launches', settings.SECRET_KEY))
+        self.assertEqual(endpoints.load('launches', ['a', 'b']), ['a', 'b'])
+
+
+class TieredCacheTests(UpstreamTestCase):
+    def entry(self, data, ttl=60):
+        return CacheEntry.create(data, ttl)
+
+    def counters(self, cache, endpoint):
+        return cache.stats()['endpoints'][endpoint]
+
+    def test_local_hit_backend_hit_and_miss_are_counted(self):
+        worker = TieredCache(max_entries=8)
+        other_worker = TieredCache(max_entries=8)
+        worker.set('upstream:stats', self.entry({'launches': 1}), timeout=60)
+
+        self.assertEqual(worker.get('upstream:stats').data, {'launches': 1})
+        # Another process only finds the entry in the backend, then keeps it locally
+        self.assertEqual(other_worker.get('upstream:stats').data, {'launches': 1})
+        self.assertEqual(other_worker.get('upstream:stats').data, {'launches': 1})
+        self.assertIsNone(worker.get('upstream:dragon'))
+        worker.get('upstream:dragon', count=False)
+
+        self.assertEqual(self.counters(worker, 'stats'), {'local_hits': 1, 'backend_hits': 0, 'misses': 0, 'hit_ratio': 1.0})
+        self.assertEqual(self.counters(other_worker, 'stats'), {'local_hits': 1, 'backend_hits': 1, 'misses': 0, 'hit_ratio': 1.0})
+        self.assertEqual(self.counters(worker, 'dragon'), {'local_hits': 0, 'backend_hits': 0, 'misses': 1, 'hit_ratio': 0.0})
+
+    def test_newer_backend_entry_replaces_an_expired_local_one(self):
+        worker = TieredCache(max_entries=8)
+        other_worker = TieredCache(max_entries=8)
+        worker.set('upstream:upcoming', self.entry(['old'], ttl=-1), timeout=60)
+        other_worker.set('upstream:upcoming', self.entry(['new']), timeout=60)
+
+        self.assertEqual(worker.get('upstream:upcoming').data, ['new'])
+        self.assertEqual(self.counters(worker, 'upcoming')['backend_hits'], 1)
+
+    def test_expired_local_entry_only_reads_the_backend_stamp(self):
+        worker = TieredCache(max_entries=8)
+        worker.set('upstream:launches', self.entry(['old'], ttl=-1), timeout=60)
+
+        with mock.patch.object(worker.backend, 'get', wraps=worker.backend.get) as backend_get:
+            self.assertEqual(worker.get('upstream:launches').data, ['old'])
+            self.assertEqual(worker.get('upstream:launches', count=False).data, ['old'])
+
+        # The payload itself is never unpickled when the backend has nothing newer
+        self.assertEqual([call.args[0] for call in backend_get.call_args_list], ['upstream:launches:fetched_at'] * 2)
+
+    def test_async_expired_local_entry_only_reads_the_backend_stamp(self):
+        worker = TieredCache(max_entries=8)
+        worker.set('upstream:launches', self.entry(['old'], ttl=-1), timeout=60)
+
+        with mock.patch.object(worker.backend, 'aget', wraps=worker.backend.aget) as backend_aget:
+            self.assertEqual(asyncio.run(worker.aget('upstream:launches')).data, ['old'])
+
+        self.assertEqual([call.args[0] for call in backend_aget.call_args_list], ['upstream:launches:fetched_at'])
+
+    def test_expired_entry_without_newer_copy_is_returned_as_a_miss(self):
+        worker = TieredCache(max_entries=8)
+        worker.set('upstream:upcoming', self.entry(['old'], ttl=-1), timeout=60)
+
+        entry = worker.get('upstream:upcoming')
+
+        self.assertEqual(entry.data, ['old'])
+        self.assertFalse(entry.is_fresh())
+        self.assertEqual(self.counters(worker, 'upcoming')['misses'], 1)
+
+    def test_local_tier_evicts_least_recently_used(self):
+        worker = TieredCache(max_entries=2)
+        for name in ('a', 'b'):
+            worker.set(f'upstream:{name}', self.entry(name), timeout=60)
+        worker.get('upstream:a')
+        worker.set('upstream:c', self.entry('c'), timeout=60)
+
+        self.assertEqual(worker.stats()['local_entries'], 2)
+        # b was evicted locally and is read back from the backend
+        self.assertEqual(worker.get('upstream:b').data, 'b')
+        self.assertEqual(self.counters(worker, 'b')['backend_hits'], 1)
+        self.assertEqual(worker.get('upstream:c').data, 'c')
+        self.assertEqual(self.counters(worker, 'c')['local_hits'], 1)
+
+    def test_metrics_endpoint_reports_the_counters(self):
+        with FakeUpstream({'/upcoming': [{'id': 1}]}) as upstream:
+            with registry.override(upcoming=f"{upstream.url}/upcoming"):
+                fetch_json('upcoming', expected_type=list)
+                fetch_json('upcoming', expected_type=list)
+                response = self.client.get('/upstream/metrics/')
+
+        data = response.json()['data']
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['cache']['endpoints']['upcoming'], {'local_hits': 1, 'backend_hits': 0, 'misses': 1, 'hit_ratio': 0.5})
+        self.assertEqual(data['cache']['local_entries'], 1)
+        self.assertIn('upcoming', data['endpoints'])
+        self.assertEqual(set(data), {'cache', 'in_flight', 'compression', 'rendered', 'endpoints', 'refresh'})
+
+
+class StaleServingTests(UpstreamTestCase):
+    payload = {'glass.dgn_speed_f64': 7.5}
+
+    def seed(self, data, age, ttl=1):
+        """Cache ``data`` for the dragon endpoint as if it was fetched ``age`` seconds ago"""
+        fetched_at = time.time() - age
+        upstream_cache.set('upstream:dragon', CacheEntry(data, fetched_at, fetched_at + ttl), timeout=600)
+
+    def wait_for_refreshes(self, timeout=2):
+        deadline = time.monotonic() + timeout
+        while _refreshing and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertFalse(_refreshing)
+
+    @endpoint_options('dragon', TTL=1, STALE_WHILE_REVALIDATE=60, STALE_IF_ERROR=0)
+    def test_stale_response_has_stale_fields_and_age_header(self):
+        self.seed(self.payload, age=30)
+        with FakeUpstream({'/dragon': {'glass.dgn_speed_f64': 8.0}}) as upstream:
+            with registry.override(dragon=f"{upstream.url}/dragon"):
+                response = self.client.get('/dragon/')
+                self.wait_for_refreshes()
+
+        body = response.json()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(body['stale'])
+        self.assertEqual(body['stale_age'], 30)
+        self.assertEqual(response['Age'], '30')
+
+    @endpoint_options('dragon', TTL=1, STALE_WHILE_REVALIDATE=60, STALE_IF_ERROR=0)
+    def test_fresh_response_has_no_stale_fields(self):
+        with FakeUpstream({'/dragon': self.payload}) as upstream:
+            with registry.override(dragon=f"{upstream.url}/dragon"):
+                response = self.client.get('/dragon/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('stale', response.json())
+        self.assertFalse(response.has_header('Age'))
+
+    @endpoint_options('dragon', TTL=1, STALE_WHILE_REVALIDATE=60, STALE_IF_ERROR=0)
+    def test_one_background_refresh_per_key(self):
+        self.seed({'glass.dgn_speed_f64': 7.5}, age=30)
+        with FakeUpstream({'/dragon': {'glass.dgn_speed_f64': 8.0}}, delay=0.2) as upstream:
+            with registry.override(dragon=f"{upstream.url}/dragon"):
+                results = [fetch_json('dragon', expected_type=dict) for _ in range(5)]
+                self.wait_for_refreshes()
+                refreshed = fetch_json('dragon', expected_type=dict)
+
+        # Every caller got the stale payload right away while a single refresh ran
+        self.assertEqual(results, [{'glass.dgn_speed_f64': 7.5}] * 5)
+        self.assertEqual(upstream.requests, ['/dragon'])
+        self.assertEqual(refreshed, {'glass.dgn_speed_f64': 8.0})
+
+    @endpoint_options('dragon', TTL=1, STALE_WHILE_REVALIDATE=0, STALE_IF_ERROR=60)
+    def test_error_inside_stale_if_error_window_serves_stale_payload(self):
+        self.seed(self.payload, age=30)
+        with FailingUpstream({}) as upstream:
+            with registry.override(dragon=f"{upstream.url}/dragon"):
+                response = self.client.get('/dragon/')
+
+        body = response.json()
+        self.assertEqual(upstream.requests, ['/dragon'])
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(body['success'])
+        self.assertTrue(body['stale'])
+        self.assertEqual(body['stale_age'], 30)
+        self.assertEqual(response['Age'], '30')
+
+    @endpoint_options('dragon', TTL=1, STALE_WHILE_REVALIDATE=0, STALE_IF_ERROR=60)
+    def test_error_past_stale_if_error_window_returns_the_error(self):
+        self.seed(self.payload, age=120)
+        with FailingUpstream({}) as upstream:
+            with registry.override(dragon=f"{upstream.url}/dragon"):
+                response = self.client.get('/dragon/')
+                with self.assertRaises(APIError):
+                    fetch_json('dragon', expected_type=dict)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(response.json()['success'])
+        self.assertNotIn('stale', response.json())
+        self.assertFalse(response.has_header('Age'))
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class FixedRandom:
+    """Random source whose ``uniform`` always lands at ``fraction`` of the range"""
+
+    def __init__(self, fraction=0.5):
+        self.fraction = fraction
+        self.calls = []
+
+    def uniform(self, low, high):
+        self.calls.append((low, high))
+        return low + (high - low) * self.fraction
+
+
+class RefreshJobTests(SimpleTestCase):
+    def job(self, func=lambda: None, fraction=0.5, **kwargs):
+        self.clock = FakeClock()
+        self.rng = FixedRandom(fraction)
+        return RefreshJob('stats', func, interval=100, clock=self.clock, rng=self.rng, **kwargs)
+
+    def failing(self):
+        raise APIError('upstream down')
+
+    def test_next_run_is_the_interval_randomized_by_the_jitter(self):
+        for fraction, delay in ((0, 90), (0.5, 100), (1, 110)):
+            job = self.job(fraction=fraction, jitter=0.1)
+            job.run()
+            self.assertAlmostEqual(job.next_run_at - self.clock.now, delay)
+            self.assertEqual(self.rng.calls, [(0.9, 1.1)])
+
+    def test_job_is_due_once_the_delay_has_passed(self):
+        job = self.job()
+        self.assertTrue(job.is_due(self.clock.now))
+        job.run()
+        self.assertFalse(job.is_due(self.clock.now + 99))
+        self.assertTrue(job.is_due(self.clock.now + 100))
+        self.assertEqual(job.report()['next_run_in'], 100.0)
+
+    def test_failures_back_off_exponentially_up_to_the_maximum(self):
+        job = self.job(func=self.failing, max_backoff=500)
+        delays = []
+        for _ in range(4):
+            job.run()
+            delays.append(job.next_run_at - self.clock.now)
+
+        self.assertEqual(delays, [200, 400, 500, 500])
+        self.assertEqual(job.consecutive_failures, 4)
+        self.assertEqual(job.last_error, 'upstream down')
+        self.assertIsNone(job.last_success_at)
+
+    def test_success_resets_the_backoff(self):
+        outcomes = [self.failing, self.failing, lambda: None]
+        job = self.job(func=lambda: outcomes.pop(0)())
+        job.run()
+        job.run()
+        self.clock.advance(5)
+        job.run()
+
+        self.assertEqual(job.next_run_at - self.clock.now, 100)
+        self.assertEqual(job.consecutive_failures, 0)
+        self.assertIsNone(job.last_error)
+        self.assertEqual(job.last_success_at, self.clock.now)
+        self.assertEqual(job.runs, 3)
+
+    def test_last_duration_uses_the_clock(self):
+        job = self.job(func=lambda: self.clock.advance(2.5))
+        job.run()
+
+        self.assertEqual(job.last_duration, 2.5)
+        self.assertEqual(job.last_run_at, 1000.0)
+        self.assertEqual(job.next_run_at, 1102.5)
+
+
+class RefreshSchedulerTests(SimpleTestCase):
+    def test_run_pending_runs_only_due_jobs(self):
+        clock = FakeClock()
+        scheduler = RefreshScheduler(clock=clock, rng=FixedRandom())
+        calls = []
+        scheduler.register('stats', lambda: calls.append('stats'), interval=10)
+        scheduler.register('dragon', lambda: calls.append('dragon'), interval=30)
+
+        scheduler.run_pending()
+        clock.advance(10)
+        scheduler.run_pending()
+        scheduler.run_pending(names={'dragon'})
+        clock.advance(20)
+        ran = scheduler.run_pending()
+
+        self.assertEqual(calls, ['stats', 'dragon', 'stats', 'stats', 'dragon'])
+        self.assertEqual([job.name for job in ran], ['stats', 'dragon'])
+
+    def test_in_process_refresh_starts_from_the_server_entry_points_only(self):
+        upstream = dict(settings.UPSTREAM, REFRESH_IN_PROCESS=True)
+        with override_settings(UPSTREAM=upstream), mock.patch.object(refresh_scheduler, 'start') as start:
+            apps.get_app_config('upstream').ready()
+            start.assert_not_called()
+
+            for module in ('SpaceX.wsgi', 'SpaceX.asgi'):
+                with mock.patch.dict(sys.modules):
+                    sys.modules.pop(module, None)
+                    importlib.import_module(module)
+            self.assertEqual(start.call_count, 2)
+
+    def test_interval_defaults_to_the_endpoint_options(self):
+        scheduler = RefreshScheduler()
+        with endpoint_options('stats', TTL=50):
+            scheduler.register('stats', lambda: None)
+        with endpoint_options('dragon', REFRESH_INTERVAL=7):
+            scheduler.register('dragon_store', lambda: None, endpoint='dragon')
+
+        self.assertEqual(scheduler.jobs['stats'].interval, 40)
+        self.assertEqual(scheduler.jobs['dragon_store'].interval, 7)
+
+
+class RefreshUpstreamCommandTests(SimpleTestCase):
+    def call(self, *args):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        call_command('refresh_upstream', *args, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def jobs(self, **funcs):
+        clock = FakeClock()
+        return {name: RefreshJob(name, func, interval=60, clock=clock, rng=FixedRandom()) for name, func in funcs.items()}
+
+    def test_once_runs_the_selected_jobs_and_reports_them(self):
+        calls = []
+        jobs = self.jobs(stats=lambda: calls.append('stats'), dragon=lambda: calls.append('dragon'))
+        with mock.patch.object(refresh_scheduler, 'jobs', jobs):
+            stdout, stderr = self.call('stats', '--once')
+
+        self.assertEqual(calls, ['stats'])
+        self.assertIn('stats: 0.000s, last success 1970-01-01T00:16:40+00:00, next run in 60.0s', stdout)
+        self.assertEqual(stderr, '')
+
+    def test_failed_job_is_reported_and_fails_the_command(self):
+        def fail():
+            raise APIError('upstream down')
+
+        with mock.patch.object(refresh_scheduler, 'jobs', self.jobs(stats=lambda: None, dragon=fail)):
+            stdout = io.StringIO()
+            stderr = io.StringIO()
+            with self.assertRaisesMessage(CommandError, 'Some refresh jobs failed.'):
+                call_command('refresh_upstream', '--once', stdout=stdout, stderr=stderr)
+
+        self.assertIn('stats:', stdout.getvalue())
+        self.assertIn('dragon: 0.000s, last success None, next run in 120.0s - failed: upstream down', stderr.getvalue())
+
+    def test_unknown_jobs_are_rejected(self):
+        with mock.patch.object(refresh_scheduler, 'jobs', self.jobs(stats=lambda: None)):
+            with self.assertRaisesMessage(CommandError, 'Unknown refresh jobs: nope'):
+                self.call('nope', '--once')
+
+
+class AsyncWhiteNoiseMiddlewareTests(SimpleTestCase):
+    def call(self, path):
+        async def view(request):
+            return HttpResponse('view')
+
+        middleware = WhiteNoiseMiddleware(view)
+        self.assertTrue(middleware.autorefresh)
+        return asyncio.run(middleware(AsyncRequestFactory().get(path)))
+
+    def test_other_urls_skip_the_static_file_lookup(self):
+        with mock.patch.object(WhiteNoiseMiddleware, 'find_file') as find_file:
+            response = self.call('/launches/')
+
+        find_file.assert_not_called()
+        self.assertEqual(response.content, b'view')
+
+    def test_static_urls_are_looked_up_outside_the_thread_sensitive_executor(self):
+        with mock.patch.object(WhiteNoiseMiddleware, 'find_file', return_value=None) as find_file, \
+                mock.patch('apps.upstream.middleware.sync_to_async', wraps=sync_to_async) as wrapper:
+            response = self.call('/static/missing.css')
+
+        find_file.assert_called_once_with('/static/missing.css')
+        self.assertEqual(wrapper.call_args.kwargs, {'thread_sensitive': False})
+        self.assertEqual(response.content, b'view')
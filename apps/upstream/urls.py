@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+app_name = 'upstream'
+
+urlpatterns = [
+    path('metrics/', views.UpstreamMetricsAPIView.as_view(), name='upstream-metrics'),
+]
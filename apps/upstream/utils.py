@@ -0,0 +1,309 @@
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+from .async_client import async_client
+from .cache import CacheEntry, cache_key, upstream_cache
+from .client import client, get_endpoint_options
+from .exceptions import APIError, NotFoundError
+from .registry import registry
+from .resilience import guards
+from .singleflight import upstream_flight
+
+logger = logging.getLogger(__name__)
+
+# Ages (in seconds) of the stale payloads served during the current request.
+# None outside of ``track_staleness()``.
+_stale_ages = ContextVar('upstream_stale_ages', default=None)
+
+# Versions of the payloads served during the current request, by cache key.
+# None outside of ``track_versions()``.
+_versions = ContextVar('upstream_versions', default=None)
+
+# Outcomes of the async prefetches made for the current request, by cache
+# key. None outside of ``prefetching()``.
+_prefetched = ContextVar('upstream_prefetched', default=None)
+
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+@contextmanager
+def track_staleness():
+    """
+    Collect the ages of stale payloads served inside the block.
+
+    Yields the list that ``fetch_json`` appends to, so views can tell the
+    client that (part of) the response came from an expired cache entry.
+    Nested blocks share the outermost list.
+    """
+    ages = _stale_ages.get()
+    if ages is not None:
+        yield ages
+        return
+
+    ages = []
+    token = _stale_ages.set(ages)
+    try:
+        yield ages
+    finally:
+        _stale_ages.reset(token)
+
+
+@contextmanager
+def track_versions():
+    """
+    Collect the versions of the payloads served inside the block.
+
+    Yields a dict of cache key -> payload version (a digest of the upstream
+    body, None when unknown) that ``fetch_json`` fills in, so views can tell
+    which version of the data a response was built from. Nested blocks
+    share the outermost dict.
+    """
+    versions = _versions.get()
+    if versions is not None:
+        yield versions
+        return
+
+    versions = {}
+    token = _versions.set(versions)
+    try:
+        yield versions
+    finally:
+        _versions.reset(token)
+
+
+@contextmanager
+def prefetching():
+    """
+    Remember the outcome of every ``afetch_json`` call made inside the block.
+
+    A later ``fetch_json`` for the same key inside the block returns the
+    prefetched payload (or re-raises the prefetched error) without any I/O.
+    This lets the async views fetch concurrently on the event loop and
+    then run the unchanged sync view code.
+    """
+    token = _prefetched.set({})
+    try:
+        yield
+    finally:
+        _prefetched.reset(token)
+
+
+def _mark_served(key, entry):
+    versions = _versions.get()
+    if versions is not None:
+        versions[key] = entry.version
+    return entry.data
+
+
+def _mark_stale(entry):
+    ages = _stale_ages.get()
+    if ages is not None:
+        ages.append(entry.age())
+
+
+def _cache_timeout(options):
+    """How long the backend tier keeps an entry: TTL plus the stale windows"""
+    return options['TTL'] + max(options['STALE_WHILE_REVALIDATE'], options['STALE_IF_ERROR'])
+
+
+def _build_entry(endpoint, previous, response, options):
+    """
+    Turn an upstream response into a cache entry (reusing ``previous`` on
+    304), its payload built by the endpoint's registered loader.
+    """
+    if response.not_modified:
+        return previous.revalidated(options['TTL'], response.etag, response.last_modified)
+    data = registry.load(endpoint, response.data)
+    return CacheEntry.create(data, options['TTL'], response.etag, response.last_modified, response.digest)
+
+
+def _validators(entry):
+    if entry is None:
+        return {'etag': None, 'last_modified': None}
+    return {'etag': entry.etag, 'last_modified': entry.last_modified}
+
+
+def _fetch_and_store(endpoint, path, label, expected_type):
+    """
+    Fetch an endpoint, cache the payload and return its cache entry.
+
+    When the cached entry has upstream validators the request is
+    conditional, and a 304 only extends the entry's freshness without
+    downloading or parsing the body again. Concurrent calls for the same key
+    are coalesced, so only one upstream request per key is in flight in
+    this process at any time. The request goes through the endpoint's
+    circuit breaker and bulkhead.
+    """
+    key = cache_key(endpoint, path)
+
+    def fetch():
+        options = get_endpoint_options(endpoint)
+        previous = upstream_cache.get(key, count=False)
+        response = guards.call(endpoint, lambda: client.fetch(
+            endpoint, path, label=label, expected_type=expected_type, **_validators(previous)
+        ))
+        entry = _build_entry(endpoint, previous, response, options)
+        # Drop the decoded payload (the entry keeps what the loader built) before the entry is pickled
+        del response
+        upstream_cache.set(key, entry, timeout=_cache_timeout(options))
+        return entry
+
+    return upstream_flight.do(key, fetch)
+
+
+async def _afetch_and_store(endpoint, path, label, expected_type):
+    """Async version of ``_fetch_and_store``"""
+    key = cache_key(endpoint, path)
+
+    async def fetch():
+        options = get_endpoint_options(endpoint)
+        previous = await upstream_cache.aget(key, count=False)
+        response = await guards.acall(endpoint, lambda: async_client.fetch(
+            endpoint, path, label=label, expected_type=expected_type, **_validators(previous)
+        ))
+        entry = _build_entry(endpoint, previous, response, options)
+        # Drop the decoded payload (the entry keeps what the loader built) before the entry is pickled
+        del response
+        await upstream_cache.aset(key, entry, timeout=_cache_timeout(options))
+        return entry
+
+    return await upstream_flight.ado(key, fetch)
+
+
+def _refresh_in_background(endpoint, path, label, expected_type):
+    """Start one background refresh per key; no-op if one is already running"""
+    key = cache_key(endpoint, path)
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    def refresh():
+        try:
+            _fetch_and_store(endpoint, path, label, expected_type)
+        except Exception as e:
+            logger.warning(f"Background refresh of {label} failed: {str(e)}")
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(key)
+
+    threading.Thread(target=refresh, name=f"upstream-refresh-{key}", daemon=True).start()
+
+
+def fetch_json(endpoint, path=None, label='data', expected_type=None, refresh=False):
+    """
+    Return the JSON payload of an upstream endpoint, using the cache. For
+    endpoints registered with a loader this is what the loader built from it.
+
+    With ``refresh`` the cache is bypassed and the endpoint is fetched and
+    re-cached unconditionally (used by the refresh scheduler).
+
+    - A fresh cached payload is returned as is.
+    - An expired payload still inside the endpoint's STALE_WHILE_REVALIDATE
+      window is returned right away while one background refresh runs.
+    - Otherwise the endpoint is fetched through the pooled client. If that
+      fails with an APIError other than NotFoundError and the last good
+      payload is inside the STALE_IF_ERROR window, that payload is served.
+
+    Stale payloads are reported through ``track_staleness()`` and the
+    version of every payload served through ``track_versions()``. Upstream
+    errors are never cached.
+    """
+    key = cache_key(endpoint, path)
+    if refresh:
+        return _mark_served(key, _fetch_and_store(endpoint, path, label, expected_type))
+
+    prefetched = _prefetched.get()
+    if prefetched is not None and key in prefetched:
+        entry, error = prefetched[key]
+        if error is not None:
+            raise error
+        return _mark_served(key, entry)
+
+    options = get_endpoint_options(endpoint)
+    entry = upstream_cache.get(key)
+    if entry is not None and entry.is_fresh():
+        return _mark_served(key, entry)
+
+    if _can_revalidate_in_background(entry, options):
+        _refresh_in_background(endpoint, path, label, expected_type)
+        _mark_stale(entry)
+        return _mark_served(key, entry)
+
+    try:
+        return _mark_served(key, _fetch_and_store(endpoint, path, label, expected_type))
+    except NotFoundError:
+        raise
+    except APIError as e:
+        if not _can_serve_after_error(entry, options):
+            raise
+        logger.warning(f"Serving stale {label} after upstream error: {str(e)}")
+        _mark_stale(entry)
+        return _mark_served(key, entry)
+
+
+async def afetch_json(endpoint, path=None, label='data', expected_type=None, refresh=False):
+    """
+    Async version of ``fetch_json`` using the async pooled client.
+
+    Inside ``prefetching()`` the outcome is also recorded for a later
+    ``fetch_json`` call with the same arguments.
+    """
+    key = cache_key(endpoint, path)
+    try:
+        entry = await _afetch_entry(endpoint, path, label, expected_type, refresh)
+    except Exception as e:
+        _record_prefetch(key, None, e)
+        raise
+    _record_prefetch(key, entry, None)
+    return _mark_served(key, entry)
+
+
+async def _afetch_entry(endpoint, path, label, expected_type, refresh):
+    if refresh:
+        return await _afetch_and_store(endpoint, path, label, expected_type)
+
+    options = get_endpoint_options(endpoint)
+    entry = await upstream_cache.aget(cache_key(endpoint, path))
+    if entry is not None and entry.is_fresh():
+        return entry
+
+    if _can_revalidate_in_background(entry, options):
+        _refresh_in_background(endpoint, path, label, expected_type)
+        _mark_stale(entry)
+        return entry
+
+    try:
+        return await _afetch_and_store(endpoint, path, label, expected_type)
+    except NotFoundError:
+        raise
+    except APIError as e:
+        if not _can_serve_after_error(entry, options):
+            raise
+        logger.warning(f"Serving stale {label} after upstream error: {str(e)}")
+        _mark_stale(entry)
+        return entry
+
+
+def _record_prefetch(key, entry, error):
+    prefetched = _prefetched.get()
+    if prefetched is not None:
+        prefetched[key] = (entry, error)
+
+
+def _can_revalidate_in_background(entry, options):
+    return entry is not None and entry.age() < options['TTL'] + options['STALE_WHILE_REVALIDATE']
+
+
+def _can_serve_after_error(entry, options):
+    return entry is not None and entry.age() < options['TTL'] + options['STALE_IF_ERROR']
+
+
+def serve_from_store():
+    """Whether list views read from the local store (``SERVE_FROM_STORE``) instead of the upstream cache"""
+    return getattr(settings, 'SERVE_FROM_STORE', False)
@@ -0,0 +1,76 @@
+import threading
+from collections import OrderedDict
+
+from .conditional import content_version
+from .schema import CompiledSerializer
+
+
+def record_key(record):
+    """
+    Return the key identifying one version of an upstream record: its
+    ``documentId`` plus its ``updatedAt``, or a hash of its content when it
+    has no ``updatedAt``.
+    """
+    document_id = record.get('documentId')
+    updated_at = record.get('updatedAt')
+    if document_id is not None and isinstance(updated_at, str) and updated_at:
+        return (document_id, updated_at)
+    return (document_id, content_version(record))
+
+
+class MemoizedValidator:
+    """
+    Validates upstream records with a serializer (through its compiled
+    checks), once per record version.
+
+    Results (validated data, or the serializer errors) are kept in a bounded
+    LRU keyed by ``record_key``, so records that have not changed since an
+    earlier request or snapshot are not validated again. Results are shared
+    and must be treated as read-only.
+    """
+
+    def __init__(self, serializer_class, max_entries=4096):
+        self.schema = CompiledSerializer(serializer_class)
+        self.max_entries = max_entries
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def validate(self, record):
+        """Return (validated data, None) for a valid record, or (None, errors)"""
+        if not isinstance(record, dict):
+            return self.schema.validate(record)
+
+        key = record_key(record)
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return result
+            self.misses += 1
+
+        result = self.schema.validate(record)
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._results),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+            }
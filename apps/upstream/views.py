@@ -0,0 +1,181 @@
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.functional import classproperty
+from django.utils.http import http_date
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from .cache import rendered_responses, upstream_cache
+from .compression import response_compressor
+from .conditional import make_etag
+from .resilience import guards
+from .scheduler import refresh_scheduler
+from .singleflight import upstream_flight
+from .utils import prefetching, track_staleness, track_versions
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class RenderedResponse(HttpResponse):
+    """A response served from the rendered bytes of an earlier one; ``data`` is that response's data"""
+    
+    def __init__(self, content, content_type, data):
+        super().__init__(content, content_type=content_type)
+        self.data = data
+
+
+class UpstreamAPIView(APIView):
+    """
+    Base view for endpoints that serve upstream SpaceX data.
+
+    When any payload used for a successful response came from an expired
+    cache entry, the response is marked with ``stale: true`` and the age in
+    seconds of the oldest such payload.
+    
+    Handlers can call ``get_cached_response()`` once their data is loaded to
+    answer conditional requests with 304, and to skip serialization and
+    rendering when the same URL was already rendered from the same version
+    of the data.
+    """
+    
+    def dispatch(self, request, *args, **kwargs):
+        self.render_key = None
+        self.validators = None
+        with track_staleness() as self.stale_ages, track_versions() as self.data_versions:
+            return super().dispatch(request, *args, **kwargs)
+    
+    def data_version(self):
+        """Version of the upstream payloads loaded so far for this request, or None when unknown"""
+        versions = getattr(self, 'data_versions', None)
+        if not versions or None in versions.values():
+            return None
+        return ','.join(f"{key}={version}" for key, version in sorted(versions.items()))
+    
+    def get_cached_response(self, request, version=None, last_modified=None):
+        """
+        Return a response for this request that needs no serialization, or None.
+        
+        Responses built from a known ``version`` of the data (by default
+        ``data_version()``) get a strong ETag for that version and the URL
+        (query included), plus a Last-Modified from ``last_modified``, a
+        POSIX timestamp. Clients whose If-None-Match or If-Modified-Since
+        match get a 304. Otherwise this returns the response rendered earlier
+        for the same URL and version, and on a miss the successful response
+        of this request is rendered into the cache. Stale data and non-JSON
+        renderings get neither validators nor caching.
+        """
+        version = version or self.data_version()
+        if version is None or self.stale_ages or getattr(request.accepted_renderer, 'format', None) != 'json':
+            return None
+        
+        key = (
+            request.build_absolute_uri(request.path),
+            tuple(sorted((name, tuple(values)) for name, values in request.GET.lists())),
+            request.accepted_media_type,
+            version,
+        )
+        
+        # Answer conditional requests before any serialization
+        self.validators = (make_etag(*key), last_modified)
+        not_modified = get_conditional_response(request, etag=self.validators[0], last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+        
+        cached = rendered_responses.get(key)
+        if cached is not None:
+            return RenderedResponse(*cached)
+        self.render_key = key
+        return None
+    
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        
+        stale_ages = getattr(self, 'stale_ages', None)
+        if stale_ages and isinstance(getattr(response, 'data', None), dict) and response.data.get('success'):
+            age = int(max(stale_ages))
+            response.data['stale'] = True
+            response.data['stale_age'] = age
+            response['Age'] = str(age)
+        
+        validators = getattr(self, 'validators', None)
+        if validators is not None and not stale_ages and response.status_code in (200, 304):
+            etag, last_modified = validators
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        
+        key = getattr(self, 'render_key', None)
+        if key is not None and not stale_ages and isinstance(response, Response) and response.status_code == 200:
+            data = response.data
+            response.add_post_render_callback(
+                lambda rendered: rendered_responses.set(key, (rendered.content, rendered['Content-Type'], data), len(rendered.content))
+            )
+        
+        return response
+
+
+class AsyncUpstreamAPIView(UpstreamAPIView):
+    """
+    Async variant of UpstreamAPIView for ASGI deployments.
+    
+    Subclasses implement ``prefetch()`` to load their upstream payloads with
+    the async client, so the upstream round-trip does not hold a thread. The
+    inherited sync handler then runs in a worker thread and gets those
+    payloads (or errors) without any I/O. Response envelopes and error
+    mapping are therefore exactly those of the sync view.
+    """
+    
+    # Handlers that read from the database run on the thread-sensitive
+    # executor, which Django's per-thread connections require
+    uses_database = False
+    
+    @classproperty
+    def view_is_async(cls):
+        return True
+    
+    async def prefetch(self, request, *args, **kwargs):
+        """Fetch the upstream payloads the handler will need"""
+        pass
+    
+    async def dispatch(self, request, *args, **kwargs):
+        with track_staleness(), track_versions(), prefetching():
+            try:
+                await self.prefetch(request, *args, **kwargs)
+            except Exception as e:
+                # Recorded by prefetching(); the handler re-raises it through its own error mapping
+                logger.debug(f"Prefetch failed in {type(self).__name__}: {str(e)}")
+            # Otherwise the handler only does CPU work on prefetched data, so it
+            # need not queue behind the single thread-sensitive executor
+            dispatch = sync_to_async(super().dispatch, thread_sensitive=self.uses_database)
+            return await dispatch(request, *args, **kwargs)
+
+
+class UpstreamMetricsAPIView(APIView):
+    """
+    API view exposing upstream cache counters and refresh job status.
+    """
+    
+    def get(self, request):
+        """
+        GET /upstream/metrics/
+        Returns upstream cache statistics, circuit breaker and bulkhead state
+        per endpoint, rendered response and compression cache statistics and
+        the state of the in-process refresh jobs.
+        """
+        return Response({
+            'success': True,
+            'message': 'Upstream metrics retrieved successfully',
+            'data': {
+                'cache': upstream_cache.stats(),
+                'in_flight': upstream_flight.in_flight(),
+                'compression': response_compressor.stats(),
+                'rendered': rendered_responses.stats(),
+                'endpoints': guards.report(),
+                'refresh': {
+                    'in_process': refresh_scheduler.is_running(),
+                    'jobs': refresh_scheduler.report(),
+                },
+            }
+        }, status=status.HTTP_200_OK)
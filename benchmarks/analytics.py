@@ -0,0 +1,64 @@
+"""
+Measure the cost of the launch analytics as the launch history grows.
+
+For synthetic launches lists of each size, times:
+
+- the launch timestamps of a snapshot (shared with sorting by launch date);
+- building the NumPy arrays from them;
+- computing the analytics from the arrays;
+- ``launch_analytics`` on a snapshot that already computed them.
+
+Run from the repository root:
+
+    SECRET_KEY=x UPSTREAM_FAIL_FAST=0 python -m benchmarks.analytics --launches 10000,50000
+"""
+import argparse
+import os
+import statistics
+import time
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'SpaceX.settings')
+
+import django
+
+django.setup()
+
+from apps.launches.analytics import LaunchArrays, launch_analytics
+from apps.launches.utils import LaunchSnapshot
+
+from .sort_launches import synthetic_launches
+
+
+def measure(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--launches', default='10000,50000', help='comma-separated list sizes')
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"median of {args.repeat} runs")
+    print(f"  {'launches':>8} {'timestamps':>11} {'arrays':>8} {'analytics':>10} {'memoized':>9}")
+    for count in (int(value) for value in args.launches.split(',')):
+        launches = synthetic_launches(count)
+        snapshot = LaunchSnapshot(launches)
+        timestamps = snapshot.sort_keys('launchDate')
+        arrays = LaunchArrays(launches, timestamps)
+        launch_analytics(snapshot)
+
+        parse = measure(lambda: [LaunchSnapshot.sort_fields['launchDate'](row) for row in snapshot.rows()], args.repeat)
+        build = measure(lambda: LaunchArrays(launches, timestamps), args.repeat)
+        compute = measure(arrays.analytics, args.repeat)
+        memoized = measure(lambda: launch_analytics(snapshot), args.repeat)
+        print(f"  {count:>8} {parse:11.2f} {build:8.2f} {compute:10.2f} {memoized:9.4f} ms")
+
+
+if __name__ == '__main__':
+    main()
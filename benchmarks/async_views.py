@@ -0,0 +1,125 @@
+"""
+Compare the sync and async launch detail views under concurrent load.
+
+Both views are served against a local fake upstream that answers after a
+fixed delay. Every request asks for a different launch, so each one misses
+the cache and pays the full upstream round-trip. The sync view runs on a
+fixed pool of worker threads, as in a threaded WSGI deployment, so it holds
+a thread per in-flight request; the async view runs as coroutines on a
+single event loop, as under ASGI.
+
+Run from the repository root:
+
+    SECRET_KEY=x UPSTREAM_FAIL_FAST=0 python -m benchmarks.async_views --requests 1000 --concurrency 200 --threads 32 --delay 0.5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'SpaceX.settings')
+
+import django
+
+django.setup()
+
+from django.test import AsyncClient, Client, override_settings
+from django.test.utils import setup_test_environment
+from django.urls import path
+
+from apps.launches.views import AsyncLaunchDetailAPIView, LaunchDetailAPIView
+from apps.upstream.cache import upstream_cache
+from apps.upstream.registry import registry
+from apps.upstream.testing import FakeUpstream
+
+# Used as ROOT_URLCONF while the benchmark runs
+urlpatterns = [
+    path('sync/<str:link>/', LaunchDetailAPIView.as_view()),
+    path('async/<str:link>/', AsyncLaunchDetailAPIView.as_view()),
+]
+
+DETAIL = {
+    'id': 1,
+    'documentId': 'benchmark',
+    'title': 'Benchmark Mission',
+    'callToAction': 'Watch',
+    'missionStatus': 'complete',
+    'followDragonEnabled': False,
+    'returnFromIssEnabled': False,
+    'toTheIssEnabled': False,
+}
+
+
+class DetailUpstream(FakeUpstream):
+    """Fake upstream that answers every launch detail path"""
+
+    def handle(self, request):
+        self.send(request, 200, dict(DETAIL, title=request.path.rsplit('/', 1)[-1]))
+
+
+def run_sync(requests, threads):
+    client = Client()
+
+    def call(index):
+        started = time.perf_counter()
+        response = client.get(f'/sync/sync-{index}/')
+        assert response.status_code == 200, response.content
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = list(pool.map(call, range(requests)))
+    return time.perf_counter() - started, latencies
+
+
+async def run_async(requests, concurrency):
+    client = AsyncClient()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call(index):
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.get(f'/async/async-{index}/')
+            assert response.status_code == 200, response.content
+            return time.perf_counter() - started
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*[call(index) for index in range(requests)])
+    return time.perf_counter() - started, latencies
+
+
+def report(name, elapsed, latencies):
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f"{name:<6} {len(latencies) / elapsed:8.1f} req/s   "
+        f"p50 {statistics.median(latencies) * 1000:7.1f} ms   p99 {p99 * 1000:7.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=200, help='in-flight requests for the async view')
+    parser.add_argument('--threads', type=int, default=32, help='worker threads for the sync view')
+    parser.add_argument('--delay', type=float, default=0.5, help='upstream latency in seconds')
+    args = parser.parse_args()
+
+    setup_test_environment()
+    with DetailUpstream({}, delay=args.delay) as upstream, \
+            registry.override(launch_detail=f"{upstream.url}/detail"), \
+            override_settings(ROOT_URLCONF=__name__):
+        print(
+            f"{args.requests} requests, {args.threads} sync threads, {args.concurrency} async in flight, "
+            f"upstream delay {args.delay * 1000:.0f} ms"
+        )
+        upstream_cache.clear()
+        report('sync', *run_sync(args.requests, args.threads))
+        upstream_cache.clear()
+        report('async', *asyncio.run(run_async(args.requests, args.concurrency)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+Measure the time to serve each JSON endpoint with the stock DRF renderer,
+with the orjson renderer, and from the rendered-response cache.
+
+Every endpoint is served from a warm upstream cache backed by a local fake
+upstream with synthetic payloads, so the timings cover the view,
+serialization and rendering only. Responses are requested without
+``Accept-Encoding``, so compression is not included.
+
+Run from the repository root:
+
+    SECRET_KEY=x UPSTREAM_FAIL_FAST=0 python -m benchmarks.rendering --launches 500 --requests 50
+"""
+import argparse
+import os
+import statistics
+import time
+from unittest import mock
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'SpaceX.settings')
+
+import django
+
+django.setup()
+
+from django.test import Client
+from django.test.utils import setup_test_environment
+from rest_framework.renderers import JSONRenderer
+from rest_framework.views import APIView
+
+from apps.upstream.cache import rendered_responses, upstream_cache
+from apps.upstream.registry import registry
+from apps.upstream.testing import FakeUpstream
+
+ENDPOINTS = [
+    ('launches', '/launches/?page_size=100'),
+    ('launches (fields)', '/launches/?page_size=100&fields=title,link,launchDate,vehicle,missionStatus'),
+    ('upcoming', '/upcoming/?page_size=100'),
+    ('launch detail', '/launches/mission-1/'),
+    ('stats', '/stats/'),
+    ('dragon', '/dragon/'),
+]
+
+
+def image(index):
+    def image_format(name, width):
+        return {
+            'ext': '.jpg', 'url': f'https://cdn.example.com/{name}_{index}.jpg', 'hash': f'{name}_{index}',
+            'mime': 'image/jpeg', 'name': f'{name}_{index}.jpg', 'path': None, 'size': 120.5,
+            'width': width, 'height': width // 2, 'sizeInBytes': 120500,
+        }
+
+    return {
+        'id': index, 'name': f'image-{index}.jpg', 'alternativeText': None, 'caption': None,
+        'width': 1920, 'height': 1080, 'hash': f'image_{index}', 'ext': '.jpg', 'mime': 'image/jpeg',
+        'size': 350.2, 'url': f'https://cdn.example.com/image_{index}.jpg', 'previewUrl': None,
+        'provider': 'aws-s3', 'provider_metadata': None, 'folderPath': '/',
+        'createdAt': '2025-01-01T00:00:00.000Z', 'updatedAt': '2025-01-01T00:00:00.000Z',
+        'documentId': f'image-{index}', 'locale': None, 'publishedAt': '2025-01-01T00:00:00.000Z',
+        'formats': {name: image_format(name, width) for name, width in
+                    (('large', 1000), ('small', 500), ('medium', 750), ('thumbnail', 245))},
+    }
+
+
+def launch(index):
+    return {
+        'id': index, 'documentId': f'doc-{index}', 'correlationId': None, 'endDate': None, 'endTime': None,
+        'title': f'Mission {index}', 'subtitle': None, 'quickDetail': None, 'link': f'mission-{index}',
+        'youtubeVideoId': None, 'streamingVideoType': None, 'callToAction': 'WATCH',
+        'missionStatus': 'complete', 'vehicle': 'Falcon 9', 'returnSite': None, 'launchSite': 'SLC-40',
+        'isOngoing': False, 'launchDate': f'2024-{index % 12 + 1:02d}-{index % 28 + 1:02d}',
+        'launchTime': '12:00:00', 'missionType': 'starlink', 'directToCell': False, 'isLive': False,
+        'returnDateTime': None, 'showLaunchTimeInsteadOfWindow': 'false',
+        'imageDesktop': image(index), 'imageMobile': image(index + 1),
+        'ongoingMissionImageDesktop': None, 'ongoingMissionImageMobile': None,
+        'videoDesktop': None, 'videoMobile': None, 'updatedAt': '2025-01-01T00:00:00.000Z',
+    }
+
+
+def payloads(count):
+    detail = {
+        'id': 1, 'documentId': 'doc-1', 'title': 'Mission 1', 'callToAction': 'WATCH',
+        'missionStatus': 'complete', 'followDragonEnabled': False, 'returnFromIssEnabled': False,
+        'toTheIssEnabled': False, 'videoDesktop': None, 'videoMobile': None,
+        'timeline': {'id': 1, 'timelineEntries': [
+            {'id': i, 'time': f'-00:{i:02d}:00', 'description': f'Step {i}'} for i in range(40)
+        ]},
+    }
+    dragon = {
+        'glass.dragon_gps_time_f64': 1.0,
+        'glass.dgn_speed_f64': 7.5,
+        'glass.predict_iss_r_lla_v3': [[i * 0.1, i * 0.2, 400.0] for i in range(2000)],
+    }
+    return {
+        '/launches': {'data': {'launches': [launch(i) for i in range(count)]}},
+        '/upcoming': [dict(launch(i), missionStatus='upcoming') for i in range(count // 10)],
+        '/stats': {'id': 1, 'documentId': 'stats', 'totalLaunches': count, 'totalLandings': count, 'totalReflights': count},
+        '/detail/mission-1': detail,
+        '/dragon': dragon,
+    }
+
+
+def measure(client, path, requests, cached):
+    timings = []
+    for _ in range(requests):
+        if not cached:
+            rendered_responses.clear()
+        started = time.perf_counter()
+        response = client.get(path)
+        timings.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, response.content
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--launches', type=int, default=500)
+    parser.add_argument('--requests', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    client = Client()
+
+    with FakeUpstream(payloads(args.launches)) as upstream, registry.override(
+        launches=f"{upstream.url}/launches",
+        upcoming=f"{upstream.url}/upcoming",
+        launch_detail=f"{upstream.url}/detail",
+        stats=f"{upstream.url}/stats",
+        dragon=f"{upstream.url}/dragon",
+    ):
+        upstream_cache.clear()
+        print(f"{args.launches} launches, median of {args.requests} requests per endpoint (ms)")
+        print(f"  {'endpoint':<20} {'JSONRenderer':>13} {'ORJSONRenderer':>15} {'cached':>8} {'bytes':>9}")
+        for name, path in ENDPOINTS:
+            size = len(client.get(path).content)
+            # Views read their renderers from APIView when the class is defined
+            with mock.patch.object(APIView, 'renderer_classes', [JSONRenderer]):
+                before = measure(client, path, args.requests, cached=False)
+            after = measure(client, path, args.requests, cached=False)
+            cached = measure(client, path, args.requests, cached=True)
+            print(f"  {name:<20} {before:13.2f} {after:15.2f} {cached:8.2f} {size:9d}")
+
+
+if __name__ == '__main__':
+    main()
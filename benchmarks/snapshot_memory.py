@@ -0,0 +1,163 @@
+"""
+Measure the memory a worker holds for the launches list on the real
+request path.
+
+Serves a synthetic launches payload (every launch with two images in four
+formats each) from a local fake upstream and requests /launches/ with a
+few different queries through the Django test client. Each variant runs
+in fresh processes, which report how much the live Python heap (traced
+with tracemalloc, in a separate run), the resident set size (RSS) and the
+peak RSS grew while serving those requests. The variants are:
+
+- ``dicts``: the launches endpoint caches the decoded payload, as it did
+  before it had a loader, and the snapshot is built from it;
+- ``snapshot``: the endpoint's loader caches the columnar LaunchSnapshot
+  only, in the in-process tier and pickled in the cache backend.
+
+The RSS is read from /proc/self/status, so this runs on Linux only. The
+peak is reached while the body is decoded, and the allocator keeps most
+of it after the decoded payload is released, so the RSS shrinks much less
+than the live heap.
+
+Run from the repository root:
+
+    SECRET_KEY=x UPSTREAM_FAIL_FAST=0 python -m benchmarks.snapshot_memory --launches 10000
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+from unittest import mock
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'SpaceX.settings')
+
+import django
+
+django.setup()
+
+from django.test import Client
+from django.test.utils import setup_test_environment
+
+from apps.launches.utils import launch_snapshots
+from apps.upstream.cache import rendered_responses, upstream_cache
+from apps.upstream.registry import registry
+from apps.upstream.testing import FakeUpstream
+
+from .rendering import launch
+from .sort_launches import MISSION_TYPES, SITES, VEHICLES
+
+VARIANTS = ('dicts', 'snapshot')
+
+QUERIES = (
+    '/launches/',
+    '/launches/?sort=datetime',
+    '/launches/?vehicle=falcon%209&sort=title',
+)
+
+
+class BodyUpstream(FakeUpstream):
+    """Fake upstream that sends bodies encoded ahead of time, so serving them allocates nothing"""
+
+    def handle(self, request):
+        content = self.payloads[request.path]
+        request.send_response(200)
+        request.send_header('Content-Type', 'application/json')
+        request.send_header('Content-Length', str(len(content)))
+        request.end_headers()
+        request.wfile.write(content)
+
+
+def payload(count, seed=0):
+    """The launches list as the upstream body"""
+    rng = random.Random(seed)
+    launches = [
+        dict(launch(index), vehicle=rng.choice(VEHICLES), launchSite=rng.choice(SITES), missionType=rng.choice(MISSION_TYPES))
+        for index in range(count)
+    ]
+    return json.dumps({'data': {'launches': launches}}).encode()
+
+
+def usage():
+    """Traced heap, RSS and peak RSS of this process in bytes, after a full collection"""
+    gc.collect()
+    with open('/proc/self/status') as status:
+        fields = dict(line.split(':', 1) for line in status)
+    # VmRSS and VmHWM (the peak RSS) are in kilobytes
+    rss, peak = (int(fields[name].split()[0]) * 1024 for name in ('VmRSS', 'VmHWM'))
+    return tracemalloc.get_traced_memory()[0], rss, peak
+
+
+def serve(client, upstream, path):
+    """Point the launches endpoint at ``path`` and request every query"""
+    with registry.override(launches=f"{upstream.url}{path}"):
+        for query in QUERIES:
+            response = client.get(query)
+            assert response.status_code == 200, response.content
+
+
+def measure(variant, body_path, traced=False):
+    """
+    Return the growth of usage(), in bytes, from serving the launches list
+    in this process; only runs with ``traced`` measure the heap.
+    """
+    with open(body_path, 'rb') as body:
+        bodies = {'/warmup': payload(20), '/launches': body.read()}
+
+    setup_test_environment()
+    client = Client()
+    loader = mock.patch.object(registry, 'load', lambda name, data: data) if variant == 'dicts' else mock.MagicMock()
+    with BodyUpstream(bodies) as upstream, loader:
+        # Import and initialize everything on the request path with a small list first
+        serve(client, upstream, '/warmup')
+        upstream_cache.clear()
+        upstream_cache.backend.clear()
+        launch_snapshots.clear()
+        rendered_responses.clear()
+
+        if traced:
+            tracemalloc.start()
+        before = usage()
+        serve(client, upstream, '/launches')
+        return [after - before for after, before in zip(usage(), before)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--launches', type=int, default=10000)
+    parser.add_argument('--variant', choices=VARIANTS, help=argparse.SUPPRESS)
+    parser.add_argument('--body', help=argparse.SUPPRESS)
+    parser.add_argument('--traced', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        print(*measure(args.variant, args.body, args.traced))
+        return
+
+    with tempfile.NamedTemporaryFile(suffix='.json') as body:
+        body.write(payload(args.launches))
+        body.flush()
+
+        def run(variant, *options):
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.snapshot_memory', '--variant', variant, '--body', body.name, *options],
+                capture_output=True, text=True, check=True,
+            ).stdout
+            return [int(value) / (1 << 20) for value in output.split()[-3:]]
+
+        # The heap comes from a traced run of its own, as tracing adds to the RSS
+        growth = {variant: [run(variant, '--traced')[0], *run(variant)[1:]] for variant in VARIANTS}
+
+    print(f"{args.launches} launches, growth of a worker serving /launches/ (MB)")
+    print(f"  {'':<32} {'live heap':>10} {'RSS':>8} {'peak RSS':>9}")
+    for variant, label in zip(VARIANTS, ('decoded dicts cached (before)', 'snapshot cached')):
+        heap, rss, peak = growth[variant]
+        print(f"  {label:<32} {heap:10.1f} {rss:8.1f} {peak:9.1f}")
+
+
+if __name__ == '__main__':
+    main()
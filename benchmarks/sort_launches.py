@@ -0,0 +1,125 @@
+"""
+Compare sorting the launches list per request with the precomputed
+orderings of a launch snapshot.
+
+Builds a synthetic launches list and times:
+
+- the per-request parse-and-sort ``sort=datetime`` used to do (up to four
+  ``strptime`` calls per launch, then a full sort);
+- ``sort_launches_by_datetime``, which still sorts per request;
+- a snapshot's first ``sort=datetime`` (building the snapshot, computing
+  the epoch keys and the ordering) and every later one, which is a lookup;
+- a multi-key sort on a filtered selection.
+
+Run from the repository root:
+
+    SECRET_KEY=x UPSTREAM_FAIL_FAST=0 python -m benchmarks.sort_launches --launches 10000
+"""
+import argparse
+import os
+import random
+import statistics
+import time as timer
+from datetime import date, datetime, time, timedelta
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'SpaceX.settings')
+
+import django
+
+django.setup()
+
+from apps.launches.utils import LaunchSnapshot, sort_launches_by_datetime
+
+VEHICLES = ['Falcon 9', 'Falcon Heavy', 'Starship', 'Dragon']
+SITES = ['SLC-40', 'LC-39A', 'SLC-4E', 'Starbase']
+MISSION_TYPES = ['starlink', 'crew', 'cargo', 'rideshare', 'commercial']
+
+
+def synthetic_launches(count, seed=0):
+    rng = random.Random(seed)
+    start = date(2006, 3, 24)
+    launches = []
+    for index in range(count):
+        launch_date = start + timedelta(days=rng.randrange(7300))
+        launches.append({
+            'id': index,
+            'documentId': f'doc-{index}',
+            'title': f'Mission {index}',
+            'link': f'mission-{index}',
+            'vehicle': rng.choice(VEHICLES),
+            'launchSite': rng.choice(SITES),
+            'missionType': rng.choice(MISSION_TYPES),
+            'missionStatus': 'complete',
+            'launchDate': launch_date.isoformat() if rng.random() < 0.9 else launch_date.strftime('%m/%d/%Y'),
+            'launchTime': f'{rng.randrange(24):02d}:{rng.randrange(60):02d}:00',
+            'isLive': False,
+        })
+    return launches
+
+
+def legacy_sort(launches_data):
+    """The per-request datetime sort the launches view used to run"""
+    def get_launch_datetime(launch):
+        launch_date = launch.get('launchDate')
+        launch_time = launch.get('launchTime')
+        try:
+            parsed_date = datetime.strptime(launch_date, '%Y-%m-%d').date()
+        except ValueError:
+            try:
+                parsed_date = datetime.strptime(launch_date, '%m/%d/%Y').date()
+            except ValueError:
+                return datetime.min
+        try:
+            parsed_time = datetime.strptime(launch_time, '%H:%M:%S').time()
+        except ValueError:
+            try:
+                parsed_time = datetime.strptime(launch_time, '%H:%M').time()
+            except ValueError:
+                parsed_time = time(0, 0)
+        return datetime.combine(parsed_date, parsed_time)
+
+    return sorted(launches_data, key=get_launch_datetime, reverse=True)
+
+
+def measure(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = timer.perf_counter()
+        fn()
+        timings.append((timer.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--launches', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    launches = synthetic_launches(args.launches)
+    order = LaunchSnapshot.parse_order('datetime')
+    multi_order = LaunchSnapshot.parse_order('-launchDate,vehicle')
+    filters = {'missionType': {'starlink', 'crew'}}
+
+    def first_snapshot_sort():
+        LaunchSnapshot(launches).select(order=order)
+
+    snapshot = LaunchSnapshot(launches)
+    snapshot.select(order=order)
+    snapshot.select(filters=filters, order=multi_order)
+
+    results = [
+        ('per-request strptime sort (before)', measure(lambda: legacy_sort(launches), args.repeat)),
+        ('sort_launches_by_datetime', measure(lambda: sort_launches_by_datetime(launches), args.repeat)),
+        ('snapshot: first sort=datetime', measure(first_snapshot_sort, args.repeat)),
+        ('snapshot: sort=datetime', measure(lambda: snapshot.select(order=order), args.repeat)),
+        ('snapshot: filtered sort=-launchDate,vehicle', measure(lambda: snapshot.select(filters=filters, order=multi_order), args.repeat)),
+    ]
+
+    print(f"{args.launches} launches, median of {args.repeat} runs")
+    for label, median in results:
+        print(f"  {label:<45} {median:8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
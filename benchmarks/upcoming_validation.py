@@ -0,0 +1,79 @@
+"""
+Measure the validation of the upcoming launches list with and without the
+per-launch validation memo.
+
+Times, for a synthetic upcoming list:
+
+- validating every launch with a fresh ``UpcomingLaunchSerializer``, as the
+  upcoming view used to on every request;
+- ``validate_upcoming_launches`` on a new snapshot whose launches were all
+  validated before (every result comes from the memo);
+- the same with one launch changed (one launch is validated again);
+- ``validate_upcoming_launches`` on a snapshot it already validated.
+
+Run from the repository root:
+
+    SECRET_KEY=x UPSTREAM_FAIL_FAST=0 python -m benchmarks.upcoming_validation --launches 50
+"""
+import argparse
+import os
+import statistics
+import time
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'SpaceX.settings')
+
+import django
+
+django.setup()
+
+from apps.upcoming.serializers import UpcomingLaunchSerializer
+from apps.upcoming.utils import UpcomingSnapshot, upcoming_validator, validate_upcoming_launches
+
+from .rendering import launch
+
+
+def measure(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def validate_every_launch(launches):
+    """The per-request validation the upcoming view used to run"""
+    for launch_data in launches:
+        UpcomingLaunchSerializer(data=launch_data).is_valid()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--launches', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    launches = [dict(launch(i), missionStatus='upcoming') for i in range(args.launches)]
+    upcoming_validator.clear()
+    snapshot = UpcomingSnapshot(launches)
+    validate_upcoming_launches(snapshot)
+
+    def one_changed():
+        changed = list(launches)
+        changed[0] = dict(changed[0], title=f'Mission {time.perf_counter_ns()}', updatedAt=str(time.perf_counter_ns()))
+        validate_upcoming_launches(UpcomingSnapshot(changed))
+
+    results = [
+        ('every launch validated (before)', measure(lambda: validate_every_launch(launches), args.repeat)),
+        ('new snapshot, launches unchanged', measure(lambda: validate_upcoming_launches(UpcomingSnapshot(list(launches))), args.repeat)),
+        ('new snapshot, one launch changed', measure(one_changed, args.repeat)),
+        ('same snapshot', measure(lambda: validate_upcoming_launches(snapshot), args.repeat)),
+    ]
+
+    print(f"{args.launches} upcoming launches, median of {args.repeat} runs")
+    for label, median in results:
+        print(f"  {label:<40} {median:8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
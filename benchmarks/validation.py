@@ -0,0 +1,76 @@
+"""
+Measure the per-record validation cost of the launch serializers with DRF
+and with their compiled checks.
+
+Each record is validated the way the views do: once through
+``serializer_class(data=record).is_valid()`` and once through
+``CompiledSerializer.validate``. The compiled checks are built before
+timing starts.
+
+Run from the repository root:
+
+    SECRET_KEY=x UPSTREAM_FAIL_FAST=0 python -m benchmarks.validation --records 200
+"""
+import argparse
+import os
+import statistics
+import time
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'SpaceX.settings')
+
+import django
+
+django.setup()
+
+from apps.launches.serializers import LaunchDetailSerializer, LaunchSerializer
+from apps.upcoming.serializers import UpcomingLaunchSerializer
+from apps.upstream.schema import CompiledSerializer
+
+from .rendering import image, launch, payloads
+
+
+def detail(index):
+    return dict(
+        payloads(1)['/detail/mission-1'],
+        id=index, documentId=f'doc-{index}', imageDesktop=image(index), imageMobile=image(index + 1),
+    )
+
+
+CASES = [
+    ('UpcomingLaunchSerializer', UpcomingLaunchSerializer, launch),
+    ('LaunchSerializer', LaunchSerializer, launch),
+    ('LaunchDetailSerializer', LaunchDetailSerializer, detail),
+]
+
+
+def measure(fn, records, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for record in records:
+            fn(record)
+        timings.append((time.perf_counter() - started) * 1000 / len(records))
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--records', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"ms per record, median of {args.repeat} runs over {args.records} records")
+    print(f"  {'serializer':<26} {'DRF':>8} {'compiled':>9} {'speedup':>8}")
+    for name, serializer_class, build in CASES:
+        records = [build(i) for i in range(args.records)]
+        schema = CompiledSerializer(serializer_class)
+        assert all(schema.validate(record)[1] is None for record in records)
+        assert schema.check is not None
+
+        drf = measure(lambda record: serializer_class(data=record).is_valid(), records, args.repeat)
+        compiled = measure(schema.validate, records, args.repeat)
+        print(f"  {name:<26} {drf:8.3f} {compiled:9.3f} {drf / compiled:7.1f}x")
+
+
+if __name__ == '__main__':
+    main()